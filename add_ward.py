@@ -1,105 +1,64 @@
-from urllib.parse import quote 
+import argparse
+import os
 import pandas as pd 
-import requests 
 import re 
-from tqdm import tqdm 
+from geocoder import DEFAULT_RATE_LIMIT, DEFAULT_WORKERS, geocode_many
+from geocode_cache import GeocodeCache
+from address_normalize import parse_address_series
+from local_geocoder import SNAPSHOT_PATH, LocalGeocoder
+from pipeline import KeyIndex
+from storage import EvictionStore
+from wards import load_ward_index
+from metrics import RunMetrics
+from aggregates import AggregateIndex, changes_summary
 
 # --- CONFIGURATION --- 
 LOCAL_CSV_PATH = 'eviction_notices.csv' 
 OUTPUT_CSV_PATH = 'eviction_data_ward.csv'
-DC_GEOCODING_API_URL = "https://citizenatlas.dc.gov/newwebservices/locationverifier.asmx/findLocation2" 
+STREAM_CHUNK_SIZE = 1000
+FINAL_COLUMNS = ['case_number', 'quad', 'zipcode', 'eviction_date', 'city', 'address_original', 'address_base', 'unit', 'lat', 'lng', 'ward', 'address_cleaned', 'month', 'year', 'month_name']
+# Per-row columns produced by parsing + geocoding; everything else in the
+# output is either copied from the notices CSV or derived from these.
+ENRICHED_COLUMNS = ['quad', 'zipcode', 'address_base', 'unit', 'lat', 'lng', 'ward']
 
-# --- DATA LOADING AND PREPARATION --- 
-df = pd.read_csv(LOCAL_CSV_PATH) 
-df.columns = df.columns.str.lower().str.replace(' ', '_') 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Geocode eviction_notices.csv and add ward information")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent geocoding requests")
+    parser.add_argument("--full-rebuild", action="store_true", help="re-enrich every row instead of only rows missing from the existing output")
+    parser.add_argument("--stream", action="store_true", help="read the notices CSV in chunks and append only unseen rows, with bounded memory")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_LIMIT, help="max geocoding requests per second (0 = unlimited)")
+    parser.add_argument("--ward-vintage", help="assign wards offline from data/boundaries/wards_<VINTAGE>.geojson (downloaded from DC GIS on first use) instead of using the geocoder's ward")
+    parser.add_argument("--address-snapshot", default=SNAPSHOT_PATH, help="local address-point snapshot tried before the geocoding API (skipped if missing)")
+    return parser.parse_args(argv)
+
+# Set by main(); module-level so the helpers below can share them.
+args = ward_index = metrics = None
+geocode_cache = local_geocoder = aggregates = None
 
 # --- GLOBAL COUNTERS AND STORAGE --- 
 stats = { "total": 0, "successful": 0, "failed": 0, "skipped": 0 } 
 failed_addresses, skipped_addresses = [], []
 
-# --- REFINED ADDRESS PARSING FUNCTION --- 
-def parse_address_components(address): 
-    if pd.isna(address): 
-        return None, None, None 
-
-    addr = str(address).strip().upper()
-    typo_fixes = {'STEREET': 'STREET', 'PLEASNT': 'PLEASANT', 'AVE.': 'AVENUE', 'CONNETICUT': 'CONNECTICUT', 'MCARUTHUR': 'MACARTHUR'} 
-    for typo, fix in typo_fixes.items(): addr = addr.replace(typo, fix) 
-    street_suffixes = {'STREET': 'ST', 'AVENUE': 'AVE', 'BOULEVARD': 'BLVD', 'CIRCLE': 'CIR', 'COURT': 'CT', 'DRIVE': 'DR', 'LANE': 'LN', 'ROAD': 'RD', 'PLACE': 'PL', 'TERRACE': 'TER', 'SQUARE': 'SQ'} 
-    for full, abbrev in street_suffixes.items(): addr = re.sub(rf'\b{full}\b', abbrev, addr) 
-
-    addr = re.sub(r'\s+\d+/\s*$', '', addr).strip()
-    addr = re.sub(r'\s+\d{1,2}/\d{1,2}/\d{2,4}.*$', '', addr) 
-    addr = re.sub(r',\s*WASHINGTON.*$', '', addr)
-    addr = re.sub(r'\s+DC\s+\d{5}.*$', '', addr)
-    addr = re.sub(r'\s+\d{5}.*$', '', addr)
-
-    unit_info = None
-    unit_patterns = [r'\s+(?:UNIT|APT\.?|#|STE\.?|SUITE)\s*([A-Z0-9\-]+)', r'\s+([A-Z]\d+)(?=\s|,|$)'] 
-    units = [] 
-    for pattern in unit_patterns: 
-        matches = re.findall(pattern, addr) 
-        for match in matches:
-            unit_str = match.strip().lstrip('#')
-            if unit_str not in units: 
-                units.append(unit_str) 
-        addr = re.sub(pattern, '', addr) 
-    if units:
-        unit_info = f"#{units[0]}"
-
-    base_addr = addr.strip().replace(',', '')
-    base_addr = re.sub(r'\s+', ' ', base_addr)
-    
-    quad_match = re.search(r'\b(NE|NW|SE|SW)\b', base_addr) 
-    if quad_match: 
-        quad = quad_match.group(1) 
-        base_addr = re.sub(r'\s*\b(NE|NW|SE|SW)\b\s*', ' ', base_addr).strip() 
-        base_addr = f"{base_addr} {quad}"
-
-    return str(address).strip(), base_addr, unit_info
+def skip_reason(address):
+    """Why an address is not worth geocoding, or None if it is."""
+    if not address or pd.isna(address): return 'empty_address'
+    if re.search(r'VACANT\s+LOT', address, re.IGNORECASE): return 'vacant_lot'
+    if not re.match(r'^\d+', address): return 'no_house_number'
+    return None
 
 def should_attempt_geocoding(address): 
-    if not address or pd.isna(address): return False 
-    if re.search(r'VACANT\s+LOT', address, re.IGNORECASE): return False 
-    if not re.match(r'^\d+', address): return False 
-    return True 
-
-# --- GEOGRAPHIC FUNCTION ---
-def geocode_address(address): 
-    encoded_address = quote(address) 
-    url = f"{DC_GEOCODING_API_URL}?str={encoded_address}&f=json" 
-    try: 
-        response = requests.get(url, timeout=10) 
-        response.raise_for_status()
-        data = response.json() 
-        if data and data.get('returnDataset') and data['returnDataset'].get('Table1'): 
-            result = data['returnDataset']['Table1'][0] 
-            lat, lon = result.get('LATITUDE'), result.get('LONGITUDE') 
-            if not (lat and lon and 38.8 < lat < 39.0 and -77.2 < lon < -76.9): return None
-            
-            ward_num_raw = result.get('WARD_2012') or result.get('WARD_2002')
-            ward_num = str(ward_num_raw).replace('Ward ', '').strip()
-
-            return {
-                "lat": lat, 
-                "lng": lon, 
-                "ward": f"Ward {ward_num}", 
-                "zipcode_api": result.get('ZIPCODE'), 
-                "quad_api": result.get('QUADRANT')
-            }
-    except (requests.exceptions.RequestException, ValueError, requests.exceptions.JSONDecodeError): return None 
-    return None 
-
-def process_row(full_address): 
+    return skip_reason(address) is None
+
+def process_row(parsed, geocoded): 
     stats['total'] += 1 
-    original, base_addr, unit = parse_address_components(full_address) 
+    original, base_addr, unit = parsed
     
     # FIX: Removed 'address_original': original from this dictionary
     # to prevent creating a duplicate column.
     result = {'address_base': base_addr, 'unit': unit, 'lat': None, 'lng': None, 'ward': None, 'zipcode_api': None, 'quad_api': None} 
     
     if should_attempt_geocoding(base_addr): 
-        geo_data = geocode_address(base_addr) 
+        geo_data = geocoded.get(base_addr)
         if geo_data: 
             stats['successful'] += 1 
             result.update(geo_data) 
@@ -108,40 +67,273 @@ def process_row(full_address):
             failed_addresses.append({'original': original, 'base': base_addr}) 
     else: 
         stats['skipped'] += 1 
+        metrics.count(f"skipped_{skip_reason(base_addr)}")
         skipped_addresses.append({'original': original, 'base': base_addr}) 
-    return pd.Series(result)
+    return result
     
+def row_keys(case_numbers, eviction_dates, addresses):
+    """(case_number, eviction_date, address) identity of each row, as strings."""
+    return pd.DataFrame({
+        'key_case': case_numbers.astype(str).values,
+        'key_date': eviction_dates.astype(str).values,
+        'key_address': addresses.astype(str).values,
+    })
+
+def load_existing_enrichment(path):
+    """
+    Reads a previous output file keyed by row identity, or returns None if
+    there is no usable previous output. Values are kept as the strings that
+    were written so reused rows are written back byte-for-byte.
+    """
+    if not os.path.exists(path):
+        return None
+    existing = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[''])
+    required = set(ENRICHED_COLUMNS) | {'case_number', 'eviction_date', 'address_original'}
+    if not required.issubset(existing.columns):
+        print(f"Existing {path} is missing columns {sorted(required - set(existing.columns))}; doing a full rebuild.")
+        return None
+    keys = row_keys(existing['case_number'], existing['eviction_date'], existing['address_original'])
+    existing = pd.concat([keys, existing[ENRICHED_COLUMNS]], axis=1)
+    return existing.drop_duplicates(subset=['key_case', 'key_date', 'key_address'])
+
+def counted_rows_changed(previous, df):
+    """
+    True if rows of the previous output are gone from df or now have another
+    ward or base address, so counts keyed by row identity are out of date.
+    """
+    if previous is None:
+        return False
+    key_columns = ['key_case', 'key_date', 'key_address']
+    keys = row_keys(df['case_number'], df['eviction_date'].dt.strftime('%Y-%m-%d'), df['address_original'])
+    current = pd.concat([keys, df[['ward', 'address_base']].reset_index(drop=True)], axis=1).drop_duplicates(subset=key_columns)
+    merged = previous.merge(current, how='left', on=key_columns, suffixes=('', '_new'), indicator=True)
+    if (merged['_merge'] != 'both').any():
+        return True
+    for column in ('ward', 'address_base'):
+        old, new = merged[column], merged[f"{column}_new"]
+        if not (old.eq(new) | (old.isna() & new.isna())).all():
+            return True
+    return False
+
+def enrich_rows(rows):
+    """Parses and geocodes rows, returning their ENRICHED_COLUMNS."""
+    print("Parsing addresses...")
+    with metrics.stage('parse_addresses'):
+        parsed_addresses = parse_address_series(rows['full_address'])
+    parsed_addresses = list(parsed_addresses[['address_original', 'address_base', 'unit']].itertuples(index=False, name=None))
+
+    # Each distinct base address is looked up in the on-disk cache first; only
+    # addresses never seen before (or expired failures) go to the API.
+    to_geocode = [base for _, base, _ in parsed_addresses if should_attempt_geocoding(base)]
+    with metrics.stage('cache_lookup'):
+        geocoded, missing = geocode_cache.lookup(to_geocode)
+    # Whatever the cache can't answer (or only has a failure for) is tried
+    # against the local address-point snapshot before going to the API.
+    if local_geocoder is not None:
+        with metrics.stage('local_geocode'):
+            local, _ = local_geocoder.lookup_many(missing + [address for address, result in geocoded.items() if result is None])
+        geocoded.update(local)
+        missing = [address for address in missing if address not in local]
+        print(f"Resolved {len(local):,} addresses from the local snapshot")
+    print(f"Geocoding {len(missing):,} uncached addresses ({len(geocoded):,} served from cache)...")
+    with metrics.stage('geocode'):
+        fetched = geocode_many(missing, workers=args.workers, rate_limit=args.rate_limit, metrics=metrics)
+        geocode_cache.store(fetched)
+    geocoded.update(fetched)
+    processed_data = pd.DataFrame([process_row(parsed, geocoded) for parsed in parsed_addresses], index=rows.index)
+    enriched = rows[['zipcode', 'quad']].join(processed_data)
+
+    enriched['zipcode'] = enriched['zipcode'].fillna(enriched['zipcode_api'])
+    enriched['quad'] = enriched['quad'].fillna(enriched['quad_api'])
+    enriched['zipcode'] = pd.to_numeric(enriched['zipcode'], errors='coerce').fillna(0).astype(int).astype(str).replace('0', None)
+    return enriched[ENRICHED_COLUMNS]
+
+def prepare_notices(notices):
+    notices.columns = notices.columns.str.lower().str.replace(' ', '_')
+    notices['eviction_date'] = pd.to_datetime(notices['eviction_date'], format='%m/%d/%Y', errors='coerce')
+    return notices
+
+def finalize(df):
+    """Adds the derived columns and puts the output columns in order."""
+    if ward_index is not None:
+        df['ward'] = ward_index.assign(pd.to_numeric(df['lat'], errors='coerce'), pd.to_numeric(df['lng'], errors='coerce'))
+    df['address_cleaned'] = df['address_base'].where(df['unit'].isna(), df['address_base'] + ' ' + df['unit'])
+    # month/year are floats (as they are whenever a date is missing) so that
+    # chunks appended in streaming mode are formatted like a full rebuild.
+    df['month'] = df['eviction_date'].dt.month.astype(float)
+    df['year'] = df['eviction_date'].dt.year.astype(float)
+    df['month_name'] = df['eviction_date'].dt.strftime('%B')
+    if 'full_address' in df.columns: df = df.rename(columns={'full_address': 'address_original'})
+    cols_to_drop = ['defendant_address', 'zipcode_api', 'quad_api'] 
+    df = df.drop(columns=[col for col in cols_to_drop if col in df.columns], errors='ignore') 
+    return df[[col for col in FINAL_COLUMNS if col in df.columns]]
+
+def stream_enrichment(chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Streams the notices CSV in chunks, enriches rows whose key is not yet in
+    the persistent key index, and appends them to the output. Memory is
+    bounded by the chunk size rather than the size of the archive.
+    """
+    index = KeyIndex(table='enriched_keys')
+    output_size = os.path.getsize(OUTPUT_CSV_PATH) if os.path.exists(OUTPUT_CSV_PATH) else 0
+    if index.get_meta('csv_size') != str(output_size):
+        index.clear()
+        if output_size:
+            print(f"Building key index from {OUTPUT_CSV_PATH}...")
+            for chunk in pd.read_csv(OUTPUT_CSV_PATH, dtype=str, keep_default_na=False, na_values=[''], usecols=['case_number', 'eviction_date', 'address_original'], chunksize=chunk_size):
+                keys = row_keys(chunk['case_number'], chunk['eviction_date'], chunk['address_original'])
+                index.add_many('|'.join(map(str, key)) for key in keys.itertuples(index=False, name=None))
+
+    appended = 0
+    write_header = not output_size
+    for chunk in pd.read_csv(LOCAL_CSV_PATH, chunksize=chunk_size):
+        chunk = prepare_notices(chunk)
+        keys = row_keys(chunk['case_number'], chunk['eviction_date'].dt.strftime('%Y-%m-%d'), chunk['full_address'])
+        is_new = [index.add_if_new('|'.join(map(str, key))) for key in keys.itertuples(index=False, name=None)]
+        new_rows = chunk[is_new]
+        if new_rows.empty:
+            continue
+        enriched = enrich_rows(new_rows)
+        out = finalize(new_rows.drop(columns=['zipcode', 'quad']).join(enriched))
+        out.to_csv(OUTPUT_CSV_PATH, mode='a', header=write_header, index=False)
+        write_header = False
+        appended += len(out)
+        aggregates.update(out)
+        aggregates.mark_synced(OUTPUT_CSV_PATH)
+        index.set_meta('csv_size', os.path.getsize(OUTPUT_CSV_PATH))
+        index.commit()
+    index.set_meta('csv_size', os.path.getsize(OUTPUT_CSV_PATH) if os.path.exists(OUTPUT_CSV_PATH) else 0)
+    index.commit()
+    index.close()
+    return appended
+
+def record_run_metrics():
+    """Adds this run's totals to the metrics report and writes it."""
+    for name, value in stats.items():
+        metrics.count(f"addresses_{name}", value)
+    metrics.count('geocode_cache_hits', geocode_cache.hits)
+    metrics.count('geocode_cache_negative_hits', geocode_cache.negative_hits)
+    metrics.count('geocode_cache_misses', geocode_cache.misses)
+    if local_geocoder is not None:
+        metrics.count('local_exact_hits', local_geocoder.exact_hits)
+        metrics.count('local_fuzzy_hits', local_geocoder.fuzzy_hits)
+        metrics.count('local_misses', local_geocoder.misses)
+    print(f"Run metrics written to {metrics.write()}")
+
+def report_changes():
+    """Saves and prints what this run changed in the per-ward and hotspot counts."""
+    changes = aggregates.record_run()
+    aggregates.close()
+    metrics.count('new_hotspots', len(changes['new_hotspots']))
+    print("\n".join(changes_summary(changes)))
+
 # --- SCRIPT EXECUTION ---
-print("Processing and geocoding all addresses...") 
-tqdm.pandas(desc="Geocoding") 
-processed_data = df['full_address'].progress_apply(process_row) 
-df = df.join(processed_data) 
-
-df['zipcode'] = df['zipcode'].fillna(df['zipcode_api']) 
-df['quad'] = df['quad'].fillna(df['quad_api']) 
-df['zipcode'] = pd.to_numeric(df['zipcode'], errors='coerce').fillna(0).astype(int).astype(str).replace('0', None)
-df['address_cleaned'] = df.apply(lambda row: f"{row['address_base']} {row['unit']}" if pd.notna(row['unit']) else row['address_base'], axis=1)
-df['eviction_date'] = pd.to_datetime(df['eviction_date'], format='%m/%d/%Y', errors='coerce')
-df['month'] = df['eviction_date'].dt.month 
-df['year'] = df['eviction_date'].dt.year 
-df['month_name'] = df['eviction_date'].dt.strftime('%B')
-if 'full_address' in df.columns: df = df.rename(columns={'full_address': 'address_original'})
-cols_to_drop = ['defendant_address', 'zipcode_api', 'quad_api'] 
-df = df.drop(columns=[col for col in cols_to_drop if col in df.columns], errors='ignore') 
-
-final_columns = ['case_number', 'quad', 'zipcode', 'eviction_date', 'city', 'address_original', 'address_base', 'unit', 'lat', 'lng', 'ward', 'address_cleaned', 'month', 'year', 'month_name']
-df = df[[col for col in final_columns if col in df.columns]]
-
-# Save the final, clean data to a new CSV file
-df.to_csv(OUTPUT_CSV_PATH, index=False)
-print(f"\n✅ Processing complete. Data saved to {OUTPUT_CSV_PATH}")
-
-# --- REPORTING ---
-print("\n" + "="*60) 
-print("PROCESSING SUMMARY REPORT") 
-print("="*60) 
-print(f"Total addresses processed: {stats['total']:,}") 
-print(f"  - Successfully geocoded: {stats['successful']:,}") 
-print(f"  - Failed to geocode:     {stats['failed']:,}") 
-print(f"  - Skipped:               {stats['skipped']:,}")
-print("="*60)
\ No newline at end of file
+def main(argv=None):
+    global args, ward_index, metrics, geocode_cache, local_geocoder, aggregates
+    # Reset per-run state, so calling main() again in-process (cli.py) starts from zero.
+    stats.update(dict.fromkeys(stats, 0))
+    failed_addresses.clear()
+    skipped_addresses.clear()
+    args = parse_args(argv)
+    try:
+        ward_index = load_ward_index(args.ward_vintage) if args.ward_vintage else None
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+    metrics = RunMetrics('add_ward')
+    geocode_cache = GeocodeCache()
+    local_geocoder = LocalGeocoder.from_csv(args.address_snapshot) if os.path.exists(args.address_snapshot) else None
+    # Counts for the bot are brought up to date with the existing output before
+    # it is rewritten, then only this run's new rows are added to them.
+    aggregates = AggregateIndex()
+    aggregates.bootstrap(OUTPUT_CSV_PATH)
+
+    if args.stream:
+        with metrics.stage('stream_enrichment'):
+            appended = stream_enrichment()
+        with metrics.stage('store'):
+            store = EvictionStore()
+            stored_rows = store.sync_csv('enriched', OUTPUT_CSV_PATH)
+            store.close()
+        metrics.count('rows_appended', appended)
+        metrics.count('store_rows_added', stored_rows)
+        report_changes()
+        print(f"\n✅ Streaming run complete. {appended:,} new rows appended to {OUTPUT_CSV_PATH} ({stored_rows:,} new in the typed store)")
+        print(f"Geocoded {stats['successful']:,}, failed {stats['failed']:,}, skipped {stats['skipped']:,}")
+        print(f"Geocode cache: {geocode_cache.hits:,} hits, {geocode_cache.negative_hits:,} cached failures, {geocode_cache.misses:,} misses")
+        if local_geocoder is not None:
+            print(f"Local snapshot: {local_geocoder.exact_hits:,} exact, {local_geocoder.fuzzy_hits:,} fuzzy, {local_geocoder.misses:,} misses")
+        record_run_metrics()
+        return 0
+
+    with metrics.stage('load'):
+        df = prepare_notices(pd.read_csv(LOCAL_CSV_PATH))
+
+    # Incremental mode: rows whose (case_number, eviction_date, address) already
+    # appear in the previous output reuse its enrichment; only new or changed
+    # rows are parsed and geocoded. Derived columns are recomputed for every
+    # row below, so the result matches a full rebuild.
+    with metrics.stage('reuse_match'):
+        previous = load_existing_enrichment(OUTPUT_CSV_PATH)
+        existing = None if args.full_rebuild else previous
+        if existing is not None:
+            keys = row_keys(df['case_number'], df['eviction_date'].dt.strftime('%Y-%m-%d'), df['full_address'])
+            matched = keys.merge(existing, how='left', on=['key_case', 'key_date', 'key_address'], indicator=True)
+            # Rows whose geocode failed (e.g. the API was down) are enriched
+            # again rather than reused, so they are retried on the next run.
+            unlocated = matched['lat'].isna() & matched['address_base'].map(should_attempt_geocoding)
+            reuse = ((matched['_merge'] == 'both') & ~unlocated).values
+            reused = matched.loc[reuse, ENRICHED_COLUMNS].set_axis(df.index[reuse])
+        else:
+            reuse = pd.Series(False, index=df.index).values
+            reused = pd.DataFrame(columns=ENRICHED_COLUMNS)
+    metrics.count('rows_reused', int(reuse.sum()))
+    print(f"Reusing {reuse.sum():,} already-enriched rows; enriching {(~reuse).sum():,} new or changed rows")
+
+    enriched = enrich_rows(df[~reuse]) if (~reuse).any() else pd.DataFrame(columns=ENRICHED_COLUMNS)
+    df = df.drop(columns=['zipcode', 'quad']).join(pd.concat([reused, enriched]).reindex(df.index))
+    with metrics.stage('finalize'):
+        df = finalize(df)
+
+    # Save the final, clean data to a new CSV file
+    with metrics.stage('write'):
+        df.to_csv(OUTPUT_CSV_PATH, index=False)
+    with metrics.stage('store'):
+        store = EvictionStore()
+        # The output was rewritten, so the table is too: re-geocoded rows get
+        # their new values and rows gone from the CSV are dropped.
+        stored_rows = store.replace('enriched', df)
+        store.close()
+    metrics.count('rows_written', len(df))
+    metrics.count('store_rows_added', stored_rows)
+    with metrics.stage('aggregates'):
+        # Counts are keyed by row identity, so rows that were counted before
+        # and have since been re-geocoded or removed need a full recount.
+        if counted_rows_changed(previous, df):
+            print("Rows counted before changed ward or base address; recounting the aggregates")
+            aggregates.rebuild(OUTPUT_CSV_PATH)
+        else:
+            aggregates.update(df[~reuse])
+            aggregates.mark_synced(OUTPUT_CSV_PATH)
+    print(f"\n✅ Processing complete. Data saved to {OUTPUT_CSV_PATH} ({stored_rows:,} new rows in the typed store)")
+
+    # --- REPORTING ---
+    print("\n" + "="*60) 
+    print("PROCESSING SUMMARY REPORT") 
+    print("="*60) 
+    print(f"Rows reused from previous output: {reuse.sum():,}")
+    print(f"Total addresses processed: {stats['total']:,}") 
+    print(f"  - Successfully geocoded: {stats['successful']:,}") 
+    print(f"  - Failed to geocode:     {stats['failed']:,}") 
+    print(f"  - Skipped:               {stats['skipped']:,}")
+    print(f"Geocode cache: {geocode_cache.hits:,} hits, {geocode_cache.negative_hits:,} cached failures, {geocode_cache.misses:,} misses")
+    if local_geocoder is not None:
+        print(f"Local snapshot: {local_geocoder.exact_hits:,} exact, {local_geocoder.fuzzy_hits:,} fuzzy, {local_geocoder.misses:,} misses")
+    print("="*60)
+    report_changes()
+    record_run_metrics()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,156 @@
+import re
+
+import pandas as pd
+
+# --- LOOKUP TABLES ---
+TYPO_FIXES = {'STEREET': 'STREET', 'PLEASNT': 'PLEASANT', 'AVE.': 'AVENUE', 'CONNETICUT': 'CONNECTICUT', 'MCARUTHUR': 'MACARTHUR'}
+STREET_SUFFIXES = {'STREET': 'ST', 'AVENUE': 'AVE', 'BOULEVARD': 'BLVD', 'CIRCLE': 'CIR', 'COURT': 'CT', 'DRIVE': 'DR', 'LANE': 'LN', 'ROAD': 'RD', 'PLACE': 'PL', 'TERRACE': 'TER', 'SQUARE': 'SQ'}
+UNIT_WORDS = {'apartment': 'apt', 'apt': '#', 'unit': '#', 'suite': '#', 'ste': '#'}
+STREET_WORDS = {'street': 'st', 'avenue': 'ave', 'road': 'rd', 'drive': 'dr', 'place': 'pl', 'boulevard': 'blvd', 'court': 'ct', 'terrace': 'ter', 'circle': 'cir', 'lane': 'ln'}
+
+# --- COMPILED PATTERNS ---
+# Each lookup table becomes one alternation applied in a single pass.
+TYPO_PATTERN = re.compile('|'.join(re.escape(typo) for typo in TYPO_FIXES))
+SUFFIX_PATTERN = re.compile(r'\b(' + '|'.join(STREET_SUFFIXES) + r')\b')
+TRAILING_SLASH_PATTERN = re.compile(r'\s+\d+/\s*$')
+TRAILING_PATTERNS = tuple(re.compile(p) for p in (r'\s+\d{1,2}/\d{1,2}/\d{2,4}.*$', r',\s*WASHINGTON.*$', r'\s+DC\s+\d{5}.*$', r'\s+\d{5}.*$'))
+UNIT_PATTERNS = tuple(re.compile(p) for p in (r'\s+(?:UNIT|APT\.?|#|STE\.?|SUITE)\s*([A-Z0-9\-]+)', r'\s+([A-Z]\d+)(?=\s|,|$)'))
+QUAD_PATTERN = re.compile(r'\b(NE|NW|SE|SW)\b')
+QUAD_STRIP_PATTERN = re.compile(r'\s*\b(NE|NW|SE|SW)\b\s*')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+# 'apartment' goes to 'apt' and then '#', so every unit word ends up as '#'.
+UNIT_WORD_PATTERN = re.compile('|'.join(UNIT_WORDS))
+STREET_WORD_PATTERN = re.compile(r'\b(' + '|'.join(STREET_WORDS) + r')\b')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s#]')
+# For dedup keys: everything but letters, digits and '#' goes, spaces
+# included, so street words are matched anywhere rather than as words.
+COMPACT_PATTERN = re.compile(r'[^a-z0-9#]')
+COMPACT_STREET_WORD_PATTERN = re.compile('|'.join(STREET_WORDS))
+
+
+# --- PER-ROW FUNCTIONS ---
+def normalize_address(address):
+    """Enhanced address normalization"""
+    if not isinstance(address, str):
+        return ''
+    address = address.lower().split('a/k/a')[0]
+    replacements = {'apartment': 'apt', 'apt': '#', 'unit': '#', 'suite': '#', 'ste': '#'}
+    for old, new in replacements.items():
+        address = address.replace(old, new)
+    street_replacements = {'street': 'st', 'avenue': 'ave', 'road': 'rd', 'drive': 'dr', 'place': 'pl', 'boulevard': 'blvd', 'court': 'ct', 'terrace': 'ter', 'circle': 'cir', 'lane': 'ln'}
+    for old, new in street_replacements.items():
+        address = re.sub(r'\b' + old + r'\b', new, address)
+    address = re.sub(r'[^\w\s#]', '', address)
+    address = re.sub(r'\s+', ' ', address).strip()
+    return address.title()
+
+
+def compact_address(address):
+    """
+    Dedup key form of an address: lowercased with spaces and punctuation
+    removed, then unit and street words shortened as in normalize_address,
+    so text an extractor splits or joins differently ("STR EET", "# 813")
+    gives the same key.
+    """
+    if not isinstance(address, str):
+        return ''
+    address = COMPACT_PATTERN.sub('', address.lower().split('a/k/a')[0])
+    address = UNIT_WORD_PATTERN.sub('#', address)
+    return COMPACT_STREET_WORD_PATTERN.sub(lambda m: STREET_WORDS[m.group(0)], address)
+
+
+def parse_address_components(address):
+    if pd.isna(address):
+        return None, None, None
+
+    addr = str(address).strip().upper()
+    typo_fixes = {'STEREET': 'STREET', 'PLEASNT': 'PLEASANT', 'AVE.': 'AVENUE', 'CONNETICUT': 'CONNECTICUT', 'MCARUTHUR': 'MACARTHUR'}
+    for typo, fix in typo_fixes.items(): addr = addr.replace(typo, fix)
+    street_suffixes = {'STREET': 'ST', 'AVENUE': 'AVE', 'BOULEVARD': 'BLVD', 'CIRCLE': 'CIR', 'COURT': 'CT', 'DRIVE': 'DR', 'LANE': 'LN', 'ROAD': 'RD', 'PLACE': 'PL', 'TERRACE': 'TER', 'SQUARE': 'SQ'}
+    for full, abbrev in street_suffixes.items(): addr = re.sub(rf'\b{full}\b', abbrev, addr)
+
+    addr = re.sub(r'\s+\d+/\s*$', '', addr).strip()
+    addr = re.sub(r'\s+\d{1,2}/\d{1,2}/\d{2,4}.*$', '', addr)
+    addr = re.sub(r',\s*WASHINGTON.*$', '', addr)
+    addr = re.sub(r'\s+DC\s+\d{5}.*$', '', addr)
+    addr = re.sub(r'\s+\d{5}.*$', '', addr)
+
+    unit_info = None
+    unit_patterns = [r'\s+(?:UNIT|APT\.?|#|STE\.?|SUITE)\s*([A-Z0-9\-]+)', r'\s+([A-Z]\d+)(?=\s|,|$)']
+    units = []
+    for pattern in unit_patterns:
+        matches = re.findall(pattern, addr)
+        for match in matches:
+            unit_str = match.strip().lstrip('#')
+            if unit_str not in units:
+                units.append(unit_str)
+        addr = re.sub(pattern, '', addr)
+    if units:
+        unit_info = f"#{units[0]}"
+
+    base_addr = addr.strip().replace(',', '')
+    base_addr = re.sub(r'\s+', ' ', base_addr)
+
+    quad_match = re.search(r'\b(NE|NW|SE|SW)\b', base_addr)
+    if quad_match:
+        quad = quad_match.group(1)
+        base_addr = re.sub(r'\s*\b(NE|NW|SE|SW)\b\s*', ' ', base_addr).strip()
+        base_addr = f"{base_addr} {quad}"
+
+    return str(address).strip(), base_addr, unit_info
+
+
+# --- BATCH FUNCTIONS ---
+# Same results as the per-row functions above, applied to a whole Series
+# with .str operations and the precompiled patterns. Values are handled as
+# object dtype so Python's re module (not a backend regex engine) runs them.
+def normalize_address_series(addresses):
+    """Batch version of normalize_address; returns a Series of strings."""
+    addresses = addresses.astype(object)
+    is_str = addresses.map(lambda value: isinstance(value, str)).astype(bool)
+    normalized = pd.Series('', index=addresses.index, dtype=object)
+    text = addresses[is_str].str.lower().str.split('a/k/a', n=1, regex=False).str[0]
+    text = text.str.replace(UNIT_WORD_PATTERN, '#', regex=True)
+    text = text.str.replace(STREET_WORD_PATTERN, lambda m: STREET_WORDS[m.group(1)], regex=True)
+    text = text.str.replace(PUNCTUATION_PATTERN, '', regex=True)
+    text = text.str.replace(WHITESPACE_PATTERN, ' ', regex=True).str.strip()
+    normalized[is_str] = text.str.title()
+    return normalized
+
+
+def parse_address_series(addresses):
+    """
+    Batch version of parse_address_components. Returns a DataFrame with
+    address_original, address_base and unit columns (None where the
+    address is missing).
+    """
+    addresses = addresses.astype(object)
+    present = addresses.notna()
+    original = addresses[present].astype(str).str.strip()
+
+    addr = original.str.upper()
+    addr = addr.str.replace(TYPO_PATTERN, lambda m: TYPO_FIXES[m.group(0)], regex=True)
+    addr = addr.str.replace(SUFFIX_PATTERN, lambda m: STREET_SUFFIXES[m.group(1)], regex=True)
+    addr = addr.str.replace(TRAILING_SLASH_PATTERN, '', regex=True).str.strip()
+    for pattern in TRAILING_PATTERNS:
+        addr = addr.str.replace(pattern, '', regex=True)
+
+    # The first unit-pattern match wins, falling back to the second pattern.
+    units = []
+    for pattern in UNIT_PATTERNS:
+        units.append(addr.str.extract(pattern, expand=False).str.strip().str.lstrip('#'))
+        addr = addr.str.replace(pattern, '', regex=True)
+    unit = units[0].fillna(units[1])
+    unit = '#' + unit
+
+    base = addr.str.strip().str.replace(',', '', regex=False)
+    base = base.str.replace(WHITESPACE_PATTERN, ' ', regex=True)
+    quad = base.str.extract(QUAD_PATTERN, expand=False)
+    has_quad = quad.notna()
+    base[has_quad] = base[has_quad].str.replace(QUAD_STRIP_PATTERN, ' ', regex=True).str.strip() + ' ' + quad[has_quad]
+
+    parsed = pd.DataFrame({'address_original': None, 'address_base': None, 'unit': None}, index=addresses.index, dtype=object)
+    parsed.loc[present, 'address_original'] = original
+    parsed.loc[present, 'address_base'] = base
+    parsed.loc[present, 'unit'] = unit
+    return parsed.where(parsed.notna(), None)
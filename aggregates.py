@@ -0,0 +1,219 @@
+"""
+Incremental eviction counts for the alert bot.
+
+Running counts of enriched rows per ward, base address (without the unit),
+month and year are kept in SQLite and updated from only the rows a run
+adds, so "what changed since the last run" never needs a regroup of the
+whole eviction_data_ward.csv. A base address with more than
+HOTSPOT_THRESHOLD scheduled evictions is a hotspot. Each row's hashed key
+is remembered, so passing a row twice never counts it twice.
+
+add_ward.py updates the counts; the bot reads the last run's changes:
+
+    python aggregates.py changes
+    python aggregates.py hotspots
+    python aggregates.py rebuild eviction_data_ward.csv
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+from collections import Counter
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from storage import to_store_frame
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+AGGREGATES_PATH = os.path.join("cache", "aggregates.sqlite")
+HOTSPOT_THRESHOLD = 5  # "more than 5 evictions at one base address"
+CHUNK_SIZE = 5000
+SUMMARY_HOTSPOTS = 10  # grown hotspots listed in the summary, largest first
+DIMENSIONS = ('ward', 'address', 'month', 'year')
+
+
+def dimension_values(frame):
+    """{dimension: Series of that dimension's value per row} for a store frame."""
+    dates = frame['eviction_date']
+    return {
+        'ward': frame['ward'].map(lambda ward: f"Ward {ward}", na_action='ignore'),
+        'address': frame['address_base'],
+        'month': dates.str[:7],
+        'year': dates.str[:4],
+    }
+
+
+class AggregateIndex:
+    """
+    Counts per (dimension, value) plus the keys of every row counted. The
+    count each value had before this run first touched it is kept in
+    memory, so changes() reports the whole run however many update() calls
+    it took.
+    """
+
+    def __init__(self, path=AGGREGATES_PATH, threshold=HOTSPOT_THRESHOLD):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS counted_rows (key INTEGER PRIMARY KEY)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS counts (dimension TEXT NOT NULL, value TEXT NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (dimension, value)) WITHOUT ROWID")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS index_meta (name TEXT PRIMARY KEY, value TEXT)")
+        self.threshold = threshold
+        self.before = {}
+        self.new_rows = 0
+
+    def count(self, dimension, value):
+        row = self.conn.execute("SELECT count FROM counts WHERE dimension = ? AND value = ?", (dimension, value)).fetchone()
+        return row[0] if row else 0
+
+    def _add(self, df, track):
+        """Counts the rows of df (enriched CSV columns) not counted before."""
+        frame = to_store_frame('enriched', df)
+        is_new = [self.conn.execute("INSERT OR IGNORE INTO counted_rows (key) VALUES (?)", (key,)).rowcount == 1 for key in frame['key']]
+        frame = frame[pd.Series(is_new, index=frame.index, dtype=bool)]
+        for dimension, values in dimension_values(frame).items():
+            for value, added in Counter(values.dropna()).items():
+                if track and (dimension, value) not in self.before:
+                    self.before[(dimension, value)] = self.count(dimension, value)
+                self.conn.execute(
+                    "INSERT INTO counts (dimension, value, count) VALUES (?, ?, ?) "
+                    "ON CONFLICT (dimension, value) DO UPDATE SET count = count + excluded.count",
+                    (dimension, value, added))
+        return len(frame)
+
+    def update(self, df):
+        """Counts newly added rows; returns how many were not already counted."""
+        added = self._add(df, track=True)
+        self.new_rows += added
+        return added
+
+    def bootstrap(self, csv_path, chunk_size=CHUNK_SIZE):
+        """
+        Rebuilds the counts from the enriched CSV when its size no longer
+        matches what mark_synced() last recorded (first run, a crashed run,
+        or the file edited by hand). Returns True if it was rebuilt.
+        """
+        csv_size = os.path.getsize(csv_path) if os.path.exists(csv_path) else 0
+        row = self.conn.execute("SELECT value FROM index_meta WHERE name = 'csv_size'").fetchone()
+        if row and row[0] == str(csv_size):
+            return False
+        self.conn.execute("DELETE FROM counted_rows")
+        self.conn.execute("DELETE FROM counts")
+        if csv_size:
+            logger.info(f"Rebuilding aggregates from {csv_path}...")
+            for chunk in pd.read_csv(csv_path, dtype=str, keep_default_na=False, na_values=[''], chunksize=chunk_size):
+                self._add(chunk, track=False)
+        self.mark_synced(csv_path)
+        return True
+
+    def rebuild(self, csv_path, chunk_size=CHUNK_SIZE):
+        """
+        Recounts everything from the enriched CSV, for runs that changed rows
+        already counted (re-geocoded, given another ward, or removed). The
+        counts from before are kept as this run's starting point, so
+        changes() still reports the run's deltas.
+        """
+        for dimension, value, count in self.conn.execute("SELECT dimension, value, count FROM counts").fetchall():
+            self.before.setdefault((dimension, value), count)
+        counted = {key for (key,) in self.conn.execute("SELECT key FROM counted_rows")}
+        self.conn.execute("DELETE FROM counted_rows")
+        self.conn.execute("DELETE FROM counts")
+        if os.path.exists(csv_path):
+            logger.info(f"Recounting aggregates from {csv_path}...")
+            for chunk in pd.read_csv(csv_path, dtype=str, keep_default_na=False, na_values=[''], chunksize=chunk_size):
+                self._add(chunk, track=True)
+        self.new_rows += sum(key not in counted for (key,) in self.conn.execute("SELECT key FROM counted_rows"))
+        self.mark_synced(csv_path)
+
+    def mark_synced(self, csv_path):
+        """Commits the counts and records the CSV size they correspond to."""
+        csv_size = os.path.getsize(csv_path) if os.path.exists(csv_path) else 0
+        self.conn.execute("INSERT OR REPLACE INTO index_meta (name, value) VALUES ('csv_size', ?)", (str(csv_size),))
+        self.conn.commit()
+
+    def changes(self):
+        """What this run changed: new rows, per-ward deltas and hotspot movements."""
+        wards, new_hotspots, growing_hotspots = {}, [], []
+        for (dimension, value), before in sorted(self.before.items()):
+            after = self.count(dimension, value)
+            if dimension == 'ward':
+                wards[value] = {'before': before, 'after': after, 'delta': after - before}
+            elif dimension == 'address' and after > self.threshold:
+                hotspot = {'address': value, 'before': before, 'after': after}
+                (growing_hotspots if before > self.threshold else new_hotspots).append(hotspot)
+        by_count = lambda hotspot: -hotspot['after']
+        return {
+            'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'new_rows': self.new_rows,
+            'wards': wards,
+            'new_hotspots': sorted(new_hotspots, key=by_count),
+            'growing_hotspots': sorted(growing_hotspots, key=by_count),
+        }
+
+    def record_run(self):
+        """Stores this run's changes for the bot; returns them."""
+        changes = self.changes()
+        self.conn.execute("INSERT OR REPLACE INTO index_meta (name, value) VALUES ('last_changes', ?)", (json.dumps(changes),))
+        self.conn.commit()
+        return changes
+
+    def last_changes(self):
+        row = self.conn.execute("SELECT value FROM index_meta WHERE name = 'last_changes'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def totals(self, dimension):
+        """[(value, count)] for one dimension, largest first."""
+        return self.conn.execute("SELECT value, count FROM counts WHERE dimension = ? ORDER BY count DESC, value", (dimension,)).fetchall()
+
+    def hotspots(self):
+        """[(base address, count)] for every address above the threshold."""
+        return [(value, count) for value, count in self.totals('address') if count > self.threshold]
+
+    def close(self):
+        self.conn.close()
+
+
+def changes_summary(changes):
+    """Lines for the bot message."""
+    lines = [f"{changes['new_rows']:,} new eviction notices"]
+    for ward, counts in sorted(changes['wards'].items(), key=lambda item: -item[1]['delta']):
+        lines.append(f"  {ward}: {counts['delta']:+,} ({counts['after']:,} total)")
+    for hotspot in changes['new_hotspots']:
+        lines.append(f"New hotspot: {hotspot['address']} ({hotspot['after']} evictions)")
+    for hotspot in changes['growing_hotspots'][:SUMMARY_HOTSPOTS]:
+        lines.append(f"Hotspot grew: {hotspot['address']} ({hotspot['before']} -> {hotspot['after']} evictions)")
+    if len(changes['growing_hotspots']) > SUMMARY_HOTSPOTS:
+        lines.append(f"...and {len(changes['growing_hotspots']) - SUMMARY_HOTSPOTS} more hotspots grew")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query or rebuild the incremental eviction counts")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("changes", help="what the last add_ward.py run added")
+    commands.add_parser("hotspots", help=f"base addresses with more than {HOTSPOT_THRESHOLD} evictions")
+    totals = commands.add_parser("totals", help="counts for one dimension")
+    totals.add_argument("dimension", choices=DIMENSIONS)
+    rebuild = commands.add_parser("rebuild", help="recount everything from an enriched CSV")
+    rebuild.add_argument("csv", nargs="?", default="eviction_data_ward.csv")
+    parser.add_argument("--path", default=AGGREGATES_PATH)
+    args = parser.parse_args()
+
+    aggregates = AggregateIndex(args.path)
+    if args.command == "changes":
+        changes = aggregates.last_changes()
+        print("\n".join(changes_summary(changes)) if changes else "No run recorded yet")
+    elif args.command == "hotspots":
+        for address, count in aggregates.hotspots():
+            print(f"{count:>5,}  {address}")
+    elif args.command == "totals":
+        for value, count in aggregates.totals(args.dimension):
+            print(f"{count:>7,}  {value}")
+    else:
+        aggregates.conn.execute("DELETE FROM index_meta WHERE name = 'csv_size'")
+        aggregates.bootstrap(args.csv)
+        print(f"Counted {aggregates.conn.execute('SELECT COUNT(*) FROM counted_rows').fetchone()[0]:,} rows from {args.csv}")
+    aggregates.close()
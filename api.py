@@ -0,0 +1,446 @@
+"""
+Local read API over the enriched eviction data.
+
+Loads eviction_data_ward.csv once into columns sorted by eviction date, with
+indexes by ward, zipcode, case number and base address, and answers JSON
+queries from memory:
+
+    GET  /rows?ward=8&start=2024-01-01&end=2024-06-30&limit=50&offset=100
+    GET  /count?zipcode=20020&by=month
+    GET  /hotspots?ward=7&min=10
+    GET  /status
+    POST /reload
+
+Filters combine: ward (8 or "Ward 8"), start/end (inclusive ISO dates),
+zipcode, case (case number) and address (prefix of the base address, any
+case). A date range is a slice of the sorted rows and every index holds
+sorted row positions, so a query is a few binary searches and intersections
+rather than a scan. Rows come newest first (sort=asc for oldest first),
+paged by limit/offset; hotspots are the base addresses with more than min
+evictions among the matching rows.
+
+Encoded responses are kept in an LRU cache. The parsed columns and indexes
+are pickled to cache/api_snapshot.pickle with the CSV's size and mtime, so a
+restart loads the snapshot instead of re-parsing the CSV. Every
+RELOAD_INTERVAL seconds (or on POST /reload) the CSV is checked; once a
+pipeline run has rewritten it the data is reloaded and the cache cleared:
+
+    python api.py --port 8770
+    python -m benchmarks.api_load
+"""
+import argparse
+import json
+import os
+import pickle
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from aggregates import HOTSPOT_THRESHOLD
+from storage import TABLES
+from wards import ward_label
+
+# --- CONFIGURATION ---
+INPUT_CSV_PATH = 'eviction_data_ward.csv'
+SNAPSHOT_PATH = os.path.join("cache", "api_snapshot.pickle")
+SNAPSHOT_VERSION = 1
+DEFAULT_PORT = 8770
+CACHE_SIZE = 1024  # encoded responses
+RELOAD_INTERVAL = 30  # seconds between checks for a rewritten CSV
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+ROW_COLUMNS = [csv_column for csv_column, _ in TABLES['enriched']['columns'].values()]
+FLOAT_COLUMNS = ('lat', 'lng')
+INDEXED = {'ward': 'ward', 'zipcode': 'zipcode', 'case': 'case_number'}  # filter -> column
+GROUPS = ('ward', 'zipcode', 'month', 'year')
+FILTERS = ('ward', 'start', 'end', 'zipcode', 'case', 'address')
+PARAMETERS = {
+    '/rows': FILTERS + ('limit', 'offset', 'sort'),
+    '/count': FILTERS + ('by',),
+    '/hotspots': FILTERS + ('min', 'limit', 'offset'),
+}
+EMPTY = np.zeros(0, dtype=np.int32)
+
+
+def csv_signature(csv_path):
+    """Path, size and mtime of the CSV; changes whenever a run rewrites or appends to it."""
+    stat = os.stat(csv_path)
+    return [os.path.abspath(csv_path), stat.st_size, stat.st_mtime_ns]
+
+
+def normalize_prefix(address):
+    return " ".join(address.upper().split())
+
+
+def positions_index(values):
+    """{value: sorted row positions} for a column; missing values are left out."""
+    return {value: positions.astype(np.int32) for value, positions in values.groupby(values, sort=False).indices.items()}
+
+
+def encode(result):
+    return json.dumps(result, separators=(',', ':')).encode()
+
+
+class EvictionData:
+    """Columns sorted by eviction date, with the indexes the queries use."""
+
+    def __init__(self, df, signature):
+        # Undated rows ('' sorts first) fall outside every date range.
+        dates = df['eviction_date'].fillna('')
+        df = df.iloc[dates.argsort(kind='stable')].reset_index(drop=True)
+        dates = df['eviction_date'].fillna('')
+        self.signature = signature
+        self.dates = dates.to_numpy(dtype='U10')
+        self.columns = {}
+        for column in ROW_COLUMNS:
+            values = pd.to_numeric(df[column]) if column in FLOAT_COLUMNS else df[column]
+            self.columns[column] = values.astype(object).where(values.notna(), None).tolist()
+        self.indexes = {name: positions_index(df[column]) for name, column in INDEXED.items()}
+        by_address = positions_index(df['address_base'])
+        self.addresses = sorted(by_address)
+        self.address_positions = [by_address[address] for address in self.addresses]
+        dated = dates.where(dates != '')
+        groups = {'ward': df['ward'], 'zipcode': df['zipcode'], 'month': dated.str[:7], 'year': dated.str[:4], 'address': df['address_base']}
+        self.groups = {}
+        for name, values in groups.items():
+            codes, labels = pd.factorize(values, sort=True)
+            self.groups[name] = (codes.astype(np.int32), labels.tolist())
+
+    @classmethod
+    def from_csv(cls, csv_path):
+        df = pd.read_csv(csv_path, usecols=ROW_COLUMNS, dtype=str, keep_default_na=False, na_values=[''])
+        df['ward'] = df['ward'].map(ward_label, na_action='ignore')
+        return cls(df, csv_signature(csv_path))
+
+    @classmethod
+    def from_state(cls, state):
+        data = cls.__new__(cls)
+        data.__dict__.update(state)
+        return data
+
+    def __len__(self):
+        return len(self.dates)
+
+    def lookup(self, name, value):
+        """Sorted positions of the rows with this ward, zipcode, case number or address prefix."""
+        if name != 'address':
+            return self.indexes[name].get(value, EMPTY)
+        prefix = normalize_prefix(value)
+        start = bisect_left(self.addresses, prefix)
+        stop = bisect_left(self.addresses, prefix + '\uffff')
+        if stop - start == 1:
+            return self.address_positions[start]
+        return np.sort(np.concatenate(self.address_positions[start:stop])) if stop > start else EMPTY
+
+    def select(self, filters):
+        """Sorted positions of the rows matching every filter."""
+        start, stop = 0, len(self)
+        if filters.get('start') or filters.get('end'):
+            start = int(np.searchsorted(self.dates, filters.get('start') or '0', 'left'))
+            stop = int(np.searchsorted(self.dates, filters['end'], 'right')) if filters.get('end') else len(self)
+        positions = None
+        for name in ('case', 'address', 'zipcode', 'ward'):
+            if name in filters:
+                matches = self.lookup(name, filters[name])
+                positions = matches if positions is None else np.intersect1d(positions, matches, assume_unique=True)
+        if positions is None:
+            return np.arange(start, stop, dtype=np.int32)
+        return positions[np.searchsorted(positions, start):np.searchsorted(positions, stop)]
+
+    def record(self, position):
+        return {column: values[position] for column, values in self.columns.items()}
+
+    def rows(self, positions, limit, offset, descending=True):
+        ordered = positions[::-1] if descending else positions
+        return {
+            'total': len(positions), 'offset': offset, 'limit': limit,
+            'rows': [self.record(position) for position in ordered[offset:offset + limit].tolist()],
+        }
+
+    def count(self, positions, by=None):
+        if by is None:
+            return {'count': len(positions)}
+        codes, labels = self.groups[by]
+        selected = codes[positions]
+        counts = np.bincount(selected[selected >= 0], minlength=len(labels))
+        return {'count': len(positions), 'by': by, 'groups': {labels[code]: int(counts[code]) for code in np.flatnonzero(counts)}}
+
+    def hotspots(self, positions, threshold, limit, offset):
+        """Base addresses with more than threshold of the rows, largest first."""
+        codes, labels = self.groups['address']
+        selected = codes[positions]
+        known = selected >= 0
+        counts = np.bincount(selected[known], minlength=len(labels))
+        hot = np.flatnonzero(counts > threshold)
+        hot = hot[np.argsort(-counts[hot], kind='stable')]
+        last = np.full(len(labels), -1, dtype=np.int64)
+        np.maximum.at(last, selected[known], positions[known])
+        return {
+            'total': len(hot), 'offset': offset, 'limit': limit, 'threshold': threshold,
+            'hotspots': [
+                {'address': labels[code], 'count': int(counts[code]), 'ward': self.columns['ward'][last[code]], 'last_eviction_date': self.columns['eviction_date'][last[code]]}
+                for code in hot[offset:offset + limit].tolist()
+            ],
+        }
+
+
+def load_data(csv_path=INPUT_CSV_PATH, snapshot_path=SNAPSHOT_PATH):
+    """
+    The data of the CSV as it is now: from the snapshot if it was taken of
+    the same CSV, otherwise parsed from the CSV and snapshotted. Returns
+    (data, 'snapshot' or 'csv').
+    """
+    signature = csv_signature(csv_path)
+    try:
+        with open(snapshot_path, "rb") as f:
+            snapshot = pickle.load(f)
+        if snapshot['version'] == SNAPSHOT_VERSION and snapshot['signature'] == signature:
+            return EvictionData.from_state(snapshot['state']), 'snapshot'
+    except (OSError, EOFError, pickle.UnpicklingError, KeyError, TypeError):
+        pass
+    data = EvictionData.from_csv(csv_path)
+    os.makedirs(os.path.dirname(snapshot_path) or ".", exist_ok=True)
+    tmp_path = f"{snapshot_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({'version': SNAPSHOT_VERSION, 'signature': data.signature, 'state': vars(data)}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, snapshot_path)
+    return data, 'csv'
+
+
+def integer(params, name, default, maximum=None):
+    if name not in params:
+        return default
+    try:
+        value = int(params[name])
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+    if value < 0 or (maximum is not None and value > maximum):
+        raise ValueError(f"{name} must be between 0 and {maximum}" if maximum is not None else f"{name} must not be negative")
+    return value
+
+
+def parse_filters(params):
+    """The filters of a query, normalized to how the data stores them; raises ValueError."""
+    filters = {}
+    if params.get('ward'):
+        filters['ward'] = ward_label(params['ward'])
+    for name in ('start', 'end'):
+        if params.get(name):
+            try:
+                filters[name] = date.fromisoformat(params[name]).isoformat()
+            except ValueError:
+                raise ValueError(f"{name} must be a YYYY-MM-DD date") from None
+    for name in ('zipcode', 'case'):
+        if params.get(name):
+            filters[name] = params[name].strip()
+    if 'address' in params:
+        filters['address'] = params['address']
+    return filters
+
+
+def run_query(data, path, params):
+    """The result of one query; raises ValueError on bad parameters."""
+    unknown = sorted(set(params) - set(PARAMETERS[path]))
+    if unknown:
+        raise ValueError(f"Unknown parameters for {path}: {', '.join(unknown)}")
+    positions = data.select(parse_filters(params))
+    if path == '/count':
+        if params.get('by') not in (None, *GROUPS):
+            raise ValueError(f"by must be one of {', '.join(GROUPS)}")
+        return data.count(positions, params.get('by'))
+    limit, offset = integer(params, 'limit', DEFAULT_LIMIT, MAX_LIMIT), integer(params, 'offset', 0)
+    if path == '/hotspots':
+        return data.hotspots(positions, integer(params, 'min', HOTSPOT_THRESHOLD), limit, offset)
+    if params.get('sort', 'desc') not in ('asc', 'desc'):
+        raise ValueError("sort must be asc or desc")
+    return data.rows(positions, limit, offset, descending=params.get('sort', 'desc') == 'desc')
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of encoded responses."""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            body = self.entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if not self.size:
+            return
+        with self.lock:
+            self.entries[key] = body
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        return {'entries': len(self.entries), 'size': self.size, 'hits': self.hits, 'misses': self.misses}
+
+
+class EvictionApi:
+    """The loaded data and the response cache, shared by the request threads."""
+
+    def __init__(self, csv_path=INPUT_CSV_PATH, snapshot_path=SNAPSHOT_PATH, cache_size=CACHE_SIZE):
+        self.csv_path = csv_path
+        self.snapshot_path = snapshot_path
+        self.cache = ResponseCache(cache_size)
+        self.reload_lock = threading.Lock()
+        self.reloads = 0
+        self.load()
+
+    def load(self):
+        start = time.perf_counter()
+        self.data, self.loaded_from = load_data(self.csv_path, self.snapshot_path)
+        self.load_seconds = round(time.perf_counter() - start, 3)
+        self.loaded_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+    def refresh(self):
+        """Reloads the data and clears the cache if the CSV changed since it was loaded; returns True if it did."""
+        with self.reload_lock:
+            try:
+                if csv_signature(self.csv_path) == self.data.signature:
+                    return False
+            except OSError:
+                return False
+            previous = self.data, self.loaded_from, self.load_seconds, self.loaded_at
+            self.load()
+            if self.data.signature != csv_signature(self.csv_path):
+                # Still being written; keep serving the old rows until the next check.
+                self.data, self.loaded_from, self.load_seconds, self.loaded_at = previous
+                return False
+            self.cache.clear()
+            self.reloads += 1
+            return True
+
+    def status(self):
+        return {
+            'rows': len(self.data), 'csv': self.csv_path, 'loaded_from': self.loaded_from,
+            'load_seconds': self.load_seconds, 'loaded_at': self.loaded_at, 'reloads': self.reloads,
+            'cache': self.cache.stats(),
+        }
+
+    def respond(self, path, query):
+        """(HTTP status, JSON body, cache hit or None) for a GET of path with parsed query {name: [values]}."""
+        if path == '/status':
+            return 200, encode(self.status()), None
+        if path not in PARAMETERS:
+            return 404, encode({'error': f"Unknown path {path}"}), None
+        data = self.data
+        # The signature is part of the key, so a response computed from the
+        # previous data just before a reload can never be served after it.
+        key = (tuple(data.signature), path, tuple(sorted((name, tuple(values)) for name, values in query.items())))
+        body = self.cache.get(key)
+        if body is not None:
+            return 200, body, True
+        try:
+            body = encode(run_query(data, path, {name: values[-1] for name, values in query.items()}))
+        except ValueError as e:
+            return 400, encode({'error': str(e)}), None
+        self.cache.put(key, body)
+        return 200, body, False
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients reuse their connection
+    # Headers and body are written separately; without this, Nagle's
+    # algorithm and delayed ACKs add ~40ms to every keep-alive response.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.send_json(*self.server.api.respond(url.path, parse_qs(url.query)))
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if urlparse(self.path).path != '/reload':
+            self.send_json(404, encode({'error': f"Unknown path {self.path}"}))
+            return
+        reloaded = self.server.api.refresh()
+        self.send_json(200, encode({'reloaded': reloaded, **self.server.api.status()}))
+
+    def send_json(self, status, body, cache_hit=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if cache_hit is not None:
+            self.send_header("X-Cache", "hit" if cache_hit else "miss")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def watch_csv(api, interval, stop):
+    while not stop.wait(interval):
+        if api.refresh():
+            print(f"Reloaded {api.csv_path}: {len(api.data):,} rows", flush=True)
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, api):
+        super().__init__(address, ApiHandler)
+        self.api = api
+        self.stopped = threading.Event()
+
+    def shutdown(self):
+        self.stopped.set()
+        super().shutdown()
+
+
+def start_api_server(api, port=0, host="127.0.0.1", reload_interval=RELOAD_INTERVAL):
+    """Serves api in background threads. Returns (server, base URL)."""
+    server = ApiServer((host, port), api)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    if reload_interval:
+        threading.Thread(target=watch_csv, args=(api, reload_interval, server.stopped), daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the enriched eviction data as a local JSON API")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--csv", default=INPUT_CSV_PATH)
+    parser.add_argument("--snapshot", default=SNAPSHOT_PATH)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="responses kept in the LRU cache (0 disables it)")
+    parser.add_argument("--reload-interval", type=float, default=RELOAD_INTERVAL, help="seconds between checks for a new CSV (0 to only reload on POST /reload)")
+    args = parser.parse_args(argv)
+
+    api = EvictionApi(args.csv, args.snapshot, args.cache_size)
+    server, url = start_api_server(api, args.port, args.host, args.reload_interval)
+    print(f"Loaded {len(api.data):,} rows from the {api.loaded_from} in {api.load_seconds:.2f}s; listening on {url}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,59 @@
+"""
+Parity check and timing for the batch address normalizers.
+
+Runs every row of eviction_notices.csv through the per-row functions
+(normalize_address, parse_address_components) and their batch versions,
+reports any row where they disagree, and prints rows/sec for both. Exits
+non-zero on any mismatch. Run from the repo root:
+
+    python -m benchmarks.address_parity
+"""
+import sys
+import time
+
+import pandas as pd
+
+from address_normalize import normalize_address, normalize_address_series, parse_address_components, parse_address_series
+
+NOTICES_CSV_PATH = "eviction_notices.csv"
+MAX_REPORTED = 10
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def report(name, rows, expected, actual, row_seconds, batch_seconds):
+    mismatches = [i for i, (e, a) in enumerate(zip(expected, actual)) if e != a]
+    print(f"{name}: {rows:,} rows")
+    print(f"  - per-row: {rows / row_seconds:>10,.0f} rows/sec")
+    print(f"  - batch:   {rows / batch_seconds:>10,.0f} rows/sec ({row_seconds / batch_seconds:.1f}x)")
+    for i in mismatches[:MAX_REPORTED]:
+        print(f"  ❌ row {i}: {expected[i]!r} != {actual[i]!r}")
+    if mismatches:
+        print(f"  ❌ {len(mismatches):,} mismatched rows")
+    else:
+        print("  ✅ identical")
+    return not mismatches
+
+
+def main():
+    df = pd.read_csv(NOTICES_CSV_PATH)
+    full_addresses = df['Full Address']
+    defendant_addresses = df['Defendant Address']
+
+    expected, row_seconds = timed(lambda s: [parse_address_components(a) for a in s], full_addresses)
+    parsed, batch_seconds = timed(parse_address_series, full_addresses)
+    actual = list(parsed[['address_original', 'address_base', 'unit']].itertuples(index=False, name=None))
+    ok = report("parse_address_components", len(df), expected, actual, row_seconds, batch_seconds)
+
+    expected, row_seconds = timed(lambda s: [normalize_address(a) for a in s], defendant_addresses)
+    normalized, batch_seconds = timed(normalize_address_series, defendant_addresses)
+    ok &= report("normalize_address", len(df), expected, list(normalized), row_seconds, batch_seconds)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Requests/sec and latency of the local read API (api.py).
+
+Builds row, count and hotspot queries from the wards, zip codes, months and
+base addresses in eviction_data_ward.csv and sends them from several client
+threads, each over one keep-alive connection, in two phases:
+
+    distinct   every request a different query, so nearly all miss the cache
+    repeated   a small hot set of queries, so nearly all hit it
+
+By default the API is started in this process on a free port; pass --url to
+measure a server started separately (python api.py), which keeps the
+clients from competing with it for the interpreter. Run from the repo root:
+
+    python -m benchmarks.api_load
+    python -m benchmarks.api_load --url http://127.0.0.1:8770 --clients 8 --seconds 10
+"""
+import argparse
+import http.client
+import itertools
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlparse
+
+from api import EvictionApi, start_api_server
+from metrics import percentiles
+
+CLIENTS = 4
+SECONDS = 5  # per phase
+HOT_QUERIES = 20
+SEED = 0
+
+
+def build_queries(data, rng):
+    """A shuffled list of distinct API paths built from values in the data."""
+    wards = data.groups['ward'][1]
+    zipcodes = data.groups['zipcode'][1]
+    months = data.groups['month'][1]
+    addresses = data.addresses
+    queries = []
+    for ward, month in itertools.product(wards, months):
+        start = f"{month}-01"
+        queries.append(('/rows', {'ward': ward, 'start': start, 'end': f"{month}-28", 'limit': 50}))
+        queries.append(('/count', {'ward': ward, 'start': start, 'by': 'zipcode'}))
+    for zipcode, by in itertools.product(zipcodes, ('month', 'year', 'ward')):
+        queries.append(('/count', {'zipcode': zipcode, 'by': by}))
+    for zipcode, minimum in itertools.product(zipcodes, (2, 5, 10)):
+        queries.append(('/hotspots', {'zipcode': zipcode, 'min': minimum, 'limit': 20}))
+    for address in rng.sample(addresses, min(len(addresses), 2000)):
+        queries.append(('/rows', {'address': address[:rng.randint(min(6, len(address)), len(address))], 'limit': 20}))
+    for offset in range(0, 2000, 100):
+        queries.append(('/rows', {'offset': offset, 'limit': 100}))
+    rng.shuffle(queries)
+    return [f"{path}?{urlencode(params)}" for path, params in queries]
+
+
+def run_phase(base_url, next_query, clients, seconds):
+    """Sends queries from client threads for seconds; returns (requests, hits, [latency ms], errors)."""
+    url = urlparse(base_url)
+    deadline = time.perf_counter() + seconds
+    latencies, hits, errors = [], [0], [0]
+    lock = threading.Lock()
+
+    def client():
+        connection = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+        mine, my_hits, my_errors = [], 0, 0
+        while time.perf_counter() < deadline:
+            path = next_query()
+            start = time.perf_counter()
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            mine.append((time.perf_counter() - start) * 1000)
+            my_hits += response.getheader("X-Cache") == "hit"
+            my_errors += response.status != 200
+        connection.close()
+        with lock:
+            latencies.extend(mine)
+            hits[0] += my_hits
+            errors[0] += my_errors
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies), hits[0], latencies, errors[0]
+
+
+def shared_iterator(iterable):
+    iterator, lock = iter(iterable), threading.Lock()
+
+    def next_item():
+        with lock:
+            return next(iterator)
+    return next_item
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the local read API")
+    parser.add_argument("--url", help="API base URL; by default one is started in this process")
+    parser.add_argument("--csv", default="eviction_data_ward.csv")
+    parser.add_argument("--clients", type=int, default=CLIENTS)
+    parser.add_argument("--seconds", type=float, default=SECONDS, help="duration of each phase")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(SEED)
+    api = EvictionApi(args.csv)
+    print(f"Loaded {len(api.data):,} rows from the {api.loaded_from} in {api.load_seconds:.2f}s")
+    server = None
+    if args.url is None:
+        server, args.url = start_api_server(api, reload_interval=0)
+    queries = build_queries(api.data, rng)
+    phases = {
+        'distinct': shared_iterator(itertools.cycle(queries)),
+        'repeated': shared_iterator(itertools.cycle(queries[:HOT_QUERIES])),
+    }
+
+    print(f"{args.clients} clients, {args.seconds:g}s per phase, {len(queries):,} distinct queries against {args.url}")
+    failed = False
+    for name, next_query in phases.items():
+        requests, hits, latencies, errors = run_phase(args.url, next_query, args.clients, args.seconds)
+        latency = "  ".join(f"{point} {value:.2f}ms" for point, value in percentiles(latencies).items())
+        print(f"  {name:<9} {requests:>8,} requests  {requests / args.seconds:>9,.0f}/sec  {hits / max(requests, 1):>4.0%} cached  {latency}")
+        if errors:
+            print(f"  {errors:,} requests failed")
+            failed = True
+    if server is not None:
+        server.shutdown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
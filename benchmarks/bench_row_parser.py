@@ -0,0 +1,131 @@
+"""
+Micro-benchmark for the row parser.
+
+Feeds every row of the Tabula CSVs in csv_files/ through the original
+regex-per-row implementation (copied below) and through row_parser, checks
+that both produce exactly the same [case, address, quad, zip, date] rows,
+and reports rows/sec for each. Run from the repo root:
+
+    python -m benchmarks.bench_row_parser
+"""
+import csv
+import glob
+import re
+import sys
+import time
+
+import pandas as pd
+
+from row_parser import parse_row, table_rows
+
+CSV_GLOB = "csv_files/*.csv"
+REPEAT = 5
+
+
+# --- ORIGINAL IMPLEMENTATION (from scrape.py, before the precompiled parser) ---
+def legacy_find_and_rebuild_date(text):
+    date_pattern = re.compile(r'(\d{1,2})\s*[/|-]\s*(\d{1,2})\s*[/|-]\s*(\d{2,4})')
+    match = date_pattern.search(text)
+    if not match:
+        return None, text
+    month, day, year = match.groups()
+    if len(year) == 2:
+        year = f"20{year}"
+    rebuilt_date = f"{int(month):02d}/{int(day):02d}/{year}"
+    try:
+        pd.to_datetime(rebuilt_date, format='%m/%d/%Y')
+        original_messy_text = match.group(0)
+        remaining_text = text.replace(original_messy_text, '')
+        return rebuilt_date, remaining_text
+    except (ValueError, TypeError):
+        return None, text
+
+
+def legacy_clean_row_text(text):
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[|]{2,}|_{3,}|-{3,}|={3,}', '', text)
+    text = re.sub(r'\bnan\b', '', text, flags=re.IGNORECASE)
+    return text.strip()
+
+
+def legacy_parse_rows(rows_to_process):
+    all_cleaned_rows = []
+    skipped = 0
+    case_patterns = [r'(\d+-[A-Z]+-\d+(?:-[A-Z])?)', r'(\b\d{2,}-\d{2,3}\b)', r'(LTB-\d+-\d+)', r'(\d{4,5}-\d{2})', r'(\d+-ADM-\d+)']
+    zip_pattern = re.compile(r'(20\d{3})')
+    quad_pattern = re.compile(r'\b(NW|NE|SW|SE)\b')
+    junk_patterns = [re.compile(r'case number|defendant address|eviction date|page \d+', re.IGNORECASE), re.compile(r'scheduled evictions|total|sum', re.IGNORECASE), re.compile(r'^[\s\-_=]+$')]
+    for row_str in rows_to_process:
+        row_str = row_str.strip()
+        if len(row_str) < 10 or any(p.search(row_str) for p in junk_patterns):
+            continue
+        row_str = legacy_clean_row_text(row_str)
+        found_date, remaining_str = legacy_find_and_rebuild_date(row_str)
+        if not found_date:
+            skipped += 1
+            continue
+        cases = [item for pattern in case_patterns for item in re.findall(pattern, remaining_str)]
+        zips = zip_pattern.findall(remaining_str)
+        quads = quad_pattern.findall(remaining_str)
+        found_case = cases[0] if cases else ''
+        found_zip = zips[0] if zips else ''
+        found_quad = quads[0] if quads else ''
+        address = remaining_str
+        if found_case: address = re.sub(r'^' + re.escape(found_case), '', address).strip()
+        if found_zip: address = address.replace(found_zip, '')
+        if found_quad: address = address.replace(found_quad, '')
+        address = re.sub(r'\s+', ' ', address).strip(' ,.')
+        all_cleaned_rows.append([found_case, address, found_quad, found_zip, found_date])
+    return all_cleaned_rows, skipped
+
+
+def parse_rows(rows_to_process):
+    all_cleaned_rows = []
+    skipped = 0
+    for row_str in rows_to_process:
+        fields, skipped_text = parse_row(row_str)
+        if fields:
+            all_cleaned_rows.append(fields)
+        elif skipped_text:
+            skipped += 1
+    return all_cleaned_rows, skipped
+
+
+def load_rows(pattern=CSV_GLOB):
+    """Joins each CSV row's cells the same way table rows are joined in scrape.py."""
+    rows = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, newline='') as f:
+            rows.extend(table_rows([list(row) for row in csv.reader(f)]))
+    return rows
+
+
+def time_parser(parser, rows, repeat=REPEAT):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = parser(rows)
+    elapsed = time.perf_counter() - start
+    return result, len(rows) * repeat / elapsed
+
+
+def main():
+    rows = load_rows()
+    if not rows:
+        print(f"No rows found in {CSV_GLOB}")
+        return 1
+
+    legacy_result, legacy_rate = time_parser(legacy_parse_rows, rows)
+    new_result, new_rate = time_parser(parse_rows, rows)
+
+    print(f"Rows: {len(rows):,} x {REPEAT}")
+    print(f"  - Original parser: {legacy_rate:>10,.0f} rows/sec")
+    print(f"  - row_parser:      {new_rate:>10,.0f} rows/sec ({new_rate / legacy_rate:.1f}x)")
+    if new_result != legacy_result:
+        print("❌ Parsed rows differ from the original implementation")
+        return 1
+    print(f"✅ Identical output: {len(new_result[0]):,} rows parsed, {new_result[1]:,} skipped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Load/filter timing and on-disk size: CSV versus the typed store.
+
+Syncs eviction_data_ward.csv into a scratch store, then times loading one
+ward's notices for one year from the CSV (read, parse dates, filter) and
+from the store (indexed query), and checks both return the same rows. The
+Parquet export is included when pyarrow is installed. Run from the repo
+root:
+
+    python -m benchmarks.bench_storage
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from storage import EvictionStore
+
+WARD_CSV_PATH = "eviction_data_ward.csv"
+WARD = 'Ward 8'
+START, END = '2024-01-01', '2024-12-31'
+REPEATS = 5
+
+
+def best_of(function):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def from_csv():
+    df = pd.read_csv(WARD_CSV_PATH)
+    df['eviction_date'] = pd.to_datetime(df['eviction_date'])
+    return df[(df['ward'] == WARD) & df['eviction_date'].between(START, END)]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as scratch:
+        store = EvictionStore(os.path.join(scratch, "evictions.sqlite"))
+        store.sync_csv('enriched', WARD_CSV_PATH)
+        store.conn.execute("VACUUM")
+
+        expected, csv_seconds = best_of(from_csv)
+        actual, store_seconds = best_of(lambda: store.load('enriched', ward=WARD, start=START, end=END))
+        print(f"{WARD}, {START}..{END}: {len(expected):,} rows")
+        print(f"  - CSV:    {csv_seconds * 1000:>8.1f} ms  {os.path.getsize(WARD_CSV_PATH) / 1e6:>6.2f} MB")
+        print(f"  - SQLite: {store_seconds * 1000:>8.1f} ms  {os.path.getsize(store.path) / 1e6:>6.2f} MB (with indexes)")
+
+        if importlib.util.find_spec("pyarrow"):
+            parquet_path = os.path.join(scratch, "enriched.parquet")
+            store.export_parquet('enriched', parquet_path)
+            _, parquet_seconds = best_of(lambda: pd.read_parquet(parquet_path, filters=[('ward', '==', WARD), ('eviction_date', '>=', pd.Timestamp(START)), ('eviction_date', '<=', pd.Timestamp(END))]))
+            print(f"  - Parquet:{parquet_seconds * 1000:>8.1f} ms  {os.path.getsize(parquet_path) / 1e6:>6.2f} MB")
+        else:
+            print("  - Parquet: skipped (pyarrow not installed)")
+        store.close()
+
+    same = list(expected['case_number'].fillna('')) == list(actual['case_number'].fillna(''))
+    print("  ✅ same rows" if same else "  ❌ row sets differ")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
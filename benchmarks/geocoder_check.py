@@ -0,0 +1,68 @@
+"""
+Exact, fuzzy and miss check for the local geocoder (local_geocoder.py).
+
+Looks a few addresses up in the small committed snapshot in data/fixture,
+without network access, and compares each with the snapshot address it
+should resolve to (or None for a miss), plus how it was found: an exact key
+hit, including OCR splits like "V AN B UREN", or a trigram match on
+misspelled streets like CONNETICUT and MCARUTHUR. Exits non-zero on any
+mismatch. Run from the repo root:
+
+    python -m benchmarks.geocoder_check
+    python -m benchmarks.geocoder_check --snapshot data/address_points.csv
+"""
+import argparse
+import os
+import sys
+
+from local_geocoder import LocalGeocoder, address_key
+
+FIXTURE_PATH = os.path.join("data", "fixture", "address_points.csv")
+
+# (address looked up, snapshot address it should resolve to, expected kind)
+KNOWN_ADDRESSES = [
+    ("2442 MARTIN LUTHER KING JR AVE SE", "2442 MARTIN LUTHER KING JR AVE SE", "exact"),
+    ("110 V AN B UREN ST NW", "110 VAN BUREN ST NW", "exact"),
+    ("4500 CONNETICUT AVE NW", "4500 CONNECTICUT AVE NW", "fuzzy"),
+    ("2929 CONNETICUT AVE NW", "2929 CONNECTICUT AVE NW", "fuzzy"),
+    ("4478 MCARUTHUR BLVD NW", "4478 MACARTHUR BLVD NW", "fuzzy"),
+    ("5185 MCARUTHUR BLVD NW", "5185 MACARTHUR BLVD NW", "fuzzy"),
+    ("4500 CONNETICUT AVE NE", None, "miss"),  # right street, wrong quadrant
+    ("9999 CONNECTICUT AVE NW", None, "miss"),
+    ("UNIT 4 REAR", None, "miss"),
+]
+
+
+def lookup_kind(geocoder, address):
+    """(result, 'exact' | 'fuzzy' | 'miss') for one lookup, from the geocoder's counters."""
+    before = geocoder.exact_hits, geocoder.fuzzy_hits
+    result = geocoder.lookup(address)
+    if geocoder.exact_hits > before[0]:
+        return result, 'exact'
+    if geocoder.fuzzy_hits > before[1]:
+        return result, 'fuzzy'
+    return result, 'miss'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check local geocoder lookups against known addresses")
+    parser.add_argument("--snapshot", default=FIXTURE_PATH)
+    args = parser.parse_args(argv)
+
+    geocoder = LocalGeocoder.from_csv(args.snapshot)
+    mismatches = 0
+    for address, expected_address, expected_kind in KNOWN_ADDRESSES:
+        result, kind = lookup_kind(geocoder, address)
+        expected = geocoder.points.get(address_key(expected_address)) if expected_address else None
+        if result == expected and kind == expected_kind:
+            print(f"  ✅ {address}: {kind}" + (f" -> {expected_address} ({result['ward']})" if result else ""))
+        else:
+            print(f"  ❌ {address}: {kind} {result}, expected {expected_kind} {expected_address}")
+            mismatches += 1
+    print(f"{len(KNOWN_ADDRESSES) - mismatches} of {len(KNOWN_ADDRESSES)} lookups as expected "
+          f"({geocoder.exact_hits} exact, {geocoder.fuzzy_hits} fuzzy, {geocoder.misses} missed; {len(geocoder):,} points in {args.snapshot})")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Failed-OCR check for page deduplication (pdf_extract.py).
+
+Extracts two PDFs that share their scanned pages, the 4-23-24 list and its
+"(1)" copy, with OCR forced to fail and an empty page cache. Every page
+that reuses a failed page, in the other PDF or later in the same one, must
+be reported as failed too, or scrape.py would store the PDF without that
+page's rows and never retry it. Exits non-zero on any mismatch. Run from
+the repo root:
+
+    python -m benchmarks.ocr_failure_check
+"""
+import os
+import sys
+import tempfile
+
+import pytesseract
+
+import pdf_extract
+
+PDF_PATHS = [
+    os.path.join("pdf_files", "WEBSITE%20Scheduled%20Evictions%20List%20until%205-28-2024%20as%20of%204-23-24%20%281%29.pdf"),
+    os.path.join("pdf_files", "WEBSITE%20Scheduled%20Evictions%20List%20until%205-28-2024%20as%20of%204-23-24.pdf"),
+]
+
+
+def failing_ocr(*args, **kwargs):
+    raise pytesseract.TesseractError(1, "OCR disabled by ocr_failure_check")
+
+
+def main():
+    pytesseract.image_to_string = failing_ocr
+    with tempfile.TemporaryDirectory() as page_cache:
+        results = pdf_extract.extract_pdfs(PDF_PATHS, page_cache=page_cache)
+
+    ok = len(results) == len(PDF_PATHS)
+    failed_pages = {}
+    for pdf_path in PDF_PATHS:
+        _, stats = results.get(pdf_path, ([], None))
+        if stats is None:
+            print(f"  ❌ {pdf_path}: not extracted")
+            continue
+        failed_pages[pdf_path] = stats['ocr_failed_page_numbers']
+        print(f"  {os.path.basename(pdf_path)}: {stats['image_pages']} image pages, {stats['deduplicated_pages']} reused, OCR failed on pages {stats['ocr_failed_page_numbers']}")
+        if stats['ocr_failed_pages'] != stats['image_pages'] or not stats['image_pages']:
+            print(f"  ❌ {stats['image_pages']} image pages but {stats['ocr_failed_pages']} reported as failed")
+            ok = False
+    if len(set(map(tuple, failed_pages.values()))) > 1:
+        print("  ❌ the two PDFs report different failed pages")
+        ok = False
+    print("  ✅ every copy of a failed page is reported as failed" if ok else "  ❌ failed pages were hidden by deduplication")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Benchmark and accuracy regression suite for the pipeline stages.
+
+Times each stage on the offline fixtures in this repo and reports items/sec
+and peak traced memory:
+
+    extract    pdf_extract.extract_pdfs over FIXTURE_PDFS (pages)
+    parse      row_parser over those tables and the Tabula CSVs in csv_files/
+    dedup      DedupIndex over the notices fixture (fresh scratch index)
+    addresses  parse_address_series over the notices fixture
+    geocode    geocode_many against the local stub geocoder
+    write      pipeline.append_csv of the notices to a scratch CSV
+
+The notices fixture is a pinned copy of eviction_notices.csv in
+benchmarks/fixtures/, so item counts do not move when the weekly run
+appends to the live file. Parsed rows of each fixture PDF are checked
+against benchmarks/golden/, so a faster engine cannot silently drop or
+change rows, and the results are compared with benchmarks/baseline.json.
+The goldens are pinned to the EXTRACTOR_VERSION they were made with, so a
+version bump fails the check until they are re-pinned; --update-golden
+prints the row-level diff, which goes in benchmarks/golden/CHANGES.md with
+the reason, in a commit of its own. Exits non-zero on a golden mismatch or
+version change, a changed row count or a stage slower than the baseline by
+more than the tolerance. Run from the repo root:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --save-baseline
+    python -m benchmarks.run --update-golden
+"""
+import argparse
+import collections
+import csv
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from address_normalize import parse_address_series
+from benchmarks.bench_row_parser import load_rows
+from dedup_index import DedupIndex
+from extract_cache import EXTRACTOR_VERSION
+from geocoder import geocode_many
+from pdf_extract import extract_pdfs
+from pipeline import append_csv, clean_rows, enrich_rows
+from row_parser import COLUMNS, parse_row, parse_table
+from stub_geocoder import start_stub_server
+
+PDF_DIRECTORY = "pdf_files"
+NOTICES_CSV_PATH = os.path.join("benchmarks", "fixtures", "eviction_notices.csv")
+GOLDEN_DIRECTORY = os.path.join("benchmarks", "golden")
+GOLDEN_VERSION_PATH = os.path.join(GOLDEN_DIRECTORY, "EXTRACTOR_VERSION")
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+# Text-layer PDFs of different layouts; image-only pages would make the
+# golden output depend on the local tesseract install.
+FIXTURE_PDFS = [
+    "Scheduled Evictions through 7-3-23manually added.pdf",
+    "WEBSITE Scheduled Evictions as of 3-28-23 manually added.pdf",
+    "Scheduled%20Evictions%208-14-2024.pdf",
+]
+GEOCODE_ADDRESSES = 2000
+TOLERANCE = 0.5  # a stage may be up to 50% slower than the baseline
+
+
+def run_stage(name, function, trace_memory=True):
+    """Runs one stage; returns (result, {seconds, items, items_per_sec, peak_mb})."""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result, items = function()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+    if trace_memory:
+        tracemalloc.stop()
+    metrics = {"seconds": round(seconds, 4), "items": items, "items_per_sec": round(items / seconds, 1) if seconds else 0.0, "peak_mb": round(peak / 1e6, 1)}
+    print(f"  {name:<10} {items:>8,} items  {metrics['items_per_sec']:>12,.0f}/sec  {metrics['peak_mb']:>7.1f} MB")
+    return result, metrics
+
+
+def parse_tables(tables):
+    rows = []
+    for table in tables:
+        for fields, _ in parse_table(table):
+            if fields:
+                rows.append(tuple(fields))
+    return rows
+
+
+def golden_path(pdf_filename):
+    return os.path.join(GOLDEN_DIRECTORY, os.path.splitext(pdf_filename)[0] + ".csv")
+
+
+def read_golden(pdf_filename):
+    with open(golden_path(pdf_filename), newline='') as f:
+        reader = csv.reader(f)
+        next(reader)
+        return [tuple(row) for row in reader]
+
+
+def write_golden(pdf_filename, rows):
+    os.makedirs(GOLDEN_DIRECTORY, exist_ok=True)
+    with open(golden_path(pdf_filename), 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+
+
+def read_golden_version():
+    if not os.path.exists(GOLDEN_VERSION_PATH):
+        return None
+    with open(GOLDEN_VERSION_PATH) as f:
+        return int(f.read().strip())
+
+
+def write_golden_version():
+    with open(GOLDEN_VERSION_PATH, 'w') as f:
+        f.write(f"{EXTRACTOR_VERSION}\n")
+
+
+def golden_diff(pdf_filename, rows):
+    """(golden rows no longer produced, rows the golden lacks) for a PDF, as Counters."""
+    expected = collections.Counter(read_golden(pdf_filename)) if os.path.exists(golden_path(pdf_filename)) else collections.Counter()
+    actual = collections.Counter(rows)
+    return expected - actual, actual - expected
+
+
+def print_row_diff(pdf_filename, missing, extra):
+    """
+    Every changed row of a PDF: rows with the same case number and date on
+    both sides as one '~' line naming the changed fields, the rest as '-'
+    (golden only) and '+' (new only).
+    """
+    print(f"{pdf_filename}: {sum(missing.values())} rows removed, {sum(extra.values())} added")
+    unpaired = list(extra.elements())
+    for old in sorted(missing.elements()):
+        new = next((row for row in unpaired if old[0] and row[0] == old[0] and row[4] == old[4]), None)
+        if new is None:
+            print(f"  - {old}")
+            continue
+        unpaired.remove(new)
+        changes = "; ".join(f"{column}: {a!r} -> {b!r}" for column, a, b in zip(COLUMNS, old, new) if a != b)
+        print(f"  ~ {old[0]} {old[4]}: {changes}")
+    for new in sorted(unpaired):
+        print(f"  + {new}")
+
+
+def check_golden(rows_by_pdf):
+    """
+    Compares each PDF's parsed rows with its golden CSV as multisets, and
+    the extractor version with the one the goldens were made with.
+    """
+    ok = True
+    golden_version = read_golden_version()
+    if golden_version != EXTRACTOR_VERSION:
+        print(f"  ❌ goldens were made with extractor version {golden_version}, this is {EXTRACTOR_VERSION}: review the rows "
+              f"--update-golden changes and commit them on their own, with the diff in {GOLDEN_DIRECTORY}/CHANGES.md")
+        ok = False
+    for pdf_filename, rows in rows_by_pdf.items():
+        if not os.path.exists(golden_path(pdf_filename)):
+            print(f"  ❌ no golden file for {pdf_filename} (run with --update-golden)")
+            ok = False
+            continue
+        missing, extra = golden_diff(pdf_filename, rows)
+        if missing or extra:
+            ok = False
+            print(f"  ❌ {pdf_filename}: {sum(missing.values())} rows missing, {sum(extra.values())} unexpected")
+            for row in list(missing)[:3]:
+                print(f"     - {row}")
+            for row in list(extra)[:3]:
+                print(f"     + {row}")
+        else:
+            print(f"  ✅ {pdf_filename}: {len(rows):,} rows match")
+    return ok
+
+
+def compare_baseline(results, baseline, tolerance):
+    """Prints the change against the baseline; returns False on a regression."""
+    ok = True
+    for name, metrics in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"  {name:<10} (no baseline)")
+            continue
+        change = metrics['items_per_sec'] / before['items_per_sec'] - 1 if before['items_per_sec'] else 0.0
+        notes = []
+        if metrics['items'] != before['items']:
+            notes.append(f"❌ items {before['items']:,} -> {metrics['items']:,}")
+            ok = False
+        if change < -tolerance:
+            notes.append(f"❌ slower than the {tolerance:.0%} tolerance")
+            ok = False
+        print(f"  {name:<10} {change:>+7.1%} items/sec  {metrics['peak_mb'] - before['peak_mb']:>+7.1f} MB  {' '.join(notes)}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages against the stored baseline")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write this run's results to {BASELINE_PATH}")
+    parser.add_argument("--update-golden", action="store_true", help=f"rewrite the golden CSVs in {GOLDEN_DIRECTORY}")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown per stage, as a fraction")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster, no peak memory)")
+    args = parser.parse_args()
+    trace = not args.no_memory
+
+    notices = pd.read_csv(NOTICES_CSV_PATH, dtype=str, keep_default_na=False)
+    notice_rows = list(notices[COLUMNS].itertuples(index=False, name=None))
+    pdf_paths = [os.path.join(PDF_DIRECTORY, name) for name in FIXTURE_PDFS]
+    results = {}
+    print("Stages:")
+
+    def extract():
+        # No page cache: time real extraction, not reads of earlier results.
+        extracted = extract_pdfs(pdf_paths, workers=1, page_cache=None)
+        return extracted, sum(stats['pages'] for _, stats in extracted.values())
+    extracted, results['extract'] = run_stage('extract', extract, trace)
+
+    tabula_rows = load_rows()
+
+    def parse():
+        rows_by_pdf = {os.path.basename(path): parse_tables(tables) for path, (tables, _) in extracted.items()}
+        parsed = [parse_row(row_str) for row_str in tabula_rows]
+        return rows_by_pdf, sum(len(rows) for rows in rows_by_pdf.values()) + len(parsed)
+    rows_by_pdf, results['parse'] = run_stage('parse', parse, trace)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        def dedup():
+            index = DedupIndex(os.path.join(scratch, "dedup.sqlite"))
+            accepted = sum(index.check(case, address, date)[0] for case, address, _, _, date in clean_rows(notice_rows))
+            index.close()
+            return accepted, len(notice_rows)
+        _, results['dedup'] = run_stage('dedup', dedup, trace)
+
+        def addresses():
+            return parse_address_series(notices['Full Address']), len(notices)
+        parsed_addresses, results['addresses'] = run_stage('addresses', addresses, trace)
+
+        server, url = start_stub_server()
+        sample = list(dict.fromkeys(parsed_addresses['address_base'].dropna()))[:GEOCODE_ADDRESSES]
+
+        def geocode():
+            return geocode_many(sample, rate_limit=0, base_url=url), len(sample)
+        _, results['geocode'] = run_stage('geocode', geocode, trace)
+        server.shutdown()
+
+        def write():
+            return None, append_csv(enrich_rows(clean_rows(notice_rows)), os.path.join(scratch, "notices.csv"))
+        _, results['write'] = run_stage('write', write, trace)
+
+    print(f"  peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB")
+
+    if args.update_golden:
+        print(f"Golden changes (extractor version {read_golden_version()} -> {EXTRACTOR_VERSION}):")
+        for pdf_filename, rows in rows_by_pdf.items():
+            print_row_diff(pdf_filename, *golden_diff(pdf_filename, rows))
+            write_golden(pdf_filename, rows)
+        write_golden_version()
+        print(f"Golden CSVs written to {GOLDEN_DIRECTORY}")
+    print("Golden output:")
+    ok = check_golden(rows_by_pdf)
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+    elif os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+        print("Against baseline:")
+        ok &= compare_baseline(results, baseline, args.tolerance)
+    else:
+        print(f"No baseline at {BASELINE_PATH} (run with --save-baseline)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
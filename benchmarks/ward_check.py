@@ -0,0 +1,58 @@
+"""
+Known-coordinate check for the offline ward assignment (wards.py).
+
+Assigns a few geocoded addresses, one per ward, plus a point outside DC and
+a missing coordinate, and compares the result with the ward DC's geocoder
+returned for them. Exits non-zero on any mismatch. By default it runs on
+the small committed fixture in data/boundaries/fixture; pass --directory to
+check the full boundary files in data/boundaries instead. Run from the repo
+root:
+
+    python -m benchmarks.ward_check
+    python -m benchmarks.ward_check --directory data/boundaries
+"""
+import argparse
+import os
+import sys
+
+from wards import BOUNDARY_DIRECTORY, load_ward_index
+
+FIXTURE_DIRECTORY = os.path.join(BOUNDARY_DIRECTORY, "fixture")
+VINTAGE = "2022"
+
+# (description, lat, lng, expected ward)
+KNOWN_POINTS = [
+    ("1475 EUCLID ST NW", 38.92364045, -77.03497522, "Ward 1"),
+    ("930 M ST NW", 38.90544876, -77.02549355, "Ward 2"),
+    ("5415 CONNECTICUT AVE NW", 38.96171122, -77.07323742, "Ward 3"),
+    ("6676 GEORGIA AVE NW", 38.97209125, -77.0273625, "Ward 4"),
+    ("2107 I ST NE", 38.90274718, -76.97338464, "Ward 5"),
+    ("1263 FIRST ST SE", 38.87521083, -77.00625256, "Ward 6"),
+    ("3551 JAY ST NE", 38.90723726, -76.95141526, "Ward 7"),
+    ("4502 SOUTH CAPITOL ST SE", 38.82475042, -77.00616016, "Ward 8"),
+    ("Arlington, VA (outside DC)", 38.88, -77.12, None),
+    ("missing coordinates", float('nan'), float('nan'), None),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check ward assignment against known coordinates")
+    parser.add_argument("--directory", default=FIXTURE_DIRECTORY, help="directory with wards_<vintage>.geojson")
+    parser.add_argument("--vintage", default=VINTAGE)
+    args = parser.parse_args(argv)
+
+    index = load_ward_index(args.vintage, args.directory)
+    assigned = index.assign([lat for _, lat, _, _ in KNOWN_POINTS], [lng for _, _, lng, _ in KNOWN_POINTS])
+    mismatches = 0
+    for (description, _, _, expected), ward in zip(KNOWN_POINTS, assigned):
+        if ward == expected:
+            print(f"  ✅ {description}: {ward}")
+        else:
+            print(f"  ❌ {description}: {ward}, expected {expected}")
+            mismatches += 1
+    print(f"{len(KNOWN_POINTS) - mismatches} of {len(KNOWN_POINTS)} points in the expected ward (wards_{args.vintage}.geojson in {args.directory})")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Command-line entry point for the eviction notice pipeline.
+
+    python cli.py check      anything new upstream? (exit 3 if so, 0 if not,
+                             4 if OTA could not be reached)
+    python cli.py fetch      download new or changed PDFs
+    python cli.py extract    extract and cache rows of new PDFs; the CSV is not touched
+    python cli.py dedupe     dedupe extracted rows into eviction_notices.csv
+    python cli.py geocode    enrich new rows into eviction_data_ward.csv
+    python cli.py maps       rebuild the changed slices of the map layers
+    python cli.py serve      local JSON API over the enriched rows (api.py)
+    python cli.py report     last run's metrics and per-ward/hotspot changes
+
+Options after extract, dedupe, geocode, maps and serve are passed through
+to scrape.py, add_ward.py, map_layers.py or api.py (e.g. `python cli.py
+geocode --rate-limit 5`). Each subcommand imports only what it needs, so
+`check` loads nothing beyond the standard library and returns in a fraction
+of a second; polling it is almost free.
+"""
+import argparse
+import json
+import os
+import sys
+
+from fetcher import DEFAULT_WORKERS, OTA_PAGE_URL
+
+NEW_DATA_EXIT_CODE = 3
+CHECK_FAILED_EXIT_CODE = 4
+
+
+def cmd_check(args, extra):
+    from fetcher import check_upstream
+
+    try:
+        result = check_upstream(args.source_url, deep=args.deep)
+    except OSError as e:  # URLError, HTTPError and timeouts are all OSErrors
+        print(f"Check failed for {args.source_url}: {e}", file=sys.stderr)
+        return CHECK_FAILED_EXIT_CODE
+    for label, key in (("New PDFs", 'new'), ("Changed PDFs", 'modified'), ("Fetched but not yet processed", 'pending')):
+        if result[key]:
+            print(f"{label}: {', '.join(result[key])}")
+    if result['new'] or result['modified'] or result['pending']:
+        return NEW_DATA_EXIT_CODE
+    print("Nothing new" + (" (page unchanged)" if not result['page_modified'] else ""))
+    return 0
+
+
+def cmd_fetch(args, extra):
+    import logging
+    from fetcher import fetch_pdfs
+
+    logging.basicConfig(level=logging.INFO)
+    fetched = fetch_pdfs(args.source_url, workers=args.download_workers)
+    print(f"{len(fetched['new'])} new, {len(fetched['changed'])} changed, {len(fetched['unchanged']) + len(fetched['not_modified'])} unchanged, {len(fetched['failed'])} failed; {len(fetched['pending'])} pending")
+    return 1 if fetched['failed'] else 0
+
+
+def cmd_extract(args, extra):
+    import scrape
+    return scrape.main(["--no-fetch", "--extract-only", *extra])
+
+
+def cmd_dedupe(args, extra):
+    import scrape
+    return scrape.main(["--no-fetch", *extra])
+
+
+def cmd_geocode(args, extra):
+    import add_ward
+    return add_ward.main(extra)
+
+
+def cmd_maps(args, extra):
+    import map_layers
+    return map_layers.main(extra)
+
+
+def cmd_serve(args, extra):
+    import api
+    return api.main(extra)
+
+
+def cmd_report(args, extra):
+    from metrics import METRICS_DIRECTORY
+
+    for script in ('scrape', 'add_ward'):
+        path = os.path.join(METRICS_DIRECTORY, f"{script}.json")
+        if not os.path.exists(path):
+            continue
+        with open(path) as f:
+            report = json.load(f)
+        print(f"{script} ({report['started_at']}): {report['wall_seconds']:.1f}s, peak {report['peak_rss_mb']:.0f} MB")
+        for name, stage in report['stages'].items():
+            print(f"  {name:<18} {stage['wall_seconds']:>8.2f}s")
+        for name, value in report['counters'].items():
+            if value:
+                print(f"  {name:<30} {value:>8,}")
+
+    from aggregates import AggregateIndex, changes_summary
+    aggregates = AggregateIndex()
+    changes = aggregates.last_changes()
+    aggregates.close()
+    if changes:
+        print(f"Changes ({changes['updated_at']}):")
+        print("\n".join(changes_summary(changes)))
+    return 0
+
+
+COMMANDS = {
+    'check': (cmd_check, "check OTA for new or changed PDFs without downloading (exit 3 if any, 4 if unreachable)"),
+    'fetch': (cmd_fetch, "download new or changed PDFs"),
+    'extract': (cmd_extract, "extract rows from new or changed PDFs into the cache"),
+    'dedupe': (cmd_dedupe, "dedupe new rows into eviction_notices.csv and the store"),
+    'geocode': (cmd_geocode, "geocode new rows into eviction_data_ward.csv (add_ward.py)"),
+    'maps': (cmd_maps, "rebuild the heatmap, ward and building map layers (map_layers.py)"),
+    'serve': (cmd_serve, "serve filtered rows, counts and hotspots as JSON (api.py)"),
+    'report': (cmd_report, "show the last run's metrics and changes"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eviction notice pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        command = commands.add_parser(name, help=help_text)
+        if name in ('check', 'fetch'):
+            command.add_argument("--source-url", default=OTA_PAGE_URL, help="scheduled-evictions page (e.g. a local stub_ota.py server)")
+        if name == 'check':
+            command.add_argument("--deep", action="store_true", help="also revalidate every known PDF to catch same-name re-uploads")
+        if name == 'fetch':
+            command.add_argument("--download-workers", type=int, default=DEFAULT_WORKERS)
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command not in ('extract', 'dedupe', 'geocode', 'maps', 'serve'):
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return COMMANDS[args.command][0](args, extra)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
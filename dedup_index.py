@@ -0,0 +1,172 @@
+"""
+Persistent deduplication index for eviction notices.
+
+Every accepted notice leaves a 64-bit hashed key in SQLite, so a new row is
+checked with one indexed lookup instead of re-deduplicating the whole
+history. Rules, in order:
+
+    case          same case number and eviction date
+    address       no case number: same address and eviction date
+    case_address  no case number: same address and date as a notice that
+                  has one
+    fuzzy_case    (optional) same address and date, and a case number
+                  within MAX_CASE_DISTANCE edits of one already seen, for
+                  OCR-garbled case numbers
+
+Addresses are compared compacted (address_normalize.compact_address), so a
+new extractor version that only splits or joins words differently ("STR
+EET" -> "STREET") doesn't make notices already in the CSV look new.
+"""
+import logging
+import os
+import sqlite3
+
+import pandas as pd
+
+from address_normalize import compact_address
+from storage import row_key_hash
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+INDEX_PATH = os.path.join("cache", "dedup_index.sqlite")
+MAX_CASE_DISTANCE = 2
+CHUNK_SIZE = 5000
+RULES = ('case', 'address', 'case_address', 'fuzzy_case')
+# Bump whenever notice_keys() changes, so existing indexes are rebuilt once.
+KEY_VERSION = 2
+
+
+def edit_distance(a, b, limit=MAX_CASE_DISTANCE):
+    """Levenshtein distance between a and b, or limit + 1 once it is known to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def clean_case_number(case_number):
+    """Empty string for a missing case number (including the text 'nan')."""
+    case_number = case_number.strip() if isinstance(case_number, str) else ''
+    return '' if case_number == 'nan' else case_number
+
+
+def notice_keys(case_number, address, eviction_date):
+    """Returns (rule, hashed key, hashed address/date bucket) for a notice."""
+    address = compact_address(address)
+    bucket = row_key_hash(f"{address}|{eviction_date}")
+    if case_number:
+        return 'case', row_key_hash(f"case|{case_number}|{eviction_date}"), bucket
+    return 'address', row_key_hash(f"address|{address}|{eviction_date}"), bucket
+
+
+class DedupIndex:
+    """
+    Hashed dedup keys plus, per (address, date) bucket, the case numbers
+    seen there for the fuzzy rule. Accepted rows are only made permanent by
+    mark_synced(), which callers run once the rows are in the CSV.
+    """
+
+    def __init__(self, path=INDEX_PATH, fuzzy=False):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS dedup_keys (key INTEGER PRIMARY KEY)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS case_buckets (bucket INTEGER NOT NULL, case_number TEXT NOT NULL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS case_buckets_bucket ON case_buckets (bucket)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS index_meta (name TEXT PRIMARY KEY, value TEXT)")
+        self.fuzzy = fuzzy
+        self.accepted = {'case': 0, 'address': 0}
+        self.rejected = dict.fromkeys(RULES, 0)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM dedup_keys").fetchone()[0]
+
+    def _has_case(self, bucket):
+        return self.conn.execute("SELECT 1 FROM case_buckets WHERE bucket = ? LIMIT 1", (bucket,)).fetchone() is not None
+
+    def _near_duplicate(self, bucket, case_number):
+        rows = self.conn.execute("SELECT case_number FROM case_buckets WHERE bucket = ?", (bucket,))
+        return any(edit_distance(case_number, seen) <= MAX_CASE_DISTANCE for (seen,) in rows)
+
+    def check(self, case_number, address, eviction_date):
+        """
+        Checks one notice against the index and records it if accepted.
+        Returns (accepted, rule) where rule is the rule that decided.
+        """
+        case_number = clean_case_number(case_number)
+        rule, key, bucket = notice_keys(case_number, address, eviction_date)
+        if self.conn.execute("SELECT 1 FROM dedup_keys WHERE key = ?", (key,)).fetchone():
+            self.rejected[rule] += 1
+            return False, rule
+        if not case_number and self._has_case(bucket):
+            self.rejected['case_address'] += 1
+            return False, 'case_address'
+        if case_number and self.fuzzy and self._near_duplicate(bucket, case_number):
+            self.rejected['fuzzy_case'] += 1
+            return False, 'fuzzy_case'
+        self.conn.execute("INSERT INTO dedup_keys (key) VALUES (?)", (key,))
+        if case_number:
+            self.conn.execute("INSERT INTO case_buckets (bucket, case_number) VALUES (?, ?)", (bucket, case_number))
+        self.accepted[rule] += 1
+        return True, rule
+
+    def _add_frame(self, df):
+        """Records notices from a CSV chunk without counting them."""
+        case_numbers = df['Case Number'].map(clean_case_number)
+        keys, buckets = [], []
+        for case_number, address, eviction_date in zip(case_numbers, df['Defendant Address'], df['Eviction Date']):
+            _, key, bucket = notice_keys(case_number, address, eviction_date)
+            keys.append((key,))
+            if case_number:
+                buckets.append((bucket, case_number))
+        self.conn.executemany("INSERT OR IGNORE INTO dedup_keys (key) VALUES (?)", keys)
+        self.conn.executemany("INSERT INTO case_buckets (bucket, case_number) VALUES (?, ?)", buckets)
+
+    def bootstrap(self, csv_path, chunk_size=CHUNK_SIZE):
+        """
+        Seeds the index from the notices CSV, one chunk at a time. The index
+        is rebuilt whenever the CSV's size no longer matches what it last saw
+        (first run, a crashed run, or the file edited or removed by hand) or
+        its keys were made by an older KEY_VERSION. Returns True if it was
+        rebuilt.
+        """
+        csv_size = os.path.getsize(csv_path) if os.path.exists(csv_path) else 0
+        meta = dict(self.conn.execute("SELECT name, value FROM index_meta"))
+        if meta.get('csv_size') == str(csv_size) and meta.get('key_version') == str(KEY_VERSION):
+            return False
+        self.conn.execute("DELETE FROM dedup_keys")
+        self.conn.execute("DELETE FROM case_buckets")
+        if csv_size:
+            logger.info(f"Building dedup index from {csv_path}...")
+            for chunk in pd.read_csv(csv_path, dtype=str, keep_default_na=False, chunksize=chunk_size):
+                self._add_frame(chunk)
+        self.mark_synced(csv_path)
+        return True
+
+    def mark_synced(self, csv_path):
+        """Commits accepted keys and records the CSV size and key version they correspond to."""
+        csv_size = os.path.getsize(csv_path) if os.path.exists(csv_path) else 0
+        self.conn.executemany("INSERT OR REPLACE INTO index_meta (name, value) VALUES (?, ?)", [('csv_size', str(csv_size)), ('key_version', str(KEY_VERSION))])
+        self.conn.commit()
+
+    def counts(self):
+        """Flat {'accepted_<rule>'/'rejected_<rule>': count} for metrics."""
+        counts = {f"accepted_{rule}": count for rule, count in self.accepted.items()}
+        counts.update({f"rejected_{rule}": count for rule, count in self.rejected.items()})
+        return counts
+
+    def summary(self):
+        """Per-rule accepted/rejected counts, for the run report."""
+        lines = [f"accepted by {rule}: {count:,}" for rule, count in self.accepted.items()]
+        lines += [f"rejected by {rule}: {count:,}" for rule, count in self.rejected.items() if rule != 'fuzzy_case' or self.fuzzy]
+        return lines
+
+    def close(self):
+        self.conn.close()
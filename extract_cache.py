@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+# --- CONFIGURATION ---
+CACHE_DIRECTORY = "cache"
+MANIFEST_PATH = os.path.join(CACHE_DIRECTORY, "pdf_manifest.json")
+ROWS_DIRECTORY = os.path.join(CACHE_DIRECTORY, "pdf_rows")
+
+# Bump this whenever the extraction/row-splitting logic changes so that
+# cached rows produced by the old logic are re-extracted on the next run.
+EXTRACTOR_VERSION = 3
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(path, data):
+    """Writes JSON to a temp file and renames it over the target."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def load_manifest():
+    """Loads the PDF manifest, or an empty one if none exists yet."""
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest):
+    _write_json_atomic(MANIFEST_PATH, manifest)
+
+
+def _rows_path(pdf_hash):
+    return os.path.join(ROWS_DIRECTORY, f"{pdf_hash}.json")
+
+
+def get_cached_rows(manifest, pdf_filename, pdf_hash):
+    """
+    Returns the cached rows for a PDF if its content hash and the extractor
+    version match the manifest entry, otherwise None.
+    """
+    entry = manifest.get(pdf_filename)
+    if not entry or entry.get("sha256") != pdf_hash or entry.get("extractor_version") != EXTRACTOR_VERSION:
+        return None
+    try:
+        with open(_rows_path(pdf_hash)) as f:
+            return [tuple(row) for row in json.load(f)]
+    except (OSError, ValueError):
+        return None
+
+
+def store_rows(manifest, pdf_filename, pdf_hash, rows, page_count):
+    """Saves a PDF's extracted rows and records it in the manifest."""
+    _write_json_atomic(_rows_path(pdf_hash), [list(row) for row in rows])
+    manifest[pdf_filename] = {
+        "sha256": pdf_hash,
+        "pages": page_count,
+        "rows": len(rows),
+        "extractor_version": EXTRACTOR_VERSION,
+        "extracted_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
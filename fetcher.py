@@ -0,0 +1,281 @@
+"""
+Conditional, concurrent fetching of the OTA scheduled-evictions page and PDFs.
+
+The ETag/Last-Modified of the page and of every PDF are kept in
+cache/fetch_state.json, so a run where nothing changed costs one 304 per
+request. PDFs are streamed to <name>.part files by a thread pool. An
+interrupted download is resumed with a Range request (guarded by If-Range),
+requested uncompressed and checked against Content-Length, and only renamed
+over the real file once complete. A PDF re-uploaded under the same filename is detected by its
+SHA-256, not its name.
+
+Files that are new or whose content changed stay "pending" until the
+pipeline has processed them (mark_processed), so scrape.py can skip the
+whole run when nothing is pending. check_upstream() answers "anything
+new?" with one conditional request and only the standard library, so it
+is cheap enough to poll often. To exercise it offline, serve the fixture
+PDFs with stub_ota.py:
+
+    python stub_ota.py --port 8766
+    python scrape.py --source-url http://127.0.0.1:8766/page/scheduled-evictions
+"""
+import json
+import logging
+import os
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from urllib.parse import quote, urljoin
+
+from extract_cache import file_hash
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+OTA_PAGE_URL = "https://ota.dc.gov/page/scheduled-evictions"
+FETCH_STATE_PATH = os.path.join("cache", "fetch_state.json")
+DEFAULT_WORKERS = 4
+REQUEST_TIMEOUT = 30
+CHECK_TIMEOUT = 10
+CHUNK_SIZE = 1 << 16
+STATUSES = ('new', 'changed', 'unchanged', 'not_modified', 'failed')
+
+
+def load_state(path=FETCH_STATE_PATH):
+    """Loads the fetch state, or an empty one if none exists yet."""
+    if not os.path.exists(path):
+        return {'index': {}, 'pdfs': {}, 'pending': []}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'index': {}, 'pdfs': {}, 'pending': []}
+
+
+def save_state(state, path=FETCH_STATE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def validators(response):
+    """The ETag/Last-Modified a response can later be revalidated with."""
+    return {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+
+
+def conditional_headers(entry):
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+
+def pdf_filename(pdf_url):
+    return pdf_url.split("/")[-1]
+
+
+class LinkParser(HTMLParser):
+    """Collects the href of every <a> tag."""
+
+    def __init__(self):
+        super().__init__()
+        self.hrefs = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.hrefs.append(href)
+
+
+def pdf_links(html, page_url):
+    """Absolute URLs of the PDFs a page links to, in page order without repeats."""
+    parser = LinkParser()
+    parser.feed(html)
+    return list(dict.fromkeys(urljoin(page_url, href) for href in parser.hrefs if href.endswith(".pdf")))
+
+
+def fetch_index(session, page_url, state):
+    """
+    Conditionally fetches the scheduled-evictions page. Returns
+    (page changed, PDF URLs); on a 304 the URLs from the last fetch are used.
+    """
+    entry = state.get('index', {})
+    headers = conditional_headers(entry) if entry.get('url') == page_url else {}
+    response = session.get(page_url, headers=headers, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 304:
+        return False, entry['pdf_urls']
+    response.raise_for_status()
+    pdf_urls = pdf_links(response.text, page_url)
+    state['index'] = {'url': page_url, **validators(response), 'pdf_urls': pdf_urls}
+    return pdf_urls != entry.get('pdf_urls'), pdf_urls
+
+
+def download_pdf(session, pdf_url, directory, entry):
+    """
+    Downloads one PDF unless the server says it is unchanged. Returns
+    (status, new state entry) where status is one of STATUSES other than
+    'failed'; raises on HTTP or transfer errors, leaving any partial file
+    in place to be resumed by the next attempt.
+    """
+    path = os.path.join(directory, pdf_filename(pdf_url))
+    part_path, part_meta_path = f"{path}.part", f"{path}.part.json"
+    # Content-Length and Range count encoded bytes; ask for the file as is.
+    headers = {'Accept-Encoding': 'identity', **(conditional_headers(entry) if os.path.exists(path) else {})}
+
+    # Resume a partial download only if we know which version it belongs to;
+    # If-Range makes the server send the whole file if that version is gone.
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    part_meta = {}
+    if offset and os.path.exists(part_meta_path):
+        with open(part_meta_path) as f:
+            part_meta = json.load(f)
+    if offset and (part_meta.get('etag') or part_meta.get('last_modified')):
+        headers['Range'] = f"bytes={offset}-"
+        headers['If-Range'] = part_meta.get('etag') or part_meta['last_modified']
+
+    with session.get(pdf_url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as response:
+        if response.status_code == 304:
+            return 'not_modified', entry
+        response.raise_for_status()
+        if response.status_code != 206:
+            offset = 0
+            part_meta = validators(response)
+            with open(part_meta_path, "w") as f:
+                json.dump(part_meta, f)
+        # A server that compresses anyway gives no decoded size to check against.
+        encoded = response.headers.get('Content-Encoding', 'identity') != 'identity'
+        expected_size = offset + int(response.headers['Content-Length']) if 'Content-Length' in response.headers and not encoded else None
+        with open(part_path, "ab" if offset else "wb") as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+
+    size = os.path.getsize(part_path)
+    if expected_size is not None and size != expected_size:
+        raise IOError(f"{pdf_url}: got {size:,} of {expected_size:,} bytes")
+    sha256 = file_hash(part_path)
+    previous_sha256 = entry.get('sha256') or (file_hash(path) if os.path.exists(path) else None)
+    if sha256 == previous_sha256 and os.path.exists(path):
+        os.remove(part_path)
+        status = 'unchanged'
+    else:
+        status = 'changed' if os.path.exists(path) else 'new'
+        os.replace(part_path, path)
+    os.remove(part_meta_path)
+    return status, {
+        'url': pdf_url,
+        **part_meta,
+        'sha256': sha256,
+        'size': size,
+        'fetched_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def fetch_pdfs(page_url=OTA_PAGE_URL, directory="pdf_files", workers=DEFAULT_WORKERS, state_path=FETCH_STATE_PATH):
+    """
+    Fetches the page and every PDF it links to, concurrently. Returns
+    {'index_changed': bool, 'pending': [filenames not yet processed],
+    <status>: [filenames]} for each of STATUSES.
+    """
+    # requests is only needed to download, not to check; import it here so
+    # check_upstream() stays standard-library only.
+    from geocoder import make_session
+
+    os.makedirs(directory, exist_ok=True)
+    state = load_state(state_path)
+    session = make_session(workers)
+    index_changed, pdf_urls = fetch_index(session, page_url, state)
+    result = {status: [] for status in STATUSES}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(download_pdf, session, pdf_url, directory, state['pdfs'].get(pdf_filename(pdf_url), {})): pdf_url
+            for pdf_url in pdf_urls
+        }
+        for future in as_completed(futures):
+            filename = pdf_filename(futures[future])
+            try:
+                status, entry = future.result()
+            except Exception as e:
+                logger.error(f"Failed to download {filename}: {e}")
+                result['failed'].append(filename)
+                continue
+            state['pdfs'][filename] = entry
+            result[status].append(filename)
+            if status in ('new', 'changed'):
+                logger.info(f"Downloaded {status} PDF {filename}")
+
+    pending = set(state.get('pending', [])) | set(result['new']) | set(result['changed'])
+    state['pending'] = sorted(pending)
+    save_state(state, state_path)
+    session.close()
+    return {'index_changed': index_changed, 'pending': state['pending'], **{status: sorted(names) for status, names in result.items()}}
+
+
+def mark_processed(still_pending=(), state_path=FETCH_STATE_PATH):
+    """
+    Clears the pending list once the pipeline has taken in the fetched PDFs;
+    PDFs in still_pending (e.g. ones that failed to extract) stay or become
+    pending, so the next run does not skip them.
+    """
+    state = load_state(state_path)
+    state['pending'] = sorted(set(still_pending))
+    save_state(state, state_path)
+
+
+def mark_pending(filenames, state_path=FETCH_STATE_PATH):
+    """Adds PDFs whose rows are extracted but not yet in the CSV to the pending list."""
+    state = load_state(state_path)
+    state['pending'] = sorted(set(state.get('pending', [])) | set(filenames))
+    save_state(state, state_path)
+
+
+def _open(url, headers):
+    # The page's links may contain spaces; urllib (unlike requests) does not quote them.
+    request = urllib.request.Request(quote(url, safe=":/?&=%#+@,;"), headers=headers)
+    try:
+        return urllib.request.urlopen(request, timeout=CHECK_TIMEOUT)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+
+
+def _pdf_modified(pdf_url, entry):
+    """True unless a conditional request for the PDF answers 304."""
+    response = _open(pdf_url, conditional_headers(entry))
+    if response is None:
+        return False
+    response.close()
+    return True
+
+
+def check_upstream(page_url=OTA_PAGE_URL, directory="pdf_files", deep=False, workers=DEFAULT_WORKERS, state_path=FETCH_STATE_PATH):
+    """
+    Quick "anything new?" check that downloads nothing and leaves the state
+    untouched. Returns {'page_modified': bool, 'new': [PDF filenames not
+    fetched yet], 'modified': [...], 'pending': [...]}. With deep=True every
+    known PDF is also revalidated, to catch re-uploads under the same name.
+    """
+    state = load_state(state_path)
+    entry = state.get('index', {})
+    known = state.get('pdfs', {})
+    response = _open(page_url, conditional_headers(entry) if entry.get('url') == page_url else {})
+    if response is None:
+        pdf_urls = entry.get('pdf_urls', [])
+    else:
+        with response:
+            pdf_urls = pdf_links(response.read().decode(response.headers.get_content_charset() or "utf-8", "replace"), page_url)
+    new = [pdf_filename(url) for url in pdf_urls if pdf_filename(url) not in known or not os.path.exists(os.path.join(directory, pdf_filename(url)))]
+    modified = []
+    if deep:
+        to_check = [url for url in pdf_urls if pdf_filename(url) not in new]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            modified = [pdf_filename(url) for url, changed in zip(to_check, executor.map(lambda url: _pdf_modified(url, known[pdf_filename(url)]), to_check)) if changed]
+    return {'page_modified': response is not None, 'new': new, 'modified': modified, 'pending': state.get('pending', [])}
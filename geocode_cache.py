@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import time
+
+# --- CONFIGURATION ---
+CACHE_PATH = os.path.join("cache", "geocode_cache.sqlite")
+NEGATIVE_TTL_DAYS = 30  # how long a "no match" answer is trusted before asking again
+LOOKUP_BATCH_SIZE = 500
+
+RESULT_FIELDS = ("lat", "lng", "ward", "zipcode_api", "quad_api")
+
+
+class GeocodeCache:
+    """
+    On-disk cache of geocoder answers keyed by normalized base address.
+
+    Successful results are kept indefinitely; failures are negative-cached
+    and expire after `negative_ttl_days`. Counters track how each lookup
+    was served for the run summary.
+    """
+
+    def __init__(self, path=CACHE_PATH, negative_ttl_days=NEGATIVE_TTL_DAYS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS geocodes (
+                address TEXT PRIMARY KEY,
+                found INTEGER NOT NULL,
+                lat REAL, lng REAL, ward TEXT, zipcode_api TEXT, quad_api TEXT,
+                fetched_at REAL NOT NULL
+            )"""
+        )
+        self.negative_ttl = negative_ttl_days * 86400
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def lookup(self, addresses):
+        """
+        Splits addresses into cached answers and ones that need the network.
+        Returns ({address: result-or-None}, [missing addresses]).
+        """
+        addresses = list(dict.fromkeys(addresses))
+        cached = {}
+        expiry = time.time() - self.negative_ttl
+        for start in range(0, len(addresses), LOOKUP_BATCH_SIZE):
+            batch = addresses[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT address, found, {', '.join(RESULT_FIELDS)}, fetched_at FROM geocodes WHERE address IN ({placeholders})",
+                batch,
+            )
+            for address, found, *values, fetched_at in rows:
+                if found:
+                    cached[address] = dict(zip(RESULT_FIELDS, values))
+                    self.hits += 1
+                elif fetched_at >= expiry:
+                    cached[address] = None
+                    self.negative_hits += 1
+        missing = [address for address in addresses if address not in cached]
+        self.misses += len(missing)
+        return cached, missing
+
+    def store(self, results):
+        """Saves {address: result-or-None} answers from the geocoder."""
+        now = time.time()
+        rows = []
+        for address, result in results.items():
+            values = [result.get(field) for field in RESULT_FIELDS] if result else [None] * len(RESULT_FIELDS)
+            rows.append((address, int(result is not None), *values, now))
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO geocodes (address, found, {', '.join(RESULT_FIELDS)}, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def close(self):
+        self.conn.close()
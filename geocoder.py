@@ -0,0 +1,147 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+# Override DC_GEOCODING_API_URL to point the geocoder at a local stub server.
+DC_GEOCODING_API_URL = os.environ.get(
+    "DC_GEOCODING_API_URL",
+    "https://citizenatlas.dc.gov/newwebservices/locationverifier.asmx/findLocation2",
+)
+DEFAULT_WORKERS = 8
+DEFAULT_RATE_LIMIT = 10.0  # requests per second across all workers
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls evenly at `rate` per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            slot = max(self._next_slot, time.monotonic())
+            self._next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def make_session(pool_size=DEFAULT_WORKERS):
+    """
+    Builds a keep-alive session whose connection pool fits every worker and
+    which retries transient failures with exponential backoff.
+    """
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET"]),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def parse_geocode_response(data):
+    """Pulls lat/lng/ward/zip/quad out of a findLocation2 JSON response."""
+    if data and data.get('returnDataset') and data['returnDataset'].get('Table1'):
+        result = data['returnDataset']['Table1'][0]
+        lat, lon = result.get('LATITUDE'), result.get('LONGITUDE')
+        if not (lat and lon and 38.8 < lat < 39.0 and -77.2 < lon < -76.9): return None
+
+        ward_num_raw = result.get('WARD_2012') or result.get('WARD_2002')
+        ward_num = str(ward_num_raw).replace('Ward ', '').strip()
+
+        return {
+            "lat": lat,
+            "lng": lon,
+            "ward": f"Ward {ward_num}",
+            "zipcode_api": result.get('ZIPCODE'),
+            "quad_api": result.get('QUADRANT')
+        }
+    return None
+
+
+def geocode_address(address, session, base_url=DC_GEOCODING_API_URL, metrics=None):
+    """
+    Geocodes one address. Returns the parsed result, or None when the API
+    has no usable match. Transport and decoding errors are raised. With a
+    RunMetrics, records the request latency (including retries) and the
+    number of HTTP retries.
+    """
+    url = f"{base_url}?str={quote(address)}&f=json"
+    start = time.perf_counter()
+    try:
+        response = session.get(url, timeout=REQUEST_TIMEOUT)
+    except requests.exceptions.RequestException:
+        if metrics is not None:
+            # Requests only fail here once the retry budget is exhausted.
+            metrics.count('geocode_http_retries', MAX_RETRIES)
+        raise
+    finally:
+        if metrics is not None:
+            metrics.observe('geocode_latency_ms', (time.perf_counter() - start) * 1000)
+    if metrics is not None:
+        retries = getattr(response.raw, 'retries', None)
+        metrics.count('geocode_http_retries', len(retries.history) if retries else 0)
+    response.raise_for_status()
+    return parse_geocode_response(response.json())
+
+
+def geocode_many(addresses, workers=DEFAULT_WORKERS, rate_limit=DEFAULT_RATE_LIMIT, base_url=DC_GEOCODING_API_URL, session=None, metrics=None):
+    """
+    Geocodes unique addresses concurrently over one pooled session.
+
+    Returns {address: result-or-None}. Addresses whose requests still failed
+    after retries are left out, so callers can tell "no match" apart from
+    "could not ask".
+    """
+    addresses = list(dict.fromkeys(addresses))
+    if not addresses:
+        return {}
+    workers = max(1, workers)
+    session = session or make_session(workers)
+    limiter = RateLimiter(rate_limit)
+    results = {}
+    errors = 0
+
+    def task(address):
+        limiter.wait()
+        return geocode_address(address, session, base_url, metrics)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(task, address): address for address in addresses}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Geocoding"):
+            address = futures[future]
+            try:
+                results[address] = future.result()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                errors += 1
+                logger.debug(f"Geocoding request failed for {address}: {e}")
+    if errors:
+        logger.warning(f"{errors:,} geocoding requests failed after retries")
+    if metrics is not None:
+        metrics.count('geocode_requests', len(addresses))
+        metrics.count('geocode_request_errors', errors)
+    return results
@@ -0,0 +1,173 @@
+"""
+In-process geocoder over a local snapshot of DC address points.
+
+A snapshot is a CSV of base addresses (the form parse_address_series
+produces, e.g. "2442 MARTIN LUTHER KING JR AVE SE") with lat, lng, ward,
+zipcode and quad columns. It can be built from our own enriched output or
+from a Master Address Repository export:
+
+    python local_geocoder.py build --from-enriched eviction_data_ward.csv
+    python local_geocoder.py build --from-mar Address_Points.csv
+
+Lookups are a dict hit on (house number, street, quadrant), with spaces
+removed from the street so OCR splits like "V AN B UREN" still match. On a
+miss, a trigram index over street names finds near spellings (e.g.
+CONNETICUT, MCARUTHUR) that have the same house number and quadrant.
+"""
+import argparse
+import os
+import re
+
+import pandas as pd
+
+from address_normalize import parse_address_series
+
+# --- CONFIGURATION ---
+SNAPSHOT_PATH = os.path.join("data", "address_points.csv")
+SNAPSHOT_COLUMNS = ['address', 'lat', 'lng', 'ward', 'zipcode', 'quad']
+MAR_COLUMNS = {'FULLADDRESS': 'address', 'LATITUDE': 'lat', 'LONGITUDE': 'lng', 'WARD': 'ward', 'ZIPCODE': 'zipcode', 'QUADRANT': 'quad'}
+MIN_SIMILARITY = 0.6  # Dice coefficient over street trigrams for a fuzzy match (MCARUTHUR BLVD scores 0.64)
+MAX_CANDIDATES = 5
+
+NUMBER_PATTERN = re.compile(r'^\d+[A-Z]?$')
+QUADS = {'NE', 'NW', 'SE', 'SW'}
+
+
+def address_key(address):
+    """(house number, street without spaces, quadrant) for a base address, or None."""
+    if not isinstance(address, str):
+        return None
+    tokens = address.upper().split()
+    if len(tokens) < 2 or not NUMBER_PATTERN.match(tokens[0]):
+        return None
+    quad = tokens[-1] if tokens[-1] in QUADS else ''
+    street = ''.join(tokens[1:-1] if quad else tokens[1:])
+    return (tokens[0], street, quad) if street else None
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LocalGeocoder:
+    """
+    Hash and trigram indexes over a snapshot. lookup() answers in the same
+    shape as geocoder.parse_geocode_response, or None on a miss.
+    """
+
+    def __init__(self, snapshot):
+        self.points = {}
+        for row in snapshot[SNAPSHOT_COLUMNS].itertuples(index=False):
+            key = address_key(row.address)
+            if key is None or pd.isna(row.lat) or pd.isna(row.lng):
+                continue
+            self.points.setdefault(key, {
+                "lat": float(row.lat),
+                "lng": float(row.lng),
+                "ward": row.ward if isinstance(row.ward, str) else None,
+                "zipcode_api": str(int(float(row.zipcode))) if pd.notna(row.zipcode) else None,
+                "quad_api": row.quad if isinstance(row.quad, str) else None,
+            })
+        self.streets = sorted({street for _, street, _ in self.points})
+        self.street_trigrams = [trigrams(street) for street in self.streets]
+        self.trigram_index = {}
+        for street_id, grams in enumerate(self.street_trigrams):
+            for gram in grams:
+                self.trigram_index.setdefault(gram, []).append(street_id)
+        self.similar_cache = {}
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_csv(cls, path=SNAPSHOT_PATH):
+        return cls(pd.read_csv(path, dtype={'address': str, 'ward': str, 'quad': str}))
+
+    def __len__(self):
+        return len(self.points)
+
+    def similar_streets(self, street):
+        """Snapshot streets ranked by trigram similarity to street, best first."""
+        if street not in self.similar_cache:
+            grams = trigrams(street)
+            shared = {}
+            for gram in grams:
+                for street_id in self.trigram_index.get(gram, ()):
+                    shared[street_id] = shared.get(street_id, 0) + 1
+            scored = []
+            for street_id, count in shared.items():
+                score = 2 * count / (len(grams) + len(self.street_trigrams[street_id]))
+                if score >= MIN_SIMILARITY:
+                    scored.append((score, self.streets[street_id]))
+            scored.sort(reverse=True)
+            self.similar_cache[street] = [candidate for _, candidate in scored[:MAX_CANDIDATES]]
+        return self.similar_cache[street]
+
+    def lookup(self, address):
+        key = address_key(address)
+        if key is None:
+            self.misses += 1
+            return None
+        result = self.points.get(key)
+        if result is not None:
+            self.exact_hits += 1
+            return result
+        number, street, quad = key
+        for candidate in self.similar_streets(street):
+            result = self.points.get((number, candidate, quad))
+            if result is not None:
+                self.fuzzy_hits += 1
+                return result
+        self.misses += 1
+        return None
+
+    def lookup_many(self, addresses):
+        """Returns ({address: result} for hits, [addresses not found])."""
+        found, missing = {}, []
+        for address in addresses:
+            result = self.lookup(address)
+            if result is None:
+                missing.append(address)
+            else:
+                found[address] = result
+        return found, missing
+
+
+def snapshot_from_enriched(path):
+    """Address points from a previous add_ward.py output (geocoded rows only)."""
+    df = pd.read_csv(path, dtype=str)
+    df = df.rename(columns={'address_base': 'address'})[SNAPSHOT_COLUMNS]
+    return df[df['lat'].notna() & df['lng'].notna()].drop_duplicates(subset=['address'])
+
+
+def snapshot_from_mar(path):
+    """Address points from a DC Master Address Repository CSV export."""
+    df = pd.read_csv(path, dtype=str, usecols=list(MAR_COLUMNS)).rename(columns=MAR_COLUMNS)
+    df['address'] = parse_address_series(df['address'])['address_base']
+    df['ward'] = df['ward'].where(df['ward'].isna() | df['ward'].str.startswith('Ward'), 'Ward ' + df['ward'])
+    return df[SNAPSHOT_COLUMNS].dropna(subset=['address', 'lat', 'lng']).drop_duplicates(subset=['address'])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the local address-point snapshot")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="write a snapshot CSV")
+    source = build.add_mutually_exclusive_group(required=True)
+    source.add_argument("--from-enriched", help="add_ward.py output to take geocoded addresses from")
+    source.add_argument("--from-mar", help="Master Address Repository address points CSV")
+    build.add_argument("--output", default=SNAPSHOT_PATH)
+    query = commands.add_parser("lookup", help="look addresses up in a snapshot")
+    query.add_argument("addresses", nargs="+")
+    query.add_argument("--snapshot", default=SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        snapshot = snapshot_from_enriched(args.from_enriched) if args.from_enriched else snapshot_from_mar(args.from_mar)
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        snapshot.to_csv(args.output, index=False)
+        print(f"Wrote {len(snapshot):,} address points to {args.output}")
+    else:
+        geocoder = LocalGeocoder.from_csv(args.snapshot)
+        for address in args.addresses:
+            print(f"{address}: {geocoder.lookup(address)}")
@@ -0,0 +1,256 @@
+"""
+Precomputed map layers for the eviction map.
+
+Reads eviction_data_ward.csv once and aggregates it with vectorized
+group-bys into small files a browser can load instead of every raw point:
+
+    grid/<slice>.geojson  heatmap: evictions per square cell of about
+                          GRID_CELL_METERS, as weighted points at the cell centres
+    wards.json            choropleth: evictions per ward for every slice
+    wards.geojson         ward polygons with their overall counts (--ward-vintage)
+    buildings.geojson     one point per base address (units merged) with its
+                          count, ward and first/last eviction dates
+    index.json            the slices, their row counts and the grid geometry
+
+A slice is a month ("2024-05"), a year ("2024") or "all". Coordinates are
+quantized to COORDINATE_PRECISION decimals and written without whitespace.
+A fingerprint of each slice's rows (count plus a sum of row hashes) is kept
+in cache/map_layers.json, so a run only rewrites the slices whose rows
+were added, removed or re-geocoded:
+
+    python map_layers.py
+    python map_layers.py --ward-vintage 2022
+    python map_layers.py --force
+"""
+import argparse
+import json
+import math
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from wards import WARD_PROPERTIES, boundary_file, ward_label
+
+# --- CONFIGURATION ---
+INPUT_CSV_PATH = 'eviction_data_ward.csv'
+OUTPUT_DIRECTORY = 'map_layers'
+STATE_PATH = os.path.join("cache", "map_layers.json")
+GRID_CELL_METERS = 250
+GRID_ORIGIN = (-77.12, 38.79)  # (lng, lat) south-west of DC, so cell ids never change
+GRID_LATITUDE = 38.9  # cells are square here, DC's centre
+COORDINATE_PRECISION = 5  # decimals, about 1 m
+ALL_SLICE = 'all'
+# Columns whose change makes a row's slices stale.
+FINGERPRINT_COLUMNS = ['case_number', 'eviction_date', 'address_original', 'address_base', 'lat', 'lng', 'ward']
+METERS_PER_DEGREE = 111_320
+
+
+def grid_steps(cell_meters=GRID_CELL_METERS):
+    """(lng step, lat step) in degrees for square cells of cell_meters at GRID_LATITUDE."""
+    lat_step = cell_meters / METERS_PER_DEGREE
+    return lat_step / math.cos(math.radians(GRID_LATITUDE)), lat_step
+
+
+def load_rows(csv_path=INPUT_CSV_PATH):
+    """The enriched rows with the month and year slice of each."""
+    df = pd.read_csv(csv_path, usecols=FINGERPRINT_COLUMNS, dtype=str, keep_default_na=False, na_values=[''])
+    df['lat'] = pd.to_numeric(df['lat'], errors='coerce')
+    df['lng'] = pd.to_numeric(df['lng'], errors='coerce')
+    df['ward'] = df['ward'].map(ward_label, na_action='ignore')
+    df['month'] = df['eviction_date'].str[:7]
+    df['year'] = df['eviction_date'].str[:4]
+    return df
+
+
+def slice_fingerprints(df):
+    """{slice: 'rows:hash'} for every month, year and the whole table."""
+    hashes = pd.util.hash_pandas_object(df[FINGERPRINT_COLUMNS], index=False).to_numpy()
+
+    def fingerprint(positions):
+        return f"{len(positions)}:{int(np.add.reduce(hashes[positions], dtype=np.uint64)):016x}"
+
+    fingerprints = {ALL_SLICE: fingerprint(np.arange(len(df)))}
+    for column in ('year', 'month'):
+        for value, positions in df.groupby(column).indices.items():
+            fingerprints[value] = fingerprint(positions)
+    return fingerprints
+
+
+def point(lng, lat, properties):
+    return {
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [round(float(lng), COORDINATE_PRECISION), round(float(lat), COORDINATE_PRECISION)]},
+        'properties': properties,
+    }
+
+
+def quantize(coordinates):
+    """Rounds every position of a GeoJSON coordinates array."""
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        return [round(value, COORDINATE_PRECISION) for value in coordinates]
+    return [quantize(part) for part in coordinates]
+
+
+def write_json(path, data):
+    """Writes compact JSON to a temp file and renames it over the target."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def read_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def grid_path(output_directory, slice_name):
+    return os.path.join(output_directory, "grid", f"{slice_name}.geojson")
+
+
+def grid_layers(df, slices, steps=None):
+    """{slice: FeatureCollection of cell-centre points weighted by count} for the given slices."""
+    lng_step, lat_step = steps or grid_steps()
+    located = df[df['lat'].notna() & df['lng'].notna()].copy()
+    located['cx'] = np.floor((located['lng'].to_numpy() - GRID_ORIGIN[0]) / lng_step).astype(int)
+    located['cy'] = np.floor((located['lat'].to_numpy() - GRID_ORIGIN[1]) / lat_step).astype(int)
+    counts = []
+    for column in ('month', 'year'):
+        in_slices = located[located[column].isin(slices)]
+        counts.append(in_slices.groupby([column, 'cx', 'cy']).size().rename_axis(['slice', 'cx', 'cy']))
+    if ALL_SLICE in slices:
+        counts.append(pd.concat({ALL_SLICE: located.groupby(['cx', 'cy']).size()}, names=['slice']))
+    counts = pd.concat(counts).reset_index(name='n')
+    counts['lng'] = GRID_ORIGIN[0] + (counts['cx'] + 0.5) * lng_step
+    counts['lat'] = GRID_ORIGIN[1] + (counts['cy'] + 0.5) * lat_step
+
+    layers = {slice_name: [] for slice_name in slices}
+    for slice_name, lng, lat, n in zip(counts['slice'], counts['lng'], counts['lat'], counts['n']):
+        layers[slice_name].append(point(lng, lat, {'n': int(n)}))
+    return {slice_name: {'type': 'FeatureCollection', 'features': features} for slice_name, features in layers.items()}
+
+
+def ward_counts(df, slices):
+    """{slice: {ward: count}} for the given slices; rows without a ward are left out."""
+    with_ward = df[df['ward'].notna()]
+    counts = {}
+    if ALL_SLICE in slices:
+        counts[ALL_SLICE] = {ward: int(n) for ward, n in with_ward['ward'].value_counts().sort_index().items()}
+    for column in ('month', 'year'):
+        in_slices = with_ward[with_ward[column].isin(slices)]
+        for (slice_name, ward), n in in_slices.groupby([column, 'ward']).size().items():
+            counts.setdefault(slice_name, {})[ward] = int(n)
+    return counts
+
+
+def ward_polygons(path, counts):
+    """Ward boundaries from a GeoJSON file, quantized, with each ward's overall count."""
+    with open(path) as f:
+        collection = json.load(f)
+    features = []
+    for feature in collection['features']:
+        properties = feature.get('properties') or {}
+        name = next((key for key in WARD_PROPERTIES if key in properties), None)
+        ward = ward_label(properties[name]) if name else None
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': feature['geometry']['type'], 'coordinates': quantize(feature['geometry']['coordinates'])},
+            'properties': {'ward': ward, 'n': counts.get(ALL_SLICE, {}).get(ward, 0)},
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def building_layer(df):
+    """One point per base address at the mean of its units' coordinates."""
+    located = df[df['lat'].notna() & df['lng'].notna() & df['address_base'].notna()]
+    buildings = located.groupby('address_base').agg(
+        n=('lat', 'size'), lat=('lat', 'mean'), lng=('lng', 'mean'), ward=('ward', 'first'),
+        first=('eviction_date', 'min'), last=('eviction_date', 'max'),
+    ).sort_values('n', ascending=False)
+    features = [
+        point(row.lng, row.lat, {'address': address, 'n': int(row.n), 'ward': row.ward if isinstance(row.ward, str) else None, 'first': row.first, 'last': row.last})
+        for address, row in zip(buildings.index, buildings.itertuples(index=False))
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def build_layers(csv_path=INPUT_CSV_PATH, output_directory=OUTPUT_DIRECTORY, state_path=STATE_PATH, ward_vintage=None, force=False):
+    """
+    Rebuilds the layers of every slice whose rows changed since the last
+    run, or of every slice if any layer file is missing. Returns {'rebuilt': [slices],
+    'removed': [slices], 'unchanged': count}.
+    """
+    df = load_rows(csv_path)
+    fingerprints = slice_fingerprints(df)
+    steps = grid_steps()
+    settings = {'cell_meters': GRID_CELL_METERS, 'origin': list(GRID_ORIGIN), 'precision': COORDINATE_PRECISION}
+    state = read_json(state_path, {})
+    previous = state.get('slices', {}) if state.get('settings') == settings and not force else {}
+    # Changed slices are patched into the existing files, so a missing file
+    # (deleted, or a fresh output directory next to an old state file) means
+    # rebuilding everything rather than publishing only the changed slices.
+    outputs = [os.path.join(output_directory, name) for name in ("wards.json", "buildings.geojson")]
+    outputs += [grid_path(output_directory, slice_name) for slice_name in previous]
+    if not all(os.path.exists(path) for path in outputs):
+        previous = {}
+
+    stale = sorted(slice_name for slice_name, fingerprint in fingerprints.items() if previous.get(slice_name) != fingerprint)
+    removed = sorted(set(previous) - set(fingerprints))
+    for slice_name in removed:
+        if os.path.exists(grid_path(output_directory, slice_name)):
+            os.remove(grid_path(output_directory, slice_name))
+
+    if stale:
+        for slice_name, layer in grid_layers(df, set(stale), steps).items():
+            write_json(grid_path(output_directory, slice_name), layer)
+    wards_path = os.path.join(output_directory, "wards.json")
+    counts = {} if not previous else read_json(wards_path, {})
+    for slice_name in removed:
+        counts.pop(slice_name, None)
+    counts.update(ward_counts(df, set(stale)))
+    if stale or removed or not os.path.exists(wards_path):
+        write_json(wards_path, dict(sorted(counts.items())))
+    buildings_path = os.path.join(output_directory, "buildings.geojson")
+    if ALL_SLICE in stale or not os.path.exists(buildings_path):
+        write_json(buildings_path, building_layer(df))
+    polygons_stale = ALL_SLICE in stale or state.get('ward_vintage') != ward_vintage or not os.path.exists(os.path.join(output_directory, "wards.geojson"))
+    if ward_vintage and polygons_stale:
+        write_json(os.path.join(output_directory, "wards.geojson"), ward_polygons(boundary_file(ward_vintage), counts))
+
+    write_json(os.path.join(output_directory, "index.json"), {
+        'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'grid': {'cell_meters': GRID_CELL_METERS, 'origin': list(GRID_ORIGIN), 'cell_degrees': [round(step, 8) for step in steps]},
+        'slices': {slice_name: {'rows': int(fingerprint.split(':')[0]), 'grid': f"grid/{slice_name}.geojson"} for slice_name, fingerprint in sorted(fingerprints.items())},
+        'layers': ['wards.json', 'buildings.geojson'] + (['wards.geojson'] if ward_vintage else []),
+    })
+    write_json(state_path, {'settings': settings, 'ward_vintage': ward_vintage, 'slices': fingerprints})
+    return {'rebuilt': stale, 'removed': removed, 'unchanged': len(fingerprints) - len(stale)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute heatmap, ward and building map layers")
+    parser.add_argument("--csv", default=INPUT_CSV_PATH)
+    parser.add_argument("--output", default=OUTPUT_DIRECTORY, help="directory for the layer files")
+    parser.add_argument("--ward-vintage", help="also write ward polygons from data/boundaries/wards_<VINTAGE>.geojson (downloaded from DC GIS on first use)")
+    parser.add_argument("--force", action="store_true", help="rebuild every slice")
+    args = parser.parse_args(argv)
+
+    try:
+        result = build_layers(args.csv, args.output, ward_vintage=args.ward_vintage, force=args.force)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"Rebuilt {len(result['rebuilt'])} slices, {result['unchanged']} unchanged, {len(result['removed'])} removed")
+    if result['rebuilt']:
+        print(f"  {', '.join(result['rebuilt'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
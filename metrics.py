@@ -0,0 +1,149 @@
+"""
+Run instrumentation shared by scrape.py and add_ward.py.
+
+A RunMetrics records per-stage wall time, CPU time and peak RSS, named
+counters, latency samples and per-PDF/per-page extraction timings, and
+writes them as one JSON report per run. The previous report is kept next
+to it so two runs can be compared:
+
+    python metrics.py diff cache/metrics/scrape.previous.json cache/metrics/scrape.json
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# --- CONFIGURATION ---
+METRICS_DIRECTORY = os.path.join("cache", "metrics")
+PERCENTILES = (50, 95, 99)
+SLOWEST_PAGES = 5
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (Linux reports KB)."""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def percentiles(samples, points=PERCENTILES):
+    """Nearest-rank percentiles of a list of numbers."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {f"p{p}": round(ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))], 2) for p in points}
+
+
+class RunMetrics:
+    """Collects one run's measurements; safe to update from worker threads."""
+
+    def __init__(self, script):
+        self.script = script
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.start = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self.samples = {}
+        self.pdfs = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Times the enclosed block as a stage (repeated stages accumulate)."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+            entry['wall_seconds'] = round(entry['wall_seconds'] + time.perf_counter() - wall, 3)
+            entry['cpu_seconds'] = round(entry['cpu_seconds'] + time.process_time() - cpu, 3)
+            entry['peak_rss_mb'] = peak_rss_mb()
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, value):
+        """Adds one sample (e.g. a request latency in ms) to a distribution."""
+        with self.lock:
+            self.samples.setdefault(name, []).append(value)
+
+    def record_pdf(self, pdf_filename, stats):
+        """Keeps one PDF's extraction stats, with its slowest pages."""
+        page_seconds = stats.get('page_seconds', [])
+        slowest = sorted(range(len(page_seconds)), key=page_seconds.__getitem__, reverse=True)[:SLOWEST_PAGES]
+        self.pdfs[pdf_filename] = {
+            'pages': stats['pages'],
+            'ocr_pages': stats['ocr_pages'],
+            'ocr_cache_hits': stats['ocr_cache_hits'],
+            'ocr_failed_pages': stats.get('ocr_failed_pages', 0),
+            'ocr_failed_page_numbers': stats.get('ocr_failed_page_numbers', []),
+            'deduplicated_pages': stats.get('deduplicated_pages', 0),
+            'wall_seconds': round(stats.get('seconds', 0.0), 3),
+            'cpu_seconds': round(stats.get('cpu_seconds', 0.0), 3),
+            'seconds_per_page': round(stats.get('seconds', 0.0) / stats['pages'], 4) if stats['pages'] else 0.0,
+            'slowest_pages': [{'page': i + 1, 'seconds': round(page_seconds[i], 3)} for i in slowest],
+        }
+
+    def report(self):
+        return {
+            'script': self.script,
+            'started_at': self.started_at,
+            'wall_seconds': round(time.perf_counter() - self.start, 3),
+            'cpu_seconds': round(time.process_time(), 3),
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': self.stages,
+            'counters': dict(sorted(self.counters.items())),
+            'distributions': {name: {'count': len(values), **percentiles(values)} for name, values in self.samples.items()},
+            'pdfs': self.pdfs,
+        }
+
+    def write(self, directory=METRICS_DIRECTORY):
+        """Writes <script>.json, moving the last report to <script>.previous.json."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.script}.json")
+        if os.path.exists(path):
+            os.replace(path, os.path.join(directory, f"{self.script}.previous.json"))
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+            f.write("\n")
+        return path
+
+
+def diff_reports(before, after):
+    """Lines comparing stage times, counters and per-PDF seconds/page of two reports."""
+    lines = []
+    for name, stage in after['stages'].items():
+        old = before.get('stages', {}).get(name)
+        if old and old['wall_seconds']:
+            lines.append(f"stage {name}: {old['wall_seconds']:.2f}s -> {stage['wall_seconds']:.2f}s ({stage['wall_seconds'] / old['wall_seconds']:.1f}x)")
+        else:
+            lines.append(f"stage {name}: {stage['wall_seconds']:.2f}s (new)")
+    for name, value in after['counters'].items():
+        old = before.get('counters', {}).get(name, 0)
+        if value != old:
+            lines.append(f"counter {name}: {old:,} -> {value:,}")
+    for name, pdf in after['pdfs'].items():
+        old = before.get('pdfs', {}).get(name)
+        if old and old['seconds_per_page']:
+            lines.append(f"pdf {name}: {old['seconds_per_page']:.3f} -> {pdf['seconds_per_page']:.3f} s/page")
+        else:
+            lines.append(f"pdf {name}: {pdf['seconds_per_page']:.3f} s/page over {pdf['pages']} pages (new)")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two run metrics reports")
+    commands = parser.add_subparsers(dest="command", required=True)
+    diff = commands.add_parser("diff")
+    diff.add_argument("before")
+    diff.add_argument("after")
+    args = parser.parse_args()
+    if not os.path.exists(args.before):
+        print(f"No previous report at {args.before}")
+        sys.exit(0)
+    with open(args.before) as f_before, open(args.after) as f_after:
+        print("\n".join(diff_reports(json.load(f_before), json.load(f_after))))
@@ -0,0 +1,490 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pdfplumber
+import pytesseract
+from pdfminer.pdftypes import PDFStream, resolve1
+
+from extract_cache import EXTRACTOR_VERSION
+from row_parser import COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+MAX_WORKERS = 8
+PAGES_PER_TASK = 2
+OCR_CACHE_DIRECTORY = os.path.join("cache", "ocr")
+# Extracted tables per page fingerprint, shared by every PDF. OTA's lists
+# are cumulative, so most pages of a new PDF were already seen in an
+# earlier one. Versioned so a changed extractor never reuses old results.
+PAGE_CACHE_DIRECTORY = os.path.join("cache", "pages", f"v{EXTRACTOR_VERSION}")
+# Header labels of each column. Some PDFs misspell them or run two together
+# ("Evic9on Date", "ZipcodeEviction"), so they are matched in the header
+# line's characters rather than as whole words. Notes are read but dropped.
+HEADER_LABELS = (
+    ('Case Number', re.compile(r'Case\s*Number')),
+    ('Defendant Address', re.compile(r'Defendant\s*Address')),
+    ('Quad', re.compile(r'Quad')),
+    ('Zipcode', re.compile(r'Zip\s*code')),
+    ('Eviction Date', re.compile(r'Evic\w*\s*Date')),
+    ('Notes', re.compile(r'Notes', re.IGNORECASE)),
+)
+MIN_HEADER_LABELS = 4
+TEMPLATE_SEARCH_PAGES = 3  # the header row is on the first page
+LINE_TOLERANCE = 3  # words whose tops are this close (in points) share a row
+
+
+def default_workers():
+    """One worker per core, capped at MAX_WORKERS."""
+    return max(1, min(os.cpu_count() or 1, MAX_WORKERS))
+
+
+def enhanced_table_extraction(page):
+    """Extracts tables or lines of text from a page."""
+    tables = []
+    try:
+        settings = {"vertical_strategy": "text", "horizontal_strategy": "text"}
+        page_tables = page.extract_tables(table_settings=settings)
+        if page_tables:
+            for table in page_tables:
+                if table and len(table) > 1:
+                    tables.append(table)
+    except Exception as e:
+        logger.warning(f"Standard table extraction failed: {e}")
+    if not tables:
+        try:
+            text = page.extract_text()
+            if text:
+                lines = [line.strip() for line in text.split('\n') if line.strip()]
+                if lines:
+                    tables.append(lines)
+        except Exception as e:
+            logger.warning(f"Text-based extraction failed: {e}")
+    return tables
+
+
+def text_lines(words):
+    """Groups words into lines by their top, each line left to right."""
+    lines = []
+    for word in sorted(words, key=lambda word: word['top']):
+        if lines and word['top'] - lines[-1][0]['top'] <= LINE_TOLERANCE:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return [sorted(line, key=lambda word: word['x0']) for line in lines]
+
+
+def header_labels(line):
+    """
+    [(column, x0, x1)] of the header labels in a line of words, left to
+    right, measured from the labels' own characters.
+    """
+    text, spans = "", []
+    for word in line:
+        if spans:
+            text += " "
+            spans.append((spans[-1][1], word['x0']))
+        for char in word['chars']:
+            text += char['text']
+            spans.extend([(char['x0'], char['x1'])] * len(char['text']))
+    labels = [
+        (column, spans[match.start()][0], spans[match.end() - 1][1])
+        for column, pattern in HEADER_LABELS
+        for match in pattern.finditer(text)
+    ]
+    return sorted(labels, key=lambda label: label[1])
+
+
+def find_header(lines):
+    """(index of the header line, its labels), or (None, None) if no line is a header."""
+    for i, line in enumerate(lines):
+        labels = header_labels(line)
+        if len({column for column, _, _ in labels}) >= MIN_HEADER_LABELS:
+            return i, labels
+    return None, None
+
+
+def column_boundaries(labels, lines):
+    """
+    Left edge of each labelled column on a page. Labels may be centred
+    over their values, offset from them or run together, so each boundary
+    is placed, between two neighbouring labels' centres, in the middle of
+    the widest stretch crossed by the fewest words of the page's rows
+    (normally none; a cell printed against the next one is split later).
+    """
+    events = sorted([(word['x0'], 1) for line in lines for word in line] + [(word['x1'], -1) for line in lines for word in line])
+    segments, crossing, previous = [], 0, float('-inf')
+    for x, delta in events:
+        if x > previous:
+            segments.append((previous, x, crossing))
+            previous = x
+        crossing += delta
+    segments.append((previous, float('inf'), 0))
+
+    boundaries = [float('-inf')]
+    for (_, left_x0, left_x1), (_, right_x0, right_x1) in zip(labels, labels[1:]):
+        left, right = (left_x0 + left_x1) / 2, (right_x0 + right_x1) / 2
+        clipped = [(max(start, left), min(end, right), count) for start, end, count in segments if start < right and end > left]
+        if not clipped:
+            boundaries.append((left_x1 + right_x0) / 2)
+            continue
+        fewest = min(count for _, _, count in clipped)
+        runs = []
+        for start, end, count in clipped:
+            if count != fewest:
+                continue
+            if runs and runs[-1][1] == start:
+                runs[-1][1] = end
+            else:
+                runs.append([start, end])
+        start, end = max(runs, key=lambda run: run[1] - run[0])
+        boundaries.append((start + end) / 2)
+    return boundaries
+
+
+def column_table(lines, labels):
+    """
+    A column table ({'rows': [[cell per COLUMNS entry]]}) of lines of words:
+    each word goes to the column whose span holds it, so fields come
+    straight from the layout. Columns the PDF lacks are left empty.
+    """
+    boundaries = column_boundaries(labels, lines)
+
+    def column_at(x):
+        return next(labels[i][0] for i in range(len(labels) - 1, -1, -1) if boundaries[i] <= x)
+
+    rows = []
+    for line in lines:
+        cells = {}
+        for word in line:
+            column = column_at(word['x0'])
+            if column == column_at(word['x1']):
+                cells.setdefault(column, []).append(word['text'])
+                continue
+            # Two cells printed without a gap read as one word; split its characters.
+            parts = {}
+            for char in word['chars']:
+                parts.setdefault(column_at((char['x0'] + char['x1']) / 2), []).append(char['text'])
+            for column, chars in parts.items():
+                cells.setdefault(column, []).append(''.join(chars))
+        rows.append([' '.join(cells.get(column, [])) for column in COLUMNS])
+    return {'rows': rows}
+
+
+def pdf_column_template(pdf):
+    """
+    The header labels of a PDF's first page with a header row, for its
+    later pages that have no header of their own; [] if it has none.
+    """
+    for page in pdf.pages[:TEMPLATE_SEARCH_PAGES]:
+        _, labels = find_header(text_lines(page.extract_words(return_chars=True)))
+        if labels:
+            return labels
+    return []
+
+
+def layout_table_extraction(page, column_template=None):
+    """
+    Reads a text-layer page's words once and splits them into columns by
+    x-position, using the page's own header row or else the PDF's column
+    template (a callable returning header labels, or None). Returns the
+    page's tables, or None if no column layout is known.
+    """
+    lines = text_lines(page.extract_words(return_chars=True))
+    header_index, labels = find_header(lines)
+    if labels:
+        lines = lines[header_index + 1:]
+    elif column_template:
+        labels = column_template()
+    if not labels:
+        return None
+    table = column_table(lines, labels)
+    return [table] if table['rows'] else []
+
+
+def has_text_layer(page):
+    """
+    Classifies a page from its character objects alone, without running
+    layout analysis or rendering it. Pages with no visible characters are
+    image-only and can only be read with OCR.
+    """
+    return any(not char['text'].isspace() for char in page.chars)
+
+
+def page_fingerprint(page):
+    """
+    Hash of a page as stored in the PDF: its content streams plus the
+    images and fonts they draw with, read from the PDF objects without any
+    layout analysis. Fonts are included because the same content stream
+    bytes can spell different text under a different font subset.
+    """
+    page_obj = page.page_obj
+    digest = hashlib.sha256()
+    for stream in page_obj.contents:
+        stream = resolve1(stream)
+        if isinstance(stream, PDFStream):
+            digest.update(stream.get_data())
+    resources = resolve1(page_obj.resources) or {}
+    for kind in ('XObject', 'Font'):
+        for name, obj in sorted((resolve1(resources.get(kind)) or {}).items()):
+            obj = resolve1(obj)
+            digest.update(f"{kind}/{name}".encode())
+            if isinstance(obj, PDFStream):
+                digest.update(obj.get_rawdata() or b'')
+            elif isinstance(obj, dict):
+                digest.update(repr(obj.get('BaseFont')).encode() + repr(obj.get('Encoding')).encode())
+                to_unicode = resolve1(obj.get('ToUnicode'))
+                if isinstance(to_unicode, PDFStream):
+                    digest.update(to_unicode.get_data())
+    return f"s{digest.hexdigest()}"
+
+
+def text_fingerprint(page):
+    """
+    Hash of a text-layer page's characters and their rounded positions,
+    which catches the same page re-exported into a new PDF (new content
+    stream bytes, same text in the same place).
+    """
+    digest = hashlib.sha256()
+    for char in page.chars:
+        digest.update(f"{char['text']}{round(char['x0'])},{round(char['top'])};".encode())
+    return f"t{digest.hexdigest()}"
+
+
+def load_page_result(page_cache, fingerprint):
+    """Cached tables for a page fingerprint, or None."""
+    if not page_cache or not fingerprint:
+        return None
+    try:
+        with open(os.path.join(page_cache, f"{fingerprint}.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_page_result(page_cache, fingerprints, tables):
+    if not page_cache:
+        return
+    os.makedirs(page_cache, exist_ok=True)
+    for fingerprint in fingerprints:
+        if not fingerprint:
+            continue
+        path = os.path.join(page_cache, f"{fingerprint}.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(tables, f)
+        os.replace(tmp_path, path)
+
+
+def _ocr_cache_path(pdf_hash, page_index):
+    return os.path.join(OCR_CACHE_DIRECTORY, pdf_hash, f"{page_index + 1}.txt")
+
+
+def ocr_page(page, page_index, pdf_hash=None):
+    """
+    OCRs an image-only page, reusing cached text keyed by PDF hash and page
+    number so each scanned page is rendered and OCR'd at most once.
+    Returns (text, from_cache); text is None if OCR failed.
+    """
+    cache_path = _ocr_cache_path(pdf_hash, page_index) if pdf_hash else None
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            return f.read(), True
+
+    logger.info(f"Using OCR for page {page_index+1}")
+    try:
+        ocr_text = pytesseract.image_to_string(page.to_image().original)
+    except Exception as e:
+        logger.error(f"OCR failed for page {page_index+1}: {e}")
+        return None, False
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(ocr_text)
+        os.replace(tmp_path, cache_path)
+    return ocr_text, False
+
+
+def extract_page(page, page_index, pdf_hash=None, fingerprint=None, page_cache=None, column_template=None):
+    """
+    Extracts one page. Text-layer pages are split into columns by word
+    position (falling back to table/text extraction when the PDF has no
+    recognizable header) and are never rasterized; image-only pages go
+    straight to (cached) OCR.
+    A text-layer page whose characters match a page already in page_cache
+    reuses its tables instead. Returns (tables, page_stats); page_stats
+    includes the page's wall and CPU seconds.
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    page_stats = {'image_only': False, 'rasterized': False, 'ocr_cached': False, 'ocr_failed': False, 'deduplicated': False}
+    tables = []
+    fingerprints = [fingerprint]
+    if has_text_layer(page):
+        fingerprints.append(text_fingerprint(page) if page_cache else None)
+        cached = load_page_result(page_cache, fingerprints[-1])
+        if cached is not None:
+            tables = cached
+            page_stats['deduplicated'] = True
+            fingerprints.pop()
+        else:
+            tables = layout_table_extraction(page, column_template)
+            if tables is None:
+                tables = enhanced_table_extraction(page)
+    else:
+        page_stats['image_only'] = True
+        ocr_text, from_cache = ocr_page(page, page_index, pdf_hash)
+        page_stats['ocr_cached'] = from_cache
+        page_stats['ocr_failed'] = ocr_text is None
+        page_stats['rasterized'] = not from_cache and ocr_text is not None
+        if ocr_text:
+            lines = [line.strip() for line in ocr_text.split('\n') if line.strip()]
+            if lines:
+                tables.append(lines)
+        elif ocr_text is None:
+            fingerprints = []  # OCR failed; don't cache, so it is retried
+    save_page_result(page_cache, fingerprints, tables)
+    page_stats['seconds'] = time.perf_counter() - wall
+    page_stats['cpu_seconds'] = time.process_time() - cpu
+    return tables, page_stats
+
+
+def extract_pages(pdf_path, page_indices, pdf_hash=None, fingerprints=None, page_cache=None, column_template=None):
+    """
+    Worker task: extracts the given pages of a PDF; returns [(page index,
+    (tables, page_stats))]. column_template is the PDF's header labels; when
+    None it is read from the PDF, at most once, if a page needs it.
+    """
+    fingerprints = fingerprints or {}
+    with pdfplumber.open(pdf_path) as pdf:
+        templates = [column_template] if column_template is not None else []
+
+        def template():
+            if not templates:
+                templates.append(pdf_column_template(pdf))
+            return templates[0]
+        return [(i, extract_page(pdf.pages[i], i, pdf_hash, fingerprints.get(i), page_cache, template)) for i in page_indices]
+
+
+def deduplicated_page(tables, source_stats=None):
+    """
+    Result for a page whose tables were reused from an identical page. A
+    copy of a page whose OCR failed is reported as failed too, so the PDF
+    is retried rather than stored without that page's rows.
+    """
+    source_stats = source_stats or {}
+    return tables, {'image_only': source_stats.get('image_only', False), 'rasterized': False, 'ocr_cached': False, 'ocr_failed': source_stats.get('ocr_failed', False), 'deduplicated': True, 'seconds': 0.0, 'cpu_seconds': 0.0}
+
+
+def _summarize(page_results):
+    """Flattens per-page results, in page order, into (tables, stats)."""
+    tables = []
+    stats = {'pages': len(page_results), 'image_pages': 0, 'rasterized_pages': 0, 'ocr_pages': 0, 'ocr_cache_hits': 0, 'ocr_failed_pages': 0, 'ocr_failed_page_numbers': [], 'deduplicated_pages': 0, 'seconds': 0.0, 'cpu_seconds': 0.0, 'page_seconds': []}
+    for page_number, (page_tables, page_stats) in enumerate(page_results, 1):
+        tables.extend(page_tables)
+        stats['deduplicated_pages'] += page_stats['deduplicated']
+        stats['image_pages'] += page_stats['image_only']
+        stats['rasterized_pages'] += page_stats['rasterized']
+        stats['ocr_pages'] += page_stats['rasterized']
+        stats['ocr_cache_hits'] += page_stats['ocr_cached']
+        stats['ocr_failed_pages'] += page_stats['ocr_failed']
+        if page_stats['ocr_failed']:
+            stats['ocr_failed_page_numbers'].append(page_number)
+        stats['seconds'] += page_stats['seconds']
+        stats['cpu_seconds'] += page_stats['cpu_seconds']
+        stats['page_seconds'].append(page_stats['seconds'])
+    logger.info(f"Processed {stats['pages']} pages ({stats['deduplicated_pages']} seen before), {stats['ocr_pages']} with OCR ({stats['ocr_cache_hits']} from cache, {stats['ocr_failed_pages']} failed), found {len(tables)} potential tables")
+    return tables, stats
+
+
+def page_fingerprints(pdf_path):
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page_fingerprint(page) for page in pdf.pages]
+
+
+def extract_pdfs(pdf_paths, workers=1, pdf_hashes=None, page_cache=PAGE_CACHE_DIRECTORY):
+    """
+    Extracts several PDFs. Every page is fingerprinted first; a page that is
+    already in page_cache, or that repeats an earlier page of this batch, is
+    not extracted again but reuses that page's tables. The remaining pages
+    are fanned out in fixed-size groups to a process pool (or run in this
+    process when workers is 1) and reassembled in page order, so the output
+    matches extracting every page. Returns {pdf_path: (tables, stats)};
+    PDFs that fail are logged and left out. pdf_hashes ({pdf_path: sha256})
+    enables the OCR cache; page_cache=None disables page deduplication.
+    """
+    pdf_hashes = pdf_hashes or {}
+    workers = min(workers, MAX_WORKERS)
+    fingerprints = {}
+    for pdf_path in pdf_paths:
+        try:
+            fingerprints[pdf_path] = page_fingerprints(pdf_path)
+        except Exception as e:
+            logger.error(f"Failed to open {pdf_path}: {e}", exc_info=True)
+
+    # Each distinct page is extracted once, by the first PDF it appears in.
+    known = {}  # fingerprint -> cached tables
+    first_seen = {}  # fingerprint -> (pdf_path, page index) extracted in this batch
+    todo = {}
+    for pdf_path, page_fps in fingerprints.items():
+        for i, fingerprint in enumerate(page_fps):
+            if fingerprint in first_seen or fingerprint in known:
+                continue
+            cached = load_page_result(page_cache, fingerprint)
+            if cached is not None:
+                known[fingerprint] = cached
+            else:
+                first_seen[fingerprint] = (pdf_path, i)
+                todo.setdefault(pdf_path, []).append(i)
+
+    page_results = {}
+    if workers <= 1:
+        for pdf_path, indices in todo.items():
+            try:
+                page_results.update(((pdf_path, i), result) for i, result in extract_pages(pdf_path, indices, pdf_hashes.get(pdf_path), dict(enumerate(fingerprints[pdf_path])), page_cache))
+            except Exception as e:
+                logger.error(f"Failed to extract {pdf_path}: {e}", exc_info=True)
+    else:
+        # A PDF's pages are split over several tasks, so its column template
+        # is read here once and handed to each of them.
+        templates = {}
+        for pdf_path in todo:
+            try:
+                with pdfplumber.open(pdf_path) as pdf:
+                    templates[pdf_path] = pdf_column_template(pdf)
+            except Exception as e:
+                logger.warning(f"Could not read the column header of {pdf_path}: {e}")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                (pdf_path, pool.submit(extract_pages, pdf_path, indices[start:start + PAGES_PER_TASK], pdf_hashes.get(pdf_path), {i: fingerprints[pdf_path][i] for i in indices[start:start + PAGES_PER_TASK]}, page_cache, templates.get(pdf_path)))
+                for pdf_path, indices in todo.items()
+                for start in range(0, len(indices), PAGES_PER_TASK)
+            ]
+            for pdf_path, future in futures:
+                try:
+                    page_results.update(((pdf_path, i), result) for i, result in future.result())
+                except Exception as e:
+                    logger.error(f"Failed to extract {pdf_path}: {e}", exc_info=True)
+
+    results = {}
+    for pdf_path, page_fps in fingerprints.items():
+        logger.info(f"Processing {pdf_path}")
+        pages = []
+        for i, fingerprint in enumerate(page_fps):
+            if (pdf_path, i) in page_results:
+                pages.append(page_results[(pdf_path, i)])
+            elif fingerprint in known:
+                pages.append(deduplicated_page(known[fingerprint]))
+            elif first_seen.get(fingerprint) in page_results:
+                pages.append(deduplicated_page(*page_results[first_seen[fingerprint]]))
+            else:
+                logger.error(f"Failed to extract {pdf_path}: page {i + 1} could not be extracted")
+                break
+        else:
+            results[pdf_path] = _summarize(pages)
+    return results
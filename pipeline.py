@@ -0,0 +1,189 @@
+import csv
+import logging
+import os
+import sqlite3
+from datetime import datetime
+
+from dedup_index import DedupIndex
+from extract_cache import file_hash, get_cached_rows, load_manifest, save_manifest, store_rows
+from pdf_extract import extract_pdfs
+from row_parser import COLUMNS, parse_table
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+KEY_INDEX_PATH = os.path.join("cache", "key_index.sqlite")
+CHUNK_SIZE = 1000
+CITY = 'Washington, DC'
+OUTPUT_COLUMNS = COLUMNS + ['City', 'Full Address']
+
+
+class KeyIndex:
+    """
+    Persistent set of row keys stored in SQLite, so deduplicating against
+    the whole archive does not need the archive in memory. New keys are
+    only made permanent by commit(), which callers run after the matching
+    rows have been written.
+    """
+
+    def __init__(self, path=KEY_INDEX_PATH, table="notice_keys"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.table = table
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS index_meta (name TEXT PRIMARY KEY, value TEXT)")
+
+    def __len__(self):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def add_if_new(self, key):
+        """Adds a key; returns True if it was not already in the index."""
+        return self.conn.execute(f"INSERT OR IGNORE INTO {self.table} (key) VALUES (?)", (key,)).rowcount == 1
+
+    def add_many(self, keys):
+        self.conn.executemany(f"INSERT OR IGNORE INTO {self.table} (key) VALUES (?)", ((key,) for key in keys))
+
+    def clear(self):
+        self.conn.execute(f"DELETE FROM {self.table}")
+
+    def get_meta(self, name):
+        row = self.conn.execute("SELECT value FROM index_meta WHERE name = ?", (f"{self.table}.{name}",)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, name, value):
+        self.conn.execute("INSERT OR REPLACE INTO index_meta (name, value) VALUES (?, ?)", (f"{self.table}.{name}", str(value)))
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+# --- PIPELINE STAGES ---
+def extract_rows(pdf_directory, workers=1, force_extract=False, stats=None, metrics=None):
+    """
+    Yields parsed rows one PDF at a time, from the per-PDF cache when the
+    PDF is unchanged and by extracting it otherwise. PDFs that fail to
+    extract, or have pages whose OCR failed, are listed in
+    stats['failed_pdfs']. Extraction timings go to metrics (a RunMetrics)
+    when given.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault('failed_pdfs', [])
+    manifest = load_manifest()
+    for pdf_filename in sorted(os.listdir(pdf_directory)):
+        if not pdf_filename.endswith('.pdf'):
+            continue
+        pdf_path = os.path.join(pdf_directory, pdf_filename)
+        pdf_hash = file_hash(pdf_path)
+        rows = None if force_extract else get_cached_rows(manifest, pdf_filename, pdf_hash)
+        if rows is not None:
+            stats['cached_pdfs'] = stats.get('cached_pdfs', 0) + 1
+        else:
+            extracted = extract_pdfs([pdf_path], workers=workers, pdf_hashes={pdf_path: pdf_hash})
+            if pdf_path not in extracted:
+                stats['failed_pdfs'].append(pdf_filename)
+                continue
+            pdf_tables, pdf_stats = extracted[pdf_path]
+            rows = []
+            for table in pdf_tables:
+                for fields, skipped_text in parse_table(table):
+                    if fields:
+                        rows.append(tuple(fields))
+                    elif skipped_text:
+                        stats['skipped_no_date'] = stats.get('skipped_no_date', 0) + 1
+                    else:
+                        stats['skipped_junk'] = stats.get('skipped_junk', 0) + 1
+            stats['deduplicated_pages'] = stats.get('deduplicated_pages', 0) + pdf_stats['deduplicated_pages']
+            if metrics is not None:
+                metrics.record_pdf(pdf_filename, pdf_stats)
+            logger.info(f"Extracted {len(rows)} records from {pdf_filename}")
+            if pdf_stats['ocr_failed_pages']:
+                # Not cached, so the failed pages are OCR'd again next run.
+                logger.warning(f"OCR failed on page(s) {', '.join(map(str, pdf_stats['ocr_failed_page_numbers']))} of {pdf_filename}; not caching its rows")
+                stats['failed_pdfs'].append(pdf_filename)
+            else:
+                store_rows(manifest, pdf_filename, pdf_hash, rows, pdf_stats['pages'])
+                save_manifest(manifest)
+                stats['extracted_pdfs'] = stats.get('extracted_pdfs', 0) + 1
+        yield from rows
+
+
+def clean_rows(rows):
+    """Normalizes case numbers and dates; drops rows whose date is invalid."""
+    for case_number, address, quad, zipcode, eviction_date in rows:
+        try:
+            eviction_date = datetime.strptime(eviction_date, '%m/%d/%Y').strftime('%m/%d/%Y')
+        except (TypeError, ValueError):
+            continue
+        yield (str(case_number).strip(), address, quad, zipcode, eviction_date)
+
+
+def dedupe_rows(rows, index):
+    """Passes through only rows the dedup index accepts."""
+    for row in rows:
+        accepted, _ = index.check(row[0], row[1], row[4])
+        if accepted:
+            yield row
+
+
+def enrich_rows(rows):
+    """Adds the City and Full Address columns."""
+    for case_number, address, quad, zipcode, eviction_date in rows:
+        # The published CSV has always carried zip codes as floats (a pandas
+        # round-trip artifact); appended rows match so the column stays uniform.
+        zipcode = f"{zipcode}.0" if zipcode else ''
+        full_address = f"{address}{f', {quad}' if quad else ''}, {CITY}{f', {zipcode}' if zipcode else ''}"
+        yield (case_number, address, quad, zipcode, eviction_date, CITY, full_address)
+
+
+def append_csv(rows, csv_path, chunk_size=CHUNK_SIZE, on_chunk=None):
+    """
+    Appends rows to a CSV in chunks, writing the header if the file is new.
+    on_chunk runs after each chunk is flushed. Returns the rows written.
+    """
+    write_header = not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+    written = 0
+    with open(csv_path, 'a', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        if write_header:
+            writer.writerow(OUTPUT_COLUMNS)
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                writer.writerows(chunk)
+                f.flush()
+                written += len(chunk)
+                chunk = []
+                if on_chunk:
+                    on_chunk()
+        if chunk:
+            writer.writerows(chunk)
+            written += len(chunk)
+        f.flush()
+        if on_chunk:
+            on_chunk()
+    return written
+
+
+def run_streaming_pipeline(pdf_directory, csv_path, workers=1, force_extract=False, chunk_size=CHUNK_SIZE, fuzzy=False, metrics=None):
+    """
+    PDF rows -> clean -> dedupe against the persistent dedup index -> enrich
+    -> append to csv_path. Only one PDF's rows and one output chunk are held
+    in memory at a time. Returns the run's counters, the index's per-rule
+    counts and its summary lines.
+    """
+    stats = {}
+    index = DedupIndex(fuzzy=fuzzy)
+    try:
+        index.bootstrap(csv_path, chunk_size)
+        rows = extract_rows(pdf_directory, workers, force_extract, stats, metrics)
+        rows = dedupe_rows(clean_rows(rows), index)
+        stats['written'] = append_csv(enrich_rows(rows), csv_path, chunk_size, on_chunk=lambda: index.mark_synced(csv_path))
+        stats['dedup'] = index.summary()
+        stats['dedup_counts'] = index.counts()
+    finally:
+        index.close()
+    return stats
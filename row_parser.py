@@ -0,0 +1,138 @@
+import re
+from datetime import date
+
+# --- PATTERNS ---
+# Compiled once at import instead of being rebuilt for every row.
+JUNK_PATTERN = re.compile(r'case number|defendant address|eviction date|page \d+|scheduled evictions|total|sum|^[\s\-_=]+$', re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+RULE_PATTERN = re.compile(r'[|]{2,}|_{3,}|-{3,}|={3,}')
+NAN_PATTERN = re.compile(r'\bnan\b', re.IGNORECASE)
+DATE_PATTERN = re.compile(r'(\d{1,2})\s*[/|-]\s*(\d{1,2})\s*[/|-]\s*(\d{2,4})')
+# Order matters: the first pattern with any match supplies the case number.
+CASE_PATTERNS = tuple(re.compile(p) for p in (r'(\d+-[A-Z]+-\d+(?:-[A-Z])?)', r'(\b\d{2,}-\d{2,3}\b)', r'(LTB-\d+-\d+)', r'(\d{4,5}-\d{2})', r'(\d+-ADM-\d+)'))
+ZIP_PATTERN = re.compile(r'(20\d{3})')
+QUAD_PATTERN = re.compile(r'\b(NW|NE|SW|SE)\b')
+QUADS = ('NW', 'NE', 'SW', 'SE')
+
+COLUMNS = ['Case Number', 'Defendant Address', 'Quad', 'Zipcode', 'Eviction Date']
+
+
+def clean_row_text(text):
+    """Cleans text from a row."""
+    text = WHITESPACE_PATTERN.sub(' ', text)
+    text = RULE_PATTERN.sub('', text)
+    text = NAN_PATTERN.sub('', text)
+    return text.strip()
+
+
+def find_and_rebuild_date(text):
+    """
+    Finds the components of a date anywhere in a string, rebuilds it,
+    and returns the clean date and the rest of the string.
+    """
+    match = DATE_PATTERN.search(text)
+    if not match:
+        return None, text
+
+    month, day, year = match.groups()
+    if len(year) == 2:
+        year = f"20{year}"
+
+    # Same rule as parsing with '%m/%d/%Y': a real calendar date with a
+    # four-digit, non-zero year.
+    if len(year) != 4:
+        return None, text
+    try:
+        date(int(year), int(month), int(day))
+    except ValueError:
+        return None, text
+
+    rebuilt_date = f"{int(month):02d}/{int(day):02d}/{year}"
+    return rebuilt_date, text.replace(match.group(0), '')
+
+
+def _first_case_number(text):
+    for pattern in CASE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(1)
+    return ''
+
+
+def parse_row(row_str):
+    """
+    Splits one raw row into [case, address, quad, zip, date].
+
+    Returns (fields, None) for a data row, (None, None) for header/junk rows,
+    and (None, cleaned_text) for rows skipped because they have no valid date.
+    """
+    row_str = row_str.strip()
+    if len(row_str) < 10 or JUNK_PATTERN.search(row_str):
+        return None, None
+
+    row_str = clean_row_text(row_str)
+    found_date, remaining_str = find_and_rebuild_date(row_str)
+    if not found_date:
+        return None, row_str
+
+    found_case = _first_case_number(remaining_str)
+    zip_match = ZIP_PATTERN.search(remaining_str)
+    quad_match = QUAD_PATTERN.search(remaining_str)
+    found_zip = zip_match.group(1) if zip_match else ''
+    found_quad = quad_match.group(1) if quad_match else ''
+
+    address = remaining_str
+    if found_case:
+        if address.startswith(found_case): address = address[len(found_case):]
+        address = address.strip()
+    if found_zip: address = address.replace(found_zip, '')
+    if found_quad: address = address.replace(found_quad, '')
+
+    address = WHITESPACE_PATTERN.sub(' ', address).strip(' ,.')
+    return [found_case, address, found_quad, found_zip, found_date], None
+
+
+def table_rows(table):
+    """Yields the raw text of each row in a table (cell lists are joined)."""
+    if table and isinstance(table[0], list):
+        for row in table:
+            yield ' '.join([str(item) if item is not None else '' for item in row])
+    elif table:
+        yield from table
+
+
+def parse_fields(cells):
+    """
+    Validates one row of cells read from column positions, in COLUMNS
+    order. Returns the fields like parse_row, or None if any cell does not
+    hold what its column should (a wrapped line, a word that strayed into
+    the next column, a header or page footer), in which case the row is
+    parsed from its joined text instead.
+    """
+    case_number, address, quad, zipcode, eviction_date = (clean_row_text(cell) for cell in cells)
+    found_date, rest = find_and_rebuild_date(eviction_date)
+    if not found_date or rest.strip():
+        return None
+    if case_number and not any(pattern.fullmatch(case_number) for pattern in CASE_PATTERNS):
+        return None
+    if (quad and quad not in QUADS) or (zipcode and not ZIP_PATTERN.fullmatch(zipcode)):
+        return None
+    address = address.strip(' ,.')
+    if not address:
+        return None
+    return [case_number, address, quad, zipcode, found_date]
+
+
+def parse_table(table):
+    """
+    Yields parse_row-style (fields, skipped_text) for every row of an
+    extracted table: a column table ({'rows': [[cell per column]]}) from
+    the layout extractor, a list of cell lists or a list of text lines.
+    """
+    if isinstance(table, dict):
+        for cells in table['rows']:
+            fields = parse_fields(cells)
+            yield (fields, None) if fields else parse_row(' '.join(cell for cell in cells if cell))
+    else:
+        for row_str in table_rows(table):
+            yield parse_row(row_str)
@@ -1,272 +1,259 @@
-import requests
-from bs4 import BeautifulSoup
 import os
-import pdfplumber
 import pandas as pd
-import re
-import pytesseract
-from PIL import Image
 import logging
+import argparse
+import sys
+from extract_cache import file_hash, load_manifest, save_manifest, get_cached_rows, store_rows
+from pdf_extract import default_workers, extract_pdfs
+from row_parser import COLUMNS, parse_table
+from dedup_index import DedupIndex
+from pipeline import OUTPUT_COLUMNS, append_csv, clean_rows, dedupe_rows, enrich_rows, run_streaming_pipeline
+from storage import EvictionStore
+from metrics import RunMetrics
+from fetcher import DEFAULT_WORKERS as DEFAULT_DOWNLOAD_WORKERS, OTA_PAGE_URL, STATUSES, fetch_pdfs, load_state, mark_pending, mark_processed
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-total_records_saved = 0
+# --- CONFIGURATION ---
+PDF_DIRECTORY = "pdf_files"
+CSV_PATH = "eviction_notices.csv"
+
 total_skipped_with_data = 0
 skipped_with_data = []
 
-# Step 1: Scrape the website and extract PDF URLs
-url = "https://ota.dc.gov/page/scheduled-evictions"
-response = requests.get(url)
-pdf_urls = [a["href"] for a in BeautifulSoup(response.text, "html.parser").find_all("a", href=True) if a["href"].endswith(".pdf")]
 
-# Step 2: Download PDF files
-pdf_directory = "pdf_files"
-os.makedirs(pdf_directory, exist_ok=True)
-for pdf_url in pdf_urls:
-    pdf_filename = pdf_url.split("/")[-1]
-    if pdf_filename not in os.listdir(pdf_directory):
-        with open(os.path.join(pdf_directory, pdf_filename), "wb") as f:
-            f.write(requests.get(pdf_url).content)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape OTA scheduled evictions into eviction_notices.csv")
+    parser.add_argument("--force-extract", action="store_true", help="re-extract every PDF, ignoring the manifest cache")
+    parser.add_argument("--stream", action="store_true", help="stream new rows into the CSV with bounded memory instead of rebuilding it")
+    parser.add_argument("--fuzzy-dedup", action="store_true", help="also drop rows whose case number is within two edits of one already seen at the same address and date")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="extraction worker processes (1 = serial)")
+    parser.add_argument("--download-workers", type=int, default=DEFAULT_DOWNLOAD_WORKERS, help="concurrent PDF downloads")
+    parser.add_argument("--source-url", default=OTA_PAGE_URL, help="scheduled-evictions page to fetch PDFs from (e.g. a local stub_ota.py server)")
+    parser.add_argument("--always-run", action="store_true", help="run the pipeline even when no PDF changed upstream")
+    parser.add_argument("--no-fetch", action="store_true", help="use the PDFs already in pdf_files without contacting OTA")
+    parser.add_argument("--extract-only", action="store_true", help="extract and cache rows of new or changed PDFs without touching the CSV")
+    return parser.parse_args(argv)
 
-# Step 3: Enhanced extraction and processing
-csv_directory = "csv_files"
-os.makedirs(csv_directory, exist_ok=True)
-unique_rows = set()
 
-def normalize_address(address):
-    """Enhanced address normalization"""
-    if not isinstance(address, str):
-        return ''
-    address = address.lower().split('a/k/a')[0]
-    replacements = {'apartment': 'apt', 'apt': '#', 'unit': '#', 'suite': '#', 'ste': '#'}
-    for old, new in replacements.items():
-        address = address.replace(old, new)
-    street_replacements = {'street': 'st', 'avenue': 'ave', 'road': 'rd', 'drive': 'dr', 'place': 'pl', 'boulevard': 'blvd', 'court': 'ct', 'terrace': 'ter', 'circle': 'cir', 'lane': 'ln'}
-    for old, new in street_replacements.items():
-        address = re.sub(r'\b' + old + r'\b', new, address)
-    address = re.sub(r'[^\w\s#]', '', address)
-    address = re.sub(r'\s+', ' ', address).strip()
-    return address.title()
+def fetch(args, metrics):
+    """Step 1 + 2: conditionally fetch the page and new or changed PDFs (see fetcher.py)."""
+    with metrics.stage('fetch'):
+        fetched = fetch_pdfs(args.source_url, PDF_DIRECTORY, workers=args.download_workers)
+    for status in STATUSES:
+        metrics.count(f"pdfs_{status}", len(fetched[status]))
+    logger.info(f"PDFs: {len(fetched['new'])} new, {len(fetched['changed'])} changed, {len(fetched['unchanged']) + len(fetched['not_modified'])} unchanged, {len(fetched['failed'])} failed")
+    return fetched
+
 
-def find_and_rebuild_date(text):
+def run_stream(args, metrics):
     """
-    Finds the components of a date anywhere in a string, rebuilds it,
-    and returns the clean date and the rest of the string.
+    Streaming mode: rows flow one PDF at a time through clean -> dedupe
+    (against a persistent key index) -> enrich -> chunked append, so memory
+    stays flat however large the archive grows.
     """
-    date_pattern = re.compile(r'(\d{1,2})\s*[/|-]\s*(\d{1,2})\s*[/|-]\s*(\d{2,4})')
-    
-    match = date_pattern.search(text)
-    
-    if not match:
-        return None, text
-
-    month, day, year = match.groups()
-
-    if len(year) == 2:
-        year = f"20{year}"
-    
-    rebuilt_date = f"{int(month):02d}/{int(day):02d}/{year}"
+    with metrics.stage('stream_pipeline'):
+        stream_stats = run_streaming_pipeline(PDF_DIRECTORY, CSV_PATH, workers=args.workers, force_extract=args.force_extract, fuzzy=args.fuzzy_dedup, metrics=metrics)
+    logger.info(f"Streaming run complete: {stream_stats.get('written', 0):,} new records appended to {CSV_PATH}")
+    logger.info(f"PDFs extracted: {stream_stats.get('extracted_pdfs', 0):,} (served from cache: {stream_stats.get('cached_pdfs', 0):,})")
+    logger.info(f"Pages reused from identical pages of other PDFs: {stream_stats.get('deduplicated_pages', 0):,}")
+    logger.info(f"Rows skipped due to no valid date: {stream_stats.get('skipped_no_date', 0):,}")
+    logger.info(f"Dedup: {'; '.join(stream_stats['dedup'])}")
+    with metrics.stage('store'):
+        store = EvictionStore()
+        stored_rows = store.sync_csv('notices', CSV_PATH)
+        store.close()
+    logger.info(f"Typed store: {stored_rows:,} new rows")
+    if stream_stats['failed_pdfs']:
+        logger.warning(f"Left pending after failing to extract: {', '.join(stream_stats['failed_pdfs'])}")
+    for name in ('written', 'extracted_pdfs', 'cached_pdfs', 'deduplicated_pages', 'skipped_no_date', 'skipped_junk'):
+        metrics.count(name, stream_stats.get(name, 0))
+    for name, count in stream_stats['dedup_counts'].items():
+        metrics.count(f"dedup_{name}", count)
+    metrics.count('store_rows_added', stored_rows)
+    metrics.count('failed_pdfs', len(stream_stats['failed_pdfs']))
+    mark_processed(still_pending=stream_stats['failed_pdfs'])
 
-    try:
-        pd.to_datetime(rebuilt_date, format='%m/%d/%Y')
-        original_messy_text = match.group(0)
-        remaining_text = text.replace(original_messy_text, '')
-        return rebuilt_date, remaining_text
-    except (ValueError, TypeError):
-        return None, text
 
-def enhanced_table_extraction(page):
-    """Extracts tables or lines of text from a page."""
-    tables = []
-    try:
-        settings = {"vertical_strategy": "text", "horizontal_strategy": "text"}
-        page_tables = page.extract_tables(table_settings=settings)
-        if page_tables:
-            for table in page_tables:
-                if table and len(table) > 1:
-                    tables.append(table)
-    except Exception as e:
-        logger.warning(f"Standard table extraction failed: {e}")
-    if not tables:
-        try:
-            text = page.extract_text()
-            if text:
-                lines = [line.strip() for line in text.split('\n') if line.strip()]
-                if lines:
-                    tables.append(lines)
-        except Exception as e:
-            logger.warning(f"Text-based extraction failed: {e}")
-    return tables
-
-def enhanced_process_and_split_rows(pdf_tables):
+# Step 3: Enhanced extraction and processing
+def enhanced_process_and_split_rows(pdf_tables, metrics):
     """Main processing function using the new date logic."""
     global total_skipped_with_data, skipped_with_data
     all_cleaned_rows = []
 
-    case_patterns = [r'(\d+-[A-Z]+-\d+(?:-[A-Z])?)', r'(\b\d{2,}-\d{2,3}\b)', r'(LTB-\d+-\d+)', r'(\d{4,5}-\d{2})', r'(\d+-ADM-\d+)']
-    zip_pattern = re.compile(r'(20\d{3})')
-    quad_pattern = re.compile(r'\b(NW|NE|SW|SE)\b')
-    junk_patterns = [re.compile(r'case number|defendant address|eviction date|page \d+', re.IGNORECASE), re.compile(r'scheduled evictions|total|sum', re.IGNORECASE), re.compile(r'^[\s\-_=]+$')]
-
     for table in pdf_tables:
-        rows_to_process = []
-        if table and isinstance(table[0], list):
-            for row in table:
-                row_text = ' '.join([str(item) if item is not None else '' for item in row])
-                rows_to_process.append(row_text)
-        elif table:
-            rows_to_process = table
-
-        for row_str in rows_to_process:
-            row_str = row_str.strip()
-            if len(row_str) < 10 or any(p.search(row_str) for p in junk_patterns):
-                continue
-            
-            row_str = clean_row_text(row_str)
-
-            found_date, remaining_str = find_and_rebuild_date(row_str)
-
-            if not found_date:
+        for fields, skipped_text in parse_table(table):
+            if fields:
+                all_cleaned_rows.append(fields)
+            elif skipped_text:
                 total_skipped_with_data += 1
-                skipped_with_data.append({'text': f"NO VALID DATE in: {row_str[:100]}"})
+                skipped_with_data.append({'text': f"NO VALID DATE in: {skipped_text[:100]}"})
+            else:
+                metrics.count('skipped_junk')
+
+    return pd.DataFrame(all_cleaned_rows, columns=COLUMNS)
+
+
+def run_batch(args, metrics):
+    csv_directory = "csv_files"
+    os.makedirs(csv_directory, exist_ok=True)
+    new_rows = []
+
+    # Main processing loop
+    # Only PDFs whose content hash is new or changed are re-extracted. Rows of
+    # unchanged PDFs are already in the CSV (the manifest is only saved once a
+    # run's rows have been appended), unless the CSV changed outside this
+    # script, in which case the dedup index is rebuilt and cached rows replayed.
+    # Rows of PDFs still pending in the fetch state (e.g. extracted by an
+    # --extract-only run) are replayed too; the dedup index drops any already in.
+    with metrics.stage('dedup_bootstrap'):
+        dedup_index = DedupIndex(fuzzy=args.fuzzy_dedup)
+        replay_cached = dedup_index.bootstrap(CSV_PATH)
+    manifest = load_manifest()
+    still_pending = set(load_state()['pending'])
+    cached_pdfs = 0
+    extracted_pdfs = 0
+    page_totals = {'pages': 0, 'deduplicated_pages': 0, 'rasterized_pages': 0, 'ocr_pages': 0, 'ocr_cache_hits': 0, 'ocr_failed_pages': 0}
+    pending = {}
+    failed_pdfs = []
+    with metrics.stage('hash_pdfs'):
+        for pdf_filename in sorted(os.listdir(PDF_DIRECTORY)):
+            if not pdf_filename.endswith('.pdf'):
                 continue
-            
-            cases = [item for pattern in case_patterns for item in re.findall(pattern, remaining_str)]
-            zips = zip_pattern.findall(remaining_str)
-            quads = quad_pattern.findall(remaining_str)
-
-            found_case = cases[0] if cases else ''
-            found_zip = zips[0] if zips else ''
-            found_quad = quads[0] if quads else ''
-
-            address = remaining_str
-            if found_case: address = re.sub(r'^' + re.escape(found_case), '', address).strip()
-            if found_zip: address = address.replace(found_zip, '')
-            if found_quad: address = address.replace(found_quad, '')
-            
-            address = re.sub(r'\s+', ' ', address).strip(' ,.')
-
-            all_cleaned_rows.append([found_case, address, found_quad, found_zip, found_date])
-
-    return pd.DataFrame(all_cleaned_rows, columns=['Case Number', 'Defendant Address', 'Quad', 'Zipcode', 'Eviction Date'])
-
-def clean_row_text(text):
-    """Cleans text from a row."""
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'[|]{2,}|_{3,}|-{3,}|={3,}', '', text)
-    text = re.sub(r'\bnan\b', '', text, flags=re.IGNORECASE)
-    return text.strip()
-
-def extract_with_enhanced_hybrid_approach(pdf_path):
-    """Main extraction logic."""
-    tables = []
-    ocr_pages = 0
-    
-    logger.info(f"Processing {pdf_path}")
-    
-    with pdfplumber.open(pdf_path) as pdf:
-        total_pages = len(pdf.pages)
-        for i, page in enumerate(pdf.pages):
-            page_tables = enhanced_table_extraction(page)
-            if page_tables:
-                tables.extend(page_tables)
+            pdf_path = os.path.join(PDF_DIRECTORY, pdf_filename)
+            pdf_hash = file_hash(pdf_path)
+
+            cached_rows = None if args.force_extract else get_cached_rows(manifest, pdf_filename, pdf_hash)
+            if cached_rows is not None:
+                cached_pdfs += 1
+                if replay_cached or pdf_filename in still_pending:
+                    new_rows.extend(cached_rows)
+                logger.info(f"Using {len(cached_rows)} cached records for unchanged {pdf_filename}")
                 continue
-            
-            text = page.extract_text()
-            if not text or len(text.strip()) < 50:
-                ocr_pages += 1
-                logger.info(f"Using OCR for page {i+1}")
-                try:
-                    ocr_text = pytesseract.image_to_string(page.to_image().original)
-                    lines = [line.strip() for line in ocr_text.split('\n') if line.strip()]
-                    if lines:
-                        tables.append(lines)
-                except Exception as e:
-                    logger.error(f"OCR failed for page {i+1}: {e}")
-
-    logger.info(f"Processed {total_pages} pages, {ocr_pages} with OCR, found {len(tables)} potential tables")
-    return tables
-
-# Main processing loop
-for pdf_filename in os.listdir(pdf_directory):
-    if not pdf_filename.endswith('.pdf'): 
-        continue
-    pdf_path = os.path.join(pdf_directory, pdf_filename)
-    logger.info(f"Processing {pdf_filename}...")
-    
-    try:
-        pdf_tables = extract_with_enhanced_hybrid_approach(pdf_path)
-        if pdf_tables:
-            cleaned_table = enhanced_process_and_split_rows(pdf_tables)
-            if not cleaned_table.empty:
-                cleaned_rows_tuples = [tuple(row) for row in cleaned_table.values]
-                unique_rows.update(cleaned_rows_tuples)
-                logger.info(f"Extracted {len(cleaned_table)} records from {pdf_filename}")
-            else:
-                logger.warning(f"No valid data rows processed from {pdf_filename}")
-        else:
-            logger.warning(f"No tables found in {pdf_filename}")
-    except Exception as e:
-        logger.error(f"Failed to process {pdf_filename}: {e}", exc_info=True)
-
-# Create DataFrame from all newly parsed unique rows
-final_df = pd.DataFrame(list(unique_rows), columns=['Case Number', 'Defendant Address', 'Quad', 'Zipcode', 'Eviction Date'])
-
-# Load existing CSV to merge and deduplicate
-csv_path = "eviction_notices.csv"
-if os.path.exists(csv_path):
-    try:
-        existing_df = pd.read_csv(csv_path)
-        combined_df = pd.concat([existing_df, final_df], ignore_index=True)
-    except pd.errors.EmptyDataError:
-        combined_df = final_df
-else:
-    combined_df = final_df
-
-# <-- MODIFIED: Deduplication logic updated to use both Case Number and Eviction Date.
-combined_df['Eviction Date'] = pd.to_datetime(combined_df['Eviction Date'], errors='coerce').dt.strftime('%m/%d/%Y')
-combined_df['Case Number'] = combined_df['Case Number'].astype(str).str.strip().fillna('')
-
-# Remove duplicates based on BOTH Case Number and Eviction Date
-combined_df.drop_duplicates(subset=['Case Number', 'Eviction Date'], keep='first', inplace=True)
-
-# For remaining rows with no case number, deduplicate by address and date
-no_case_df = combined_df[combined_df['Case Number'] == ''].copy()
-no_case_df['Normalized Address'] = no_case_df['Defendant Address'].apply(normalize_address)
-no_case_df.drop_duplicates(subset=['Normalized Address', 'Eviction Date'], keep='first', inplace=True)
-no_case_df.drop(columns=['Normalized Address'], inplace=True)
-
-# Recombine the dataframes
-final_df = pd.concat([combined_df[combined_df['Case Number'] != ''], no_case_df], ignore_index=True)
-
-
-# Final formatting
-final_df['City'] = 'Washington, DC'
-final_df['Full Address'] = (
-    final_df['Defendant Address'].astype(str) +
-    final_df['Quad'].apply(lambda x: f', {x}' if pd.notna(x) and x != '' and x != 'nan' else '') +
-    ', ' + final_df['City'] +
-    final_df['Zipcode'].apply(lambda x: f', {x}' if pd.notna(x) and x != '' and x != 'nan' else '')
-)
-
-final_df.to_csv(csv_path, index=False)
-
-def print_final_summary():
+            pending[pdf_path] = (pdf_filename, pdf_hash)
+
+    with metrics.stage('extract'):
+        extracted = extract_pdfs(list(pending), workers=args.workers, pdf_hashes={path: pdf_hash for path, (_, pdf_hash) in pending.items()})
+    with metrics.stage('parse'):
+        for pdf_path, (pdf_filename, pdf_hash) in pending.items():
+            if pdf_path not in extracted:
+                failed_pdfs.append(pdf_filename)
+                continue
+            try:
+                pdf_tables, pdf_stats = extracted[pdf_path]
+                for key in page_totals:
+                    page_totals[key] += pdf_stats[key]
+                metrics.record_pdf(pdf_filename, pdf_stats)
+                pdf_rows = []
+                if pdf_tables:
+                    cleaned_table = enhanced_process_and_split_rows(pdf_tables, metrics)
+                    if not cleaned_table.empty:
+                        pdf_rows = [tuple(row) for row in cleaned_table.values]
+                        new_rows.extend(pdf_rows)
+                        logger.info(f"Extracted {len(cleaned_table)} records from {pdf_filename}")
+                    else:
+                        logger.warning(f"No valid data rows processed from {pdf_filename}")
+                else:
+                    logger.warning(f"No tables found in {pdf_filename}")
+                if pdf_stats['ocr_failed_pages']:
+                    # Rows of the pages that worked are used, but the PDF is not
+                    # cached and stays pending, so the failed pages are OCR'd
+                    # again on the next run.
+                    logger.warning(f"OCR failed on page(s) {', '.join(map(str, pdf_stats['ocr_failed_page_numbers']))} of {pdf_filename}; not caching its rows")
+                    failed_pdfs.append(pdf_filename)
+                    continue
+                store_rows(manifest, pdf_filename, pdf_hash, pdf_rows, pdf_stats['pages'])
+                extracted_pdfs += 1
+            except Exception as e:
+                logger.error(f"Failed to process {pdf_filename}: {e}", exc_info=True)
+                failed_pdfs.append(pdf_filename)
+
+    for name, value in page_totals.items():
+        metrics.count(name, value)
+    metrics.count('extracted_pdfs', extracted_pdfs)
+    metrics.count('cached_pdfs', cached_pdfs)
+    metrics.count('skipped_no_date', total_skipped_with_data)
+
+    if args.extract_only:
+        # The rows are cached but not yet in the CSV, so the PDFs stay pending
+        # and the next full run replays them.
+        save_manifest(manifest)
+        mark_pending(pdf_filename for pdf_filename, _ in pending.values() if pdf_filename not in failed_pdfs)
+        dedup_index.close()
+        logger.info(f"Extracted {len(new_rows):,} rows from {extracted_pdfs:,} PDFs (served from cache: {cached_pdfs:,}); {CSV_PATH} not updated")
+        return
+
+    # Check the new rows against the persistent dedup index and append the
+    # accepted ones; existing rows are never re-read or rewritten.
+    with metrics.stage('dedup_append'):
+        accepted_rows = list(enrich_rows(dedupe_rows(clean_rows(new_rows), dedup_index)))
+        append_csv(accepted_rows, CSV_PATH)
+        dedup_index.mark_synced(CSV_PATH)
+        dedup_index.close()
+        save_manifest(manifest)
+    final_df = pd.DataFrame(accepted_rows, columns=OUTPUT_COLUMNS)
+
+    # Keep the typed store in step with the CSV; only new rows are inserted.
+    with metrics.stage('store'):
+        store = EvictionStore()
+        stored_rows = store.append('notices', final_df)
+        store.close()
+
+    def print_final_summary():
+        logger.info("\n" + "="*60)
+        logger.info("PROCESSING SUMMARY")
+        logger.info("="*60)
+        logger.info(f"New records appended: {len(final_df):,}")
+        for line in dedup_index.summary():
+            logger.info(f"Dedup {line}")
+        logger.info(f"PDFs extracted: {extracted_pdfs:,} (served from cache: {cached_pdfs:,})")
+        logger.info(f"Pages extracted: {page_totals['pages']:,} (reused from identical pages of other PDFs: {page_totals['deduplicated_pages']:,}, rasterized: {page_totals['rasterized_pages']:,}, OCR'd: {page_totals['ocr_pages']:,}, OCR from cache: {page_totals['ocr_cache_hits']:,}, OCR failed: {page_totals['ocr_failed_pages']:,})")
+        logger.info(f"Rows skipped due to no valid date: {total_skipped_with_data:,}")
+        logger.info(f"New rows added to the typed store: {stored_rows:,}")
+        if skipped_with_data:
+            logger.info(f"\nSKIPPED ROWS SAMPLES ({len(skipped_with_data)} total):")
+            logger.info("-" * 60)
+            for i, row in enumerate(skipped_with_data[:20]):
+                logger.info(f"{i+1:2d}. {row['text']}")
+            if len(skipped_with_data) > 20:
+                logger.info(f"... and {len(skipped_with_data) - 20} more rows")
+        logger.info("\n" + "="*60)
+
+    print_final_summary()
+
+    metrics.count('written', len(final_df))
+    for name, count in dedup_index.counts().items():
+        metrics.count(f"dedup_{name}", count)
+    metrics.count('store_rows_added', stored_rows)
+    mark_processed(still_pending=failed_pdfs)
+
+
+def main(argv=None):
     global total_skipped_with_data, skipped_with_data
-    logger.info("\n" + "="*60)
-    logger.info("PROCESSING SUMMARY")
-    logger.info("="*60)
-    logger.info(f"Records successfully saved: {len(final_df):,}")
-    logger.info(f"Rows skipped due to no valid date: {total_skipped_with_data:,}")
-    if skipped_with_data:
-        logger.info(f"\nSKIPPED ROWS SAMPLES ({len(skipped_with_data)} total):")
-        logger.info("-" * 60)
-        for i, row in enumerate(skipped_with_data[:20]):
-            logger.info(f"{i+1:2d}. {row['text']}")
-        if len(skipped_with_data) > 20:
-            logger.info(f"... and {len(skipped_with_data) - 20} more rows")
-    logger.info("\n" + "="*60)
-
-print_final_summary()
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO)
+    # Reset per-run state, so calling main() again in-process (cli.py) starts from zero.
+    total_skipped_with_data = 0
+    skipped_with_data = []
+    args = parse_args(argv)
+    metrics = RunMetrics('scrape')
+    os.makedirs(PDF_DIRECTORY, exist_ok=True)
+
+    if not args.no_fetch:
+        fetched = fetch(args, metrics)
+        # Nothing new upstream and every fetched PDF already processed: the CSV
+        # cannot change, so skip extraction, dedup and the store entirely.
+        if not fetched['pending'] and os.path.exists(CSV_PATH) and not (args.force_extract or args.always_run):
+            logger.info("No new or changed PDFs since the last run; nothing to do.")
+            logger.info(f"Run metrics written to {metrics.write()}")
+            return 0
+
+    if args.stream and not args.extract_only:
+        run_stream(args, metrics)
+    else:
+        run_batch(args, metrics)
+    logger.info(f"Run metrics written to {metrics.write()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Typed storage for the notices and enriched tables.
+
+The CSVs stay the published output; this keeps the same rows in an indexed
+SQLite database with real types (ISO dates, integer zip codes and ward
+numbers, floats for coordinates) so loads and ward/date filters do not
+re-parse text. Rows are upserted by identity key, and a rewritten CSV
+replaces its table. Tables can be exported back to CSV in the existing
+format, or to Parquet when pyarrow is installed:
+
+    python storage.py sync
+    python storage.py export enriched eviction_data_ward.parquet
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+
+import pandas as pd
+
+# --- CONFIGURATION ---
+STORE_PATH = os.path.join("cache", "evictions.sqlite")
+CHUNK_SIZE = 5000
+
+# store column -> (CSV column, kind). Kinds decide the SQLite type, how CSV
+# values are converted on the way in and the pandas dtype on the way out.
+TABLES = {
+    'notices': {
+        'csv_path': 'eviction_notices.csv',
+        'date_format': '%m/%d/%Y',
+        'key': ('case_number', 'eviction_date', 'defendant_address'),
+        'columns': {
+            'case_number': ('Case Number', 'text'),
+            'defendant_address': ('Defendant Address', 'text'),
+            'quad': ('Quad', 'category'),
+            'zipcode': ('Zipcode', 'int'),
+            'eviction_date': ('Eviction Date', 'date'),
+            'city': ('City', 'category'),
+            'full_address': ('Full Address', 'text'),
+        },
+    },
+    'enriched': {
+        'csv_path': 'eviction_data_ward.csv',
+        'date_format': '%Y-%m-%d',
+        'key': ('case_number', 'eviction_date', 'address_original'),
+        'columns': {
+            'case_number': ('case_number', 'text'),
+            'quad': ('quad', 'category'),
+            'zipcode': ('zipcode', 'int'),
+            'eviction_date': ('eviction_date', 'date'),
+            'city': ('city', 'category'),
+            'address_original': ('address_original', 'text'),
+            'address_base': ('address_base', 'text'),
+            'unit': ('unit', 'text'),
+            'lat': ('lat', 'real'),
+            'lng': ('lng', 'real'),
+            'ward': ('ward', 'ward'),
+            'address_cleaned': ('address_cleaned', 'text'),
+        },
+    },
+}
+SQL_TYPES = {'text': 'TEXT', 'category': 'TEXT', 'int': 'INTEGER', 'date': 'TEXT', 'real': 'REAL', 'ward': 'INTEGER'}
+INDEXES = {'notices': [('eviction_date',)], 'enriched': [('ward', 'eviction_date'), ('eviction_date',)]}
+
+
+def _ward_number(ward):
+    """'Ward 8' (or 8) -> 8."""
+    if isinstance(ward, str):
+        ward = ward.replace('Ward', '').strip()
+    return int(ward)
+
+
+def row_key_hash(key):
+    """64-bit hash of a row's identity, stored instead of the key text."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big', signed=True)
+
+
+def to_store_frame(table, df):
+    """
+    Converts a frame using the table's CSV column names (as read from the
+    CSV or built by the scripts) into typed store columns plus the row key.
+    """
+    spec = TABLES[table]
+    out = pd.DataFrame(index=df.index)
+    for column, (csv_column, kind) in spec['columns'].items():
+        values = df[csv_column]
+        if kind == 'date':
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                values = pd.to_datetime(values, format=spec['date_format'], errors='coerce')
+            values = values.dt.strftime('%Y-%m-%d')
+        elif kind == 'int':
+            values = pd.to_numeric(values, errors='coerce').astype('Int64')
+        elif kind == 'real':
+            values = pd.to_numeric(values, errors='coerce')
+        elif kind == 'ward':
+            values = values.astype(object).where(values.notna() & (values.astype(str) != ''), None)
+            values = values.map(_ward_number, na_action='ignore').astype('Int64')
+        else:
+            values = values.astype(object).where(values.notna(), None).replace('', None)
+        out[column] = values.astype(object).where(values.notna(), None)
+    key_parts = [out[column].fillna('').astype(str) for column in spec['key']]
+    out.insert(0, 'key', key_parts[0].str.cat(key_parts[1:], sep='|').map(row_key_hash))
+    return out
+
+
+class EvictionStore:
+    """SQLite database holding one table per entry in TABLES."""
+
+    def __init__(self, path=STORE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        for table, spec in TABLES.items():
+            columns = ", ".join(f"{column} {SQL_TYPES[kind]}" for column, (_, kind) in spec['columns'].items())
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (key INTEGER NOT NULL UNIQUE, {columns})")
+            for index_columns in INDEXES[table]:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_{'_'.join(index_columns)} ON {table} ({', '.join(index_columns)})")
+        self.conn.commit()
+
+    def count(self, table):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def _insert(self, table, rows, on_conflict):
+        placeholders = ", ".join("?" * len(rows.columns))
+        self.conn.executemany(
+            f"INSERT INTO {table} ({', '.join(rows.columns)}) VALUES ({placeholders}) ON CONFLICT (key) {on_conflict}",
+            rows.itertuples(index=False, name=None),
+        )
+
+    def append(self, table, df):
+        """
+        Inserts rows whose key is not stored yet and updates the stored
+        columns of rows whose key is (e.g. re-geocoded enriched rows).
+        Returns the number of rows added.
+        """
+        if df.empty:
+            return 0
+        rows = to_store_frame(table, df)
+        before = self.count(table)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in rows.columns if column != 'key')
+        with self.conn:
+            self._insert(table, rows, f"DO UPDATE SET {updates}")
+        return self.count(table) - before
+
+    def replace(self, table, df):
+        """
+        Makes the table hold exactly the rows of df, in its order, for a CSV
+        that was rewritten rather than appended to: rows no longer in it are
+        dropped. Returns the number of rows whose key was not stored before.
+        """
+        rows = to_store_frame(table, df)
+        stored = {key for (key,) in self.conn.execute(f"SELECT key FROM {table}")}
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {table}")
+            self._insert(table, rows, "DO NOTHING")
+        return int((~rows['key'].drop_duplicates().isin(stored)).sum())
+
+    def sync_csv(self, table, csv_path=None, chunk_size=CHUNK_SIZE):
+        """Adds or updates the rows of a CSV, one chunk at a time."""
+        csv_path = csv_path or TABLES[table]['csv_path']
+        if not os.path.exists(csv_path):
+            return 0
+        added = 0
+        for chunk in pd.read_csv(csv_path, dtype=str, keep_default_na=False, chunksize=chunk_size):
+            added += self.append(table, chunk)
+        return added
+
+    def load(self, table, ward=None, start=None, end=None, columns=None):
+        """
+        Returns a typed DataFrame, optionally filtered by ward (number or
+        'Ward N') and an inclusive eviction date range. Filters run in SQLite
+        against the indexes.
+        """
+        spec = TABLES[table]['columns']
+        columns = list(columns or spec)
+        clauses, params = [], []
+        if ward is not None:
+            clauses.append("ward = ?")
+            params.append(_ward_number(ward))
+        if start is not None:
+            clauses.append("eviction_date >= ?")
+            params.append(pd.Timestamp(start).strftime('%Y-%m-%d'))
+        if end is not None:
+            clauses.append("eviction_date <= ?")
+            params.append(pd.Timestamp(end).strftime('%Y-%m-%d'))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        df = pd.read_sql_query(f"SELECT {', '.join(columns)} FROM {table}{where} ORDER BY rowid", self.conn, params=params)
+        for column in columns:
+            kind = spec[column][1]
+            if kind == 'date':
+                df[column] = pd.to_datetime(df[column], format='%Y-%m-%d')
+            elif kind == 'int':
+                df[column] = df[column].astype('Int64')
+            elif kind == 'real':
+                df[column] = df[column].astype(float)
+            elif kind == 'ward':
+                wards = df[column].astype('Int64')
+                df[column] = ('Ward ' + wards.astype(str)).where(wards.notna()).astype('category')
+            elif kind == 'category':
+                df[column] = df[column].astype('category')
+        return df
+
+    def export_csv(self, table, csv_path):
+        """Writes a table in the same layout as the CSV the scripts produce."""
+        spec = TABLES[table]
+        df = self.load(table)
+        dates = df['eviction_date']
+        df['eviction_date'] = dates.dt.strftime(spec['date_format'])
+        if table == 'notices':
+            # The scraper has always written zip codes as floats.
+            df['zipcode'] = df['zipcode'].astype(float)
+        else:
+            df['month'] = dates.dt.month.astype(float)
+            df['year'] = dates.dt.year.astype(float)
+            df['month_name'] = dates.dt.strftime('%B')
+        df = df.rename(columns={column: csv_column for column, (csv_column, _) in spec['columns'].items()})
+        df.to_csv(csv_path, index=False)
+
+    def export_parquet(self, table, path):
+        """Writes a typed table to Parquet (needs pyarrow)."""
+        self.load(table).to_parquet(path, index=False)
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync or export the typed eviction store")
+    parser.add_argument("--store", default=STORE_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("sync", help="add or update rows from the CSVs")
+    export = commands.add_parser("export", help="write a table as CSV or Parquet (by extension)")
+    export.add_argument("table", choices=list(TABLES))
+    export.add_argument("path")
+    args = parser.parse_args()
+
+    store = EvictionStore(args.store)
+    if args.command == "sync":
+        for table in TABLES:
+            print(f"{table}: {store.sync_csv(table):,} new rows, {store.count(table):,} total")
+    elif args.path.endswith('.parquet'):
+        store.export_parquet(args.table, args.path)
+    else:
+        store.export_csv(args.table, args.path)
+    store.close()
@@ -0,0 +1,76 @@
+"""
+Local stand-in for the citizenatlas findLocation2 endpoint.
+
+Answers every request with a response in the same returnDataset.Table1
+shape, using coordinates derived from a hash of the address so results are
+stable between runs. Useful for exercising add_ward.py without the network:
+
+    python stub_geocoder.py --port 8765
+    DC_GEOCODING_API_URL=http://127.0.0.1:8765/findLocation2 python add_ward.py
+"""
+import argparse
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def fake_location(address):
+    """Deterministic Table1 record for an address, inside DC's bounds."""
+    digest = hashlib.sha256(address.encode()).digest()
+    return {
+        "LATITUDE": 38.82 + digest[0] / 255 * 0.15,
+        "LONGITUDE": -77.10 + digest[1] / 255 * 0.18,
+        "WARD_2012": f"Ward {digest[2] % 8 + 1}",
+        "ZIPCODE": str(20001 + digest[3] % 60),
+        "QUADRANT": ("NW", "NE", "SW", "SE")[digest[4] % 4],
+    }
+
+
+class StubGeocoderHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        # server.fail_every > 0 answers every Nth request with a 503 to exercise retries.
+        with server.lock:
+            server.request_count += 1
+            count = server.request_count
+        if server.fail_every and count % server.fail_every == 0:
+            self.send_error(503)
+            return
+
+        address = parse_qs(urlparse(self.path).query).get("str", [""])[0]
+        # Addresses containing NOWHERE return an empty dataset (no match).
+        table = [] if "NOWHERE" in address.upper() else [fake_location(address)]
+        body = json.dumps({"returnDataset": {"Table1": table}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, fail_every=0):
+    """Starts the stub in a background thread. Returns (server, endpoint URL)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubGeocoderHandler)
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.fail_every = fail_every
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/findLocation2"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake findLocation2 endpoint")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every Nth request with 503")
+    args = parser.parse_args()
+    server, endpoint = start_stub_server(args.port, args.fail_every)
+    print(f"Stub geocoder listening on {endpoint}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
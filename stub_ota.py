@@ -0,0 +1,133 @@
+"""
+Local stand-in for the OTA scheduled-evictions page and its PDFs.
+
+Serves an index page linking every PDF in a directory, and the PDFs
+themselves with ETag/Last-Modified validators, 304 answers to conditional
+requests and Range/If-Range support, like a typical static file host.
+--drop-after cuts every Nth PDF transfer short to exercise resumed
+downloads:
+
+    python stub_ota.py --port 8766 --directory pdf_files
+    python scrape.py --source-url http://127.0.0.1:8766/page/scheduled-evictions
+"""
+import argparse
+import hashlib
+import os
+import re
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+INDEX_PATH = "/page/scheduled-evictions"
+FILES_PREFIX = "/sites/default/files/dc/sites/ota/publication/attachments/"
+
+
+def file_validators(path):
+    """(ETag, Last-Modified) for a file, from its content hash and mtime."""
+    with open(path, "rb") as f:
+        etag = '"' + hashlib.sha256(f.read()).hexdigest()[:16] + '"'
+    return etag, formatdate(int(os.path.getmtime(path)), usegmt=True)
+
+
+class StubOtaHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == INDEX_PATH:
+            self.send_index()
+        elif self.path.startswith(FILES_PREFIX):
+            self.send_pdf(self.path[len(FILES_PREFIX):])
+        else:
+            self.send_error(404)
+
+    def not_modified(self, etag, last_modified):
+        if self.headers.get("If-None-Match"):
+            return self.headers["If-None-Match"] == etag
+        if self.headers.get("If-Modified-Since"):
+            try:
+                return parsedate_to_datetime(self.headers["If-Modified-Since"]) >= parsedate_to_datetime(last_modified)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def send_index(self):
+        names = sorted(name for name in os.listdir(self.server.directory) if name.endswith(".pdf"))
+        # Names are linked as-is: the scraper keeps the last URL segment as
+        # the filename, so files saved with a literal %20 must round-trip.
+        links = "".join(f'<li><a href="{FILES_PREFIX}{escape(name)}">{escape(name)}</a></li>' for name in names)
+        body = f"<html><body><h1>Scheduled Evictions</h1><ul>{links}</ul></body></html>".encode()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_pdf(self, name):
+        path = os.path.join(self.server.directory, os.path.basename(name))
+        if not os.path.isfile(path):
+            path = os.path.join(self.server.directory, os.path.basename(unquote(name)))
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        etag, last_modified = file_validators(path)
+        if self.not_modified(etag, last_modified):
+            self.send_response(304)
+            self.end_headers()
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+        start = 0
+        match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if match and self.headers.get("If-Range") in (None, etag, last_modified) and int(match.group(1)) < len(data):
+            start = int(match.group(1))
+        with self.server.lock:
+            self.server.transfers += 1
+            drop = self.server.drop_after and self.server.transfers % self.server.drop_after == 0
+
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(data) - start))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.send_header("Accept-Ranges", "bytes")
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        self.end_headers()
+        # A dropped transfer sends half the body and closes the connection.
+        self.wfile.write(data[start:start + (len(data) - start) // 2] if drop else data[start:])
+        if drop:
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(directory="pdf_files", port=0, drop_after=0):
+    """Starts the stub in a background thread. Returns (server, index page URL)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubOtaHandler)
+    server.directory = directory
+    server.lock = threading.Lock()
+    server.transfers = 0
+    server.drop_after = drop_after
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}{INDEX_PATH}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake OTA scheduled-evictions page from a PDF directory")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--directory", default="pdf_files")
+    parser.add_argument("--drop-after", type=int, default=0, help="cut every Nth PDF transfer short")
+    args = parser.parse_args()
+    server, page_url = start_stub_server(args.directory, args.port, args.drop_after)
+    print(f"Stub OTA page listening on {page_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
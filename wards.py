@@ -0,0 +1,234 @@
+"""
+Offline ward assignment from boundary polygons.
+
+Ward boundaries are read from GeoJSON files in data/boundaries named
+wards_<vintage>.geojson (e.g. wards_2012.geojson, wards_2022.geojson), so
+several redistricting vintages can be used side by side. A vintage DC GIS
+publishes is downloaded there on first use. Points are
+assigned with a vectorized even-odd ray-casting test; a y-band index over
+the polygon edges means each point is only tested against the few edges
+whose latitude range covers it. Once the files are there no network
+access is needed:
+
+    python wards.py eviction_data_ward.csv --vintage 2012 --vintage 2022
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+BOUNDARY_DIRECTORY = os.path.join("data", "boundaries")
+BOUNDARY_PATTERN = re.compile(r'^wards_(\w+)\.geojson$')
+WARD_PROPERTIES = ('WARD', 'WARD_ID', 'NAME', 'LABEL')  # first one present names the ward
+BANDS = 256
+# DC GIS ward layers, queried as GeoJSON in WGS 84 when a vintage's file is
+# missing. Override DC_WARD_BOUNDARIES_URL (with a {vintage} placeholder) to
+# download from a mirror or a local server instead.
+BOUNDARY_LAYERS = {'2012': 31, '2022': 53}
+BOUNDARY_LAYER_URL = "https://maps2.dcgis.dc.gov/dcgis/rest/services/DCGIS_DATA/Administrative_Other_Boundaries_WebMercator/MapServer/{layer}/query?where=1%3D1&outFields=*&outSR=4326&f=geojson"
+BOUNDARY_URL = os.environ.get("DC_WARD_BOUNDARIES_URL")
+DOWNLOAD_TIMEOUT = 60
+MAX_CELLS = 4_000_000  # points x edges tested at once, to bound memory
+
+
+def ward_label(value):
+    """'Ward 3', 3 or '3' -> 'Ward 3'."""
+    value = str(value).strip()
+    if value.lower().startswith('ward'):
+        value = value[4:].strip()
+    if re.fullmatch(r'\d+(\.0)?', value):
+        value = str(int(float(value)))
+    return f"Ward {value}"
+
+
+def load_boundaries(path, ward_property=None):
+    """
+    Reads a GeoJSON FeatureCollection of ward (Multi)Polygons. Returns a
+    list of (ward label, [ring arrays of (lng, lat)]); holes are kept as
+    rings, which the even-odd test handles.
+    """
+    with open(path) as f:
+        collection = json.load(f)
+    wards = []
+    for feature in collection['features']:
+        properties = feature.get('properties') or {}
+        name = ward_property or next((key for key in WARD_PROPERTIES if key in properties), None)
+        if name is None:
+            raise ValueError(f"{path}: feature has none of the ward properties {WARD_PROPERTIES}")
+        geometry = feature['geometry']
+        if geometry['type'] == 'Polygon':
+            polygons = [geometry['coordinates']]
+        elif geometry['type'] == 'MultiPolygon':
+            polygons = geometry['coordinates']
+        else:
+            raise ValueError(f"{path}: unsupported geometry type {geometry['type']}")
+        rings = [np.asarray(ring, dtype=float)[:, :2] for polygon in polygons for ring in polygon]
+        wards.append((ward_label(properties[name]), rings))
+    return wards
+
+
+class WardIndex:
+    """
+    Point-in-polygon lookup over one set of ward boundaries.
+
+    All ring edges are flattened into arrays and bucketed into horizontal
+    bands by their latitude range. A point's ray only crosses edges in its
+    own band, so each point is tested against a small slice of the edges,
+    and each band's test is one vectorized (points x edges) comparison.
+    """
+
+    def __init__(self, wards, bands=BANDS):
+        self.labels = np.array([label for label, _ in wards], dtype=object)
+        edges = []
+        for ward_id, (_, rings) in enumerate(wards):
+            for ring in rings:
+                if not np.array_equal(ring[0], ring[-1]):
+                    ring = np.vstack([ring, ring[:1]])
+                start, end = ring[:-1], ring[1:]
+                edges.append(np.column_stack([start, end, np.full(len(start), ward_id)]))
+        edges = np.vstack(edges)
+        # Horizontal edges never cross a horizontal ray.
+        edges = edges[edges[:, 1] != edges[:, 3]]
+        self.x1, self.y1, self.x2, self.y2 = edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+        self.ward_ids = edges[:, 4].astype(int)
+        self.min_x, self.max_x = min(self.x1.min(), self.x2.min()), max(self.x1.max(), self.x2.max())
+        self.min_y, self.max_y = min(self.y1.min(), self.y2.min()), max(self.y1.max(), self.y2.max())
+
+        self.bands = bands
+        self.band_height = (self.max_y - self.min_y) / bands or 1.0
+        low = self._band(np.minimum(self.y1, self.y2))
+        high = self._band(np.maximum(self.y1, self.y2))
+        self.band_edges = [[] for _ in range(bands)]
+        for edge, (first, last) in enumerate(zip(low, high)):
+            for band in range(first, last + 1):
+                self.band_edges[band].append(edge)
+        self.band_edges = [np.array(band, dtype=int) for band in self.band_edges]
+
+    @classmethod
+    def from_file(cls, path, ward_property=None):
+        return cls(load_boundaries(path, ward_property))
+
+    def _band(self, y):
+        return np.clip(((y - self.min_y) / self.band_height).astype(int), 0, self.bands - 1)
+
+    def _crossings(self, px, py, edges):
+        """Per-ward crossing counts for points against a set of edges."""
+        x1, y1, x2, y2 = self.x1[edges], self.y1[edges], self.x2[edges], self.y2[edges]
+        py_column = py[:, None]
+        spans = (y1 > py_column) != (y2 > py_column)
+        x_cross = x1 + (py_column - y1) * (x2 - x1) / (y2 - y1)
+        crosses = spans & (px[:, None] < x_cross)
+        counts = np.zeros((len(px), len(self.labels)), dtype=int)
+        for ward_id in np.unique(self.ward_ids[edges]):
+            counts[:, ward_id] = crosses[:, self.ward_ids[edges] == ward_id].sum(axis=1)
+        return counts
+
+    def assign(self, lats, lngs):
+        """
+        Returns an object array of ward labels for the given coordinates,
+        None for missing coordinates or points outside every ward.
+        """
+        lats = np.asarray(lats, dtype=float)
+        lngs = np.asarray(lngs, dtype=float)
+        result = np.full(len(lats), None, dtype=object)
+        valid = ~(np.isnan(lats) | np.isnan(lngs))
+        valid &= (lngs >= self.min_x) & (lngs <= self.max_x) & (lats >= self.min_y) & (lats <= self.max_y)
+        points = np.flatnonzero(valid)
+        point_bands = self._band(lats[points])
+        for band in np.unique(point_bands):
+            edges = self.band_edges[band]
+            if not len(edges):
+                continue
+            in_band = points[point_bands == band]
+            step = max(1, MAX_CELLS // len(edges))
+            for start in range(0, len(in_band), step):
+                chunk = in_band[start:start + step]
+                inside = self._crossings(lngs[chunk], lats[chunk], edges) % 2 == 1
+                found = inside.any(axis=1)
+                result[chunk[found]] = self.labels[inside[found].argmax(axis=1)]
+        return result
+
+
+def available_vintages(directory=BOUNDARY_DIRECTORY):
+    """{vintage: path} for every wards_<vintage>.geojson in directory."""
+    vintages = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.geojson"))):
+        match = BOUNDARY_PATTERN.match(os.path.basename(path))
+        if match:
+            vintages[match.group(1)] = path
+    return vintages
+
+
+def download_boundaries(vintage, directory=BOUNDARY_DIRECTORY):
+    """
+    Downloads a vintage's ward boundaries into directory as
+    wards_<vintage>.geojson and returns the path. Raises FileNotFoundError,
+    saying how to add the file by hand, if there is no source for the
+    vintage or the download fails.
+    """
+    vintage = str(vintage)
+    missing = f"No ward boundaries for vintage {vintage} in {directory} (expected wards_{vintage}.geojson, see data/boundaries/README.md)"
+    if BOUNDARY_URL:
+        url = BOUNDARY_URL.format(vintage=vintage)
+    elif vintage in BOUNDARY_LAYERS:
+        url = BOUNDARY_LAYER_URL.format(layer=BOUNDARY_LAYERS[vintage])
+    else:
+        raise FileNotFoundError(f"{missing}; DC GIS layers are only known for {', '.join(BOUNDARY_LAYERS)}")
+    try:
+        with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT) as response:
+            collection = json.load(response)
+    except (OSError, ValueError) as e:
+        raise FileNotFoundError(f"{missing}; downloading them from {url} failed: {e}") from e
+    # ArcGIS reports query errors as a 200 with an 'error' object.
+    if not isinstance(collection, dict) or not collection.get('features'):
+        raise FileNotFoundError(f"{missing}; {url} returned no features: {str(collection)[:200]}")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"wards_{vintage}.geojson")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(collection, f)
+    os.replace(tmp_path, path)
+    print(f"Downloaded {len(collection['features'])} ward boundaries for {vintage} to {path}")
+    return path
+
+
+def boundary_file(vintage, directory=BOUNDARY_DIRECTORY):
+    """Path of a vintage's boundary file, downloading it on first use."""
+    return available_vintages(directory).get(str(vintage)) or download_boundaries(vintage, directory)
+
+
+def load_ward_index(vintage, directory=BOUNDARY_DIRECTORY):
+    """WardIndex for one vintage; raises FileNotFoundError if its boundaries can't be found or downloaded."""
+    return WardIndex.from_file(boundary_file(vintage, directory))
+
+
+def assign_wards(df, vintages, directory=BOUNDARY_DIRECTORY):
+    """Returns a DataFrame with one ward_<vintage> column per vintage for df's lat/lng."""
+    lats = pd.to_numeric(df['lat'], errors='coerce').to_numpy()
+    lngs = pd.to_numeric(df['lng'], errors='coerce').to_numpy()
+    return pd.DataFrame({f"ward_{vintage}": load_ward_index(vintage, directory).assign(lats, lngs) for vintage in vintages}, index=df.index)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assign wards from local boundary files")
+    parser.add_argument("csv", help="CSV with lat and lng columns")
+    parser.add_argument("--vintage", action="append", help="boundary vintage to use (repeatable; default: all bundled)")
+    parser.add_argument("--output", help="write the CSV with ward_<vintage> columns added")
+    args = parser.parse_args()
+
+    vintages = args.vintage or list(available_vintages())
+    if not vintages:
+        parser.error(f"no wards_<vintage>.geojson files in {BOUNDARY_DIRECTORY}")
+    df = pd.read_csv(args.csv)
+    assigned = assign_wards(df, vintages)
+    for column in assigned.columns:
+        print(f"{column}: {assigned[column].notna().sum():,} of {len(df):,} rows inside a ward")
+        print(assigned[column].value_counts().sort_index().to_string())
+    if args.output:
+        df.join(assigned).to_csv(args.output, index=False)